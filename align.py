@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from instrument import profiled
+from schema import SENTIMENT_ORDER
+
+# Trade -> sentiment alignment by day number.
+#
+# The Fear & Greed file has (at most) one row per day, so it is turned into a
+# dense array indexed by epoch day. Aligning N trades is then one subtraction
+# and one take() over int codes: no hash join and no copy of the trade frame.
+# With `lag`/`asof`, a trade only sees an index value published on or before
+# day t - lag, which rules out look-ahead.
+
+MISSING_DAY = np.iinfo(np.int64).min
+
+
+# Whole days since 1970-01-01; NaT becomes MISSING_DAY
+def epoch_days(values) -> np.ndarray:
+    ts = pd.to_datetime(pd.Series(values)).to_numpy('datetime64[ns]')
+    days = ts.astype('datetime64[D]').astype(np.int64)
+    return np.where(np.isnat(ts), MISSING_DAY, days)
+
+
+class SentimentCalendar:
+    """Dense day -> sentiment-code lookup built from the cleaned F&G frame."""
+
+    def __init__(self, sent: pd.DataFrame, column: str = 'sentiment', categories=SENTIMENT_ORDER):
+        days = epoch_days(sent['date'])
+        codes = pd.Categorical(sent[column], categories=list(categories)).codes
+        ok = days != MISSING_DAY
+        days, codes = days[ok], codes[ok]
+        self.categories = list(categories)
+        self.first = int(days.min()) if len(days) else 0
+        span = int(days.max()) - self.first + 1 if len(days) else 0
+        self.table = np.full(span, -1, dtype=np.int8)
+        self.table[days - self.first] = codes  # last row wins for duplicate days
+        # As-of table: latest published code on or before each day
+        filled = pd.Series(np.where(self.table >= 0, self.table, np.nan)).ffill()
+        self.asof_table = filled.fillna(-1).to_numpy(np.int8)
+
+    def codes(self, days: np.ndarray, lag: int = 0, asof: bool = False) -> np.ndarray:
+        days = np.asarray(days, dtype=np.int64)
+        valid = days != MISSING_DAY
+        pos = np.where(valid, days - lag - self.first, -1)
+        n = len(self.table)
+        if asof:
+            # Days past the end of the index see the last published value
+            in_range = valid & (pos >= 0)
+            return np.where(in_range, self.asof_table[np.clip(pos, 0, max(n - 1, 0))] if n else -1, -1)
+        in_range = valid & (pos >= 0) & (pos < n)
+        return np.where(in_range, self.table[np.clip(pos, 0, max(n - 1, 0))] if n else -1, -1)
+
+    def lookup(self, days: np.ndarray, lag: int = 0, asof: bool = False) -> pd.Categorical:
+        codes = self.codes(days, lag, asof).astype(np.int8)
+        return pd.Categorical.from_codes(codes, self.categories)
+
+
+# Sentiment for each trade day, as a categorical aligned to `dates`
+@profiled('merge:align_sentiment')
+def align_sentiment(dates: pd.Series, sent: pd.DataFrame, lag: int = 0, asof: bool = False) -> pd.Series:
+    calendar = SentimentCalendar(sent)
+    return pd.Series(calendar.lookup(epoch_days(dates), lag, asof), index=dates.index, name='sentiment')
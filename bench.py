@@ -0,0 +1,242 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+import fg_sections
+import figcache
+import synth
+import trade_sections
+from align import SentimentCalendar, align_sentiment
+from data_cache import cached_frame
+from ingest import TradeAggregates, stream_trades
+from lags import daily_stats, rolling_greed_lags, sentiment_lags
+from parallel import trader_stats
+from preprocess import clean_sentiment, clean_trades
+from schema import memory_report
+from sections import Figure
+from sentiment_state import SentimentState
+
+# Scaling benchmarks on synthetic data (see synth.py).
+#
+#   python bench.py --sizes 100k,1m,10m --out bench.json
+#   python bench.py --sizes 100k,1m --compare bench.json
+#
+# For each size, a trade file is generated once (kept in --data, default
+# .bench_data/) and every pipeline stage is timed on it: CSV load, clean,
+# columnar cache write/read, sentiment alignment, aggregate build, streamed
+# (low-memory) ingestion, streaks, the trader leaderboard, the 30-day lag
+# analysis with bootstrap intervals, the transition matrix and each dashboard
+# panel, optionally with its chart renders. Each
+# stage reports the best and median wall time over --repeat runs and, with
+# --memory, the peak traced allocation of one extra run. The cleaned frame's
+# in-memory size per column (schema.memory_report) is recorded per size. --compare flags
+# stages that got slower than a previous JSON result by more than --threshold
+# and exits non-zero, so it can gate CI.
+
+SIZE_SUFFIXES = {'k': 10 ** 3, 'm': 10 ** 6, 'b': 10 ** 9}
+# Dashboard panels computed from the aggregates (and, for some, the frame)
+PANELS = ['overview', 'side_distribution', 'most_traded_coins', 'trade_sizes', 'pnl_overview', 'trade_frequency',
+          'price_trends', 'fees', 'correlations', 'sentiment_performance']
+PANELS_WITH_FRAME = {'overview', 'price_trends'}
+
+
+class Stage(NamedTuple):
+    name: str
+    run: Callable[[Dict[str, Any]], Any]
+    # Builds fresh inputs for each run outside the timed region (e.g. a copy
+    # of a frame the stage mutates); its result is passed to `run` as ctx['input']
+    setup: Optional[Callable[[Dict[str, Any]], Any]] = None
+    keep: Optional[str] = None  # store the result in ctx under this name
+
+
+def parse_size(text: str) -> int:
+    text = text.strip().lower().replace('_', '')
+    if text[-1:] in SIZE_SUFFIXES:
+        return int(float(text[:-1]) * SIZE_SUFFIXES[text[-1]])
+    return int(float(text))
+
+
+def format_size(n: int) -> str:
+    for suffix, scale in sorted(SIZE_SUFFIXES.items(), key=lambda kv: -kv[1]):
+        if n >= scale and n % scale == 0:
+            return f'{n // scale}{suffix}'
+    return str(n)
+
+
+def data_files(data_dir: str, n: int, seed: int) -> Dict[str, str]:
+    os.makedirs(data_dir, exist_ok=True)
+    trades = os.path.join(data_dir, f'trades-{format_size(n)}-s{seed}.csv')
+    sentiment = os.path.join(data_dir, f'fear_greed-s{seed}.csv')
+    if not os.path.exists(sentiment):
+        synth.write_sentiment(sentiment, seed=seed)
+    if not os.path.exists(trades):
+        print(f'generating {n:,} trades -> {trades}', file=sys.stderr)
+        synth.write_trades(trades, n, seed=seed)
+    return {'trades': trades, 'sentiment': sentiment}
+
+
+# The dashboards align in place, so the timed stage does too
+def _merge(ctx: Dict[str, Any]) -> None:
+    ctx['df']['sentiment'] = align_sentiment(ctx['df']['date'], ctx['sent'])
+
+
+def _panel(name: str) -> Stage:
+    func = getattr(trade_sections, name)
+    if name in PANELS_WITH_FRAME:
+        return Stage(f'panel:{name}', lambda ctx: func(ctx['agg'], ctx['df']), keep=f'section:{name}')
+    return Stage(f'panel:{name}', lambda ctx: func(ctx['agg']), keep=f'section:{name}')
+
+
+def _render(ctx: Dict[str, Any], section_name: str) -> int:
+    section = ctx[section_name]
+    return sum(len(figcache.render_png(b.draw, *b.args)) for b in section.blocks if isinstance(b, Figure))
+
+
+def stages(render: bool = False) -> List[Stage]:
+    out = [
+        Stage('load', lambda ctx: pd.read_csv(ctx['files']['trades']), keep='raw'),
+        Stage('clean', lambda ctx: clean_trades(ctx['input']), setup=lambda ctx: ctx['raw'].copy(), keep='df'),
+        Stage('cache:write', lambda ctx: cached_frame(ctx['files']['trades'], clean_trades, cache_dir=ctx['input']),
+              setup=lambda ctx: tempfile.mkdtemp(dir=ctx['tmp'])),
+        Stage('cache:read', lambda ctx: cached_frame(ctx['files']['trades'], clean_trades, cache_dir=ctx['tmp'])),
+        Stage('merge', _merge, keep='merged'),
+        Stage('aggregate', lambda ctx: TradeAggregates().update(ctx['df']), keep='agg'),
+        Stage('stream', lambda ctx: stream_trades(ctx['files']['trades'], SentimentCalendar(ctx['sent']))),
+        Stage('streaks', lambda ctx: trade_sections.streaks(ctx['df'], 'Per account'), keep='section:streaks'),
+        Stage('trader_stats', lambda ctx: trader_stats(ctx['df'], 'Account')),
+        Stage('sentiment_lags', lambda ctx: sentiment_lags(daily_stats(ctx['agg'].cube), ctx['sent'], 30)),
+        Stage('rolling_greed_lags', lambda ctx: rolling_greed_lags(daily_stats(ctx['agg'].cube), ctx['sent'], 30)),
+        Stage('transition_matrix', lambda ctx: fg_sections.transition_matrix(ctx['state'], 'All 5 classifications', 3),
+              keep='section:transition_matrix'),
+    ] + [_panel(name) for name in PANELS]
+    if render:
+        # Chart renders with an empty figure cache, as on a cold dashboard
+        for name in PANELS + ['streaks', 'transition_matrix']:
+            out.append(Stage(f'render:{name}', lambda ctx, name=name: _render(ctx, f'section:{name}'),
+                             setup=lambda ctx: figcache.clear()))
+    return out
+
+
+def _measure(stage: Stage, ctx: Dict[str, Any], repeat: int, memory: bool) -> Dict[str, Any]:
+    times, result = [], None
+    for _ in range(repeat):
+        if stage.setup is not None:
+            ctx['input'] = stage.setup(ctx)
+        start = time.perf_counter()
+        result = stage.run(ctx)
+        times.append(time.perf_counter() - start)
+        ctx.pop('input', None)
+    row = {'best': min(times), 'median': statistics.median(times), 'runs': repeat}
+    if memory:
+        if stage.setup is not None:
+            ctx['input'] = stage.setup(ctx)
+        tracemalloc.start()
+        try:
+            stage.run(ctx)
+            row['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+            ctx.pop('input', None)
+    if stage.keep:
+        ctx[stage.keep] = result
+    return row
+
+
+def run(sizes: List[int], data_dir: str, repeat: int = 3, seed: int = 0, memory: bool = False,
+        render: bool = False, only: Optional[List[str]] = None) -> Dict[str, Any]:
+    results, frame_bytes = {}, {}
+    for n in sizes:
+        files = data_files(data_dir, n, seed)
+        with tempfile.TemporaryDirectory() as tmp:
+            sent = clean_sentiment(pd.read_csv(files['sentiment']))
+            ctx = {'files': files, 'tmp': tmp, 'sent': sent, 'state': SentimentState().append(sent)}
+            # cache:read needs a warm cache in `tmp`
+            cached_frame(files['trades'], clean_trades, cache_dir=tmp)
+            rows = {}
+            for stage in stages(render):
+                # Stages others depend on always run; --only filters the report
+                if only and not any(stage.name.startswith(p) for p in only) and not stage.keep:
+                    continue
+                rows[stage.name] = _measure(stage, ctx, repeat, memory)
+                rows[stage.name]['rows_per_s'] = n / rows[stage.name]['best'] if rows[stage.name]['best'] else None
+                print(f"{format_size(n):>6} {stage.name:<34} {rows[stage.name]['best']:9.4f}s", file=sys.stderr)
+            if only:
+                rows = {k: v for k, v in rows.items() if any(k.startswith(p) for p in only)}
+            usage = memory_report(ctx['df'])
+            frame_bytes[format_size(n)] = {col: int(b) for col, b in usage.items()}
+            print(f"{format_size(n):>6} {'cleaned frame':<34} {usage.sum() / 2 ** 20:8.1f}MB", file=sys.stderr)
+        results[format_size(n)] = rows
+    return {
+        'time': time.time(),
+        'environment': {'python': platform.python_version(), 'pandas': pd.__version__, 'numpy': np.__version__,
+                        'machine': platform.machine(), 'cpus': os.cpu_count()},
+        'seed': seed,
+        'results': results,
+        'frame_bytes': frame_bytes,
+    }
+
+
+# Stages slower than `threshold` times the baseline's best time
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 1.25) -> List[str]:
+    slower = []
+    for size, rows in current['results'].items():
+        for name, row in rows.items():
+            old = baseline.get('results', {}).get(size, {}).get(name)
+            if old and old['best'] > 0 and row['best'] / old['best'] > threshold:
+                slower.append(f"{size} {name}: {old['best']:.4f}s -> {row['best']:.4f}s ({row['best'] / old['best']:.2f}x)")
+    return slower
+
+
+# Best seconds (and peak MB with --memory) per stage, one column per size
+def table(report: Dict[str, Any]) -> pd.DataFrame:
+    columns = {}
+    for size, rows in report['results'].items():
+        columns[f'{size} s'] = {name: row['best'] for name, row in rows.items()}
+        if any('peak_bytes' in row for row in rows.values()):
+            columns[f'{size} MB'] = {name: row.get('peak_bytes', np.nan) / 2 ** 20 for name, row in rows.items()}
+    return pd.DataFrame(columns)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Time every pipeline stage on synthetic data at several sizes.")
+    parser.add_argument('--sizes', default='100k,1m', help="comma-separated trade counts, e.g. 100k,1m,10m")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data', default=os.environ.get('EDA_BENCH_DIR', '.bench_data'),
+                        help="where generated inputs are kept (default .bench_data)")
+    parser.add_argument('--only', help="comma-separated stage name prefixes to report, e.g. panel,render")
+    parser.add_argument('--memory', action='store_true', help="also record peak traced allocation per stage")
+    parser.add_argument('--render', action='store_true', help="also time chart renders")
+    parser.add_argument('--out', help="write the results as JSON")
+    parser.add_argument('--compare', help="previous JSON result to check for regressions")
+    parser.add_argument('--threshold', type=float, default=1.25, help="slowdown ratio flagged by --compare")
+    args = parser.parse_args(argv)
+
+    report = run([parse_size(s) for s in args.sizes.split(',')], args.data, args.repeat, args.seed,
+                 args.memory, args.render, args.only.split(',') if args.only else None)
+    with pd.option_context('display.max_rows', None, 'display.float_format', '{:.4f}'.format):
+        print(table(report))
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=1)
+    if args.compare:
+        with open(args.compare) as f:
+            slower = compare(report, json.load(f), args.threshold)
+        for line in slower:
+            print(f'slower: {line}')
+        return 1 if slower else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
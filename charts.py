@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import importlib
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Draw functions for every dashboard chart. Each returns a matplotlib Figure
+# built only from its arguments, so the same chart can go through the figure
+# cache in Streamlit (figcache.show_figure) or be saved by the batch report.
+#
+# matplotlib and seaborn take about a second to import and are not needed
+# until a chart is actually drawn (figure cache hits never draw), so they are
+# imported on first use.
+
+
+class _LazyModule:
+    def __init__(self, name: str):
+        self._name = name
+
+    def __getattr__(self, attr: str):
+        return getattr(importlib.import_module(self._name), attr)
+
+
+plt = _LazyModule('matplotlib.pyplot')
+sns = _LazyModule('seaborn')
+
+
+def create_barplot(data: pd.Series, title: str, palette: List[str]) -> Tuple[plt.Figure, plt.Axes]:
+    fig, ax = plt.subplots()
+    sns.barplot(x=data.index, y=data.values, ax=ax, palette=palette)
+    ax.set_title(title)
+    return fig, ax
+
+
+def plot_side_counts(side_counts: pd.Series) -> plt.Figure:
+    fig, ax = create_barplot(side_counts, "Buy vs Sell Trade Counts", palette=['#377eb8', '#e41a1c'])
+    fig.set_size_inches(5, 3)  # Reduced size
+    ax.set_xlabel("Trade Side", labelpad=10)  # Add padding to x-axis label
+    ax.set_ylabel("Count", labelpad=10)  # Add padding to y-axis label
+    return fig
+
+
+def plot_top_coins(top_coins: pd.Series) -> plt.Figure:
+    fig, ax = plt.subplots(figsize=(6, 3))  # Reduced size
+    sns.barplot(x=top_coins.index, y=top_coins.values, ax=ax, palette='viridis')
+    ax.set_title("Top 10 Traded Coins by Number of Trades")
+    ax.set_xlabel("Coin", labelpad=10)  # Add padding to x-axis label
+    ax.set_ylabel("Number of Trades", labelpad=10)  # Add padding to y-axis label
+    ax.tick_params(axis='x', rotation=45)  # Rotate x-axis labels for better readability
+    return fig
+
+
+def plot_trade_sizes(size_stats: List[dict]) -> plt.Figure:
+    fig, ax = plt.subplots(figsize=(6, 3))  # Reduced size
+    ax.bxp(size_stats, patch_artist=True, boxprops={'facecolor': '#8da0cb'},
+           medianprops={'color': 'black'}, flierprops={'marker': 'd', 'markersize': 3})
+    ax.set_yscale('log')
+    ax.set_title("Log Scale Distribution of Trade Size (USD) by Top Coins")
+    ax.set_xlabel("Coin", labelpad=10)  # Add padding to x-axis label
+    ax.set_ylabel("Trade Size (USD)", labelpad=10)  # Add padding to y-axis label
+    ax.tick_params(axis='x', rotation=45)  # Rotate x-axis labels for better readability
+    return fig
+
+
+def plot_pnl_distribution(edges: np.ndarray, counts: np.ndarray, kde_x: np.ndarray, kde_density: np.ndarray) -> plt.Figure:
+    fig, ax = plt.subplots(figsize=(6, 3))  # Reduced size
+    ax.hist(edges[:-1], bins=edges, weights=counts, color='#4c72b0', alpha=0.75, edgecolor='white')
+    # Scale the density to counts per histogram bin, as seaborn's kde=True does
+    ax.plot(kde_x, kde_density * counts.sum() * (edges[1] - edges[0]), color='#4c72b0')
+    ax.set_title("Distribution of Closed PnL")
+    ax.set_xlabel("Closed PnL", labelpad=10)  # Add padding to x-axis label
+    ax.set_ylabel("Frequency", labelpad=10)  # Add padding to y-axis label
+    return fig
+
+
+def plot_trade_counts(trade_counts: pd.Series) -> plt.Figure:
+    fig, ax = plt.subplots(figsize=(6, 3))  # Reduced size
+    trade_counts.plot(ax=ax)
+    ax.set_title("Number of Trades Per Day")
+    ax.set_xlabel("Date", labelpad=10)  # Add padding to x-axis label
+    ax.set_ylabel("Number of Trades", labelpad=10)  # Add padding to y-axis label
+    ax.tick_params(axis='x', rotation=45)  # Rotate x-axis labels for better readability
+    return fig
+
+
+def plot_avg_price(avg_price: pd.DataFrame) -> plt.Figure:
+    fig, ax = plt.subplots(figsize=(6, 3))  # Reduced size
+    avg_price.plot(ax=ax)
+    ax.set_title("Average Execution Price Over Time for Top 3 Coins")
+    ax.set_xlabel("Timestamp", labelpad=10)  # Add padding to x-axis label
+    ax.set_ylabel("Average Execution Price", labelpad=10)  # Add padding to y-axis label
+    ax.tick_params(axis='x', rotation=45)  # Rotate x-axis labels for better readability
+    return fig
+
+
+def plot_fees(fee_sum: pd.Series) -> plt.Figure:
+    fig, ax = plt.subplots(figsize=(8, 4))
+    sns.barplot(x=fee_sum.index, y=fee_sum.values, ax=ax, palette='magma')
+    ax.set_title("Total Fees Paid per Coin")
+    ax.set_ylabel("Total Fees")
+    ax.set_xlabel("Coin")
+    return fig
+
+
+def plot_correlation(corr: pd.DataFrame, scope: str) -> plt.Figure:
+    fig, ax = plt.subplots(figsize=(8,6))
+    sns.heatmap(corr, annot=True, cmap='coolwarm', ax=ax)
+    ax.set_title("Correlation Heatmap" if scope == 'All trades' else f"Correlation Heatmap ({scope})")
+    return fig
+
+
+def plot_sentiment_bar(values: pd.Series, title: str, ylabel: str) -> plt.Figure:
+    fig, ax = plt.subplots()
+    values.plot(kind='bar', color=['red','gray','green'], ax=ax)
+    ax.set_title(title)
+    ax.set_ylabel(ylabel)
+    return fig
+
+
+def plot_streak_lengths(lengths: pd.Series) -> plt.Figure:
+    fig, ax = plt.subplots()
+    lengths.hist(bins=30, ax=ax)
+    ax.set_title('Distribution of Win/Loss Streak Lengths')
+    ax.set_xlabel('Streak Length')
+    ax.set_ylabel('Count')
+    return fig
+
+
+def plot_sentiment_counts(counts: pd.Series) -> plt.Figure:
+    fig, ax = create_barplot(counts, 'Sentiment Day Counts', palette=['#d73027', '#fdae61', '#1a9850'])
+    return fig
+
+
+def plot_sentiment_series(data: pd.DataFrame) -> plt.Figure:
+    fig, ax = plt.subplots(figsize=(6, 3))  # Reduced size
+    sns.lineplot(x='date', y='sentiment_num', data=data, ax=ax)
+    ax.set_title('Sentiment Time Series (Greed=1, Neutral=0.5, Fear=0)')
+    ax.set_xlabel("Date", labelpad=10)  # Add padding to x-axis label
+    ax.set_ylabel("Sentiment Level", labelpad=10)  # Add padding to y-axis label
+    ax.tick_params(axis='x', rotation=45)  # Rotate x-axis labels for better readability
+    return fig
+
+
+def plot_rolling_greed(dates: pd.Index, values: pd.Series) -> plt.Figure:
+    fig, ax = plt.subplots(figsize=(6, 3))  # Reduced size
+    ax.plot(dates, values, color='blue')
+    ax.set_title('30-Day Rolling Average of Greed Sentiment')
+    ax.set_xlabel("Date", labelpad=10)  # Add padding to x-axis label
+    ax.set_ylabel("Rolling Average", labelpad=10)  # Add padding to y-axis label
+    ax.tick_params(axis='x', rotation=45)  # Rotate x-axis labels for better readability
+    return fig
+
+
+def plot_volatility(dates: pd.Index, values: pd.Series) -> plt.Figure:
+    fig, ax = plt.subplots(figsize=(10, 3))
+    ax.plot(dates, values, color='purple')
+    ax.set_title('30-Day Rolling Volatility of Sentiment')
+    ax.set_xlabel("Date", labelpad=10)  # Add padding to x-axis label
+    ax.set_ylabel("Volatility (Std Dev)", labelpad=10)  # Add padding to y-axis label
+    ax.tick_params(axis='x', rotation=45)  # Rotate x-axis labels for better readability
+    return fig
+
+
+def plot_persistence(persistence: pd.DataFrame) -> plt.Figure:
+    fig, ax = plt.subplots(figsize=(10, 3))
+    persistence.plot(ax=ax)
+    ax.set_title('365-Day Rolling Probability of Staying in the Same State')
+    ax.set_xlabel("Date", labelpad=10)  # Add padding to x-axis label
+    ax.set_ylabel("P(stay)", labelpad=10)  # Add padding to y-axis label
+    return fig
+
+
+def plot_lag_effects(estimate: pd.DataFrame, low: pd.DataFrame, high: pd.DataFrame, title: str, ylabel: str) -> plt.Figure:
+    fig, ax = plt.subplots(figsize=(8, 3))
+    for state, color in zip(estimate.columns, ['red', 'gray', 'green']):
+        ax.plot(estimate.index, estimate[state], color=color, marker='o', markersize=3, label=state)
+        ax.fill_between(estimate.index, low[state], high[state], color=color, alpha=0.15)
+    ax.set_title(title)
+    ax.set_xlabel("Sentiment lag (days before the trade)", labelpad=10)
+    ax.set_ylabel(ylabel, labelpad=10)
+    ax.legend()
+    return fig
+
+
+def plot_lag_correlation(table: pd.DataFrame) -> plt.Figure:
+    fig, ax = plt.subplots(figsize=(8, 3))
+    for prefix, label, color in [('pnl', 'PnL per trade', 'blue'), ('win', 'Win rate', 'orange')]:
+        ax.plot(table.index, table[f'{prefix}_corr'], color=color, marker='o', markersize=3, label=label)
+        ax.fill_between(table.index, table[f'{prefix}_low'], table[f'{prefix}_high'], color=color, alpha=0.15)
+    ax.axhline(0, color='black', linewidth=0.8)
+    ax.set_title('Correlation with the 30-Day Rolling Greed Average')
+    ax.set_xlabel("Rolling greed lag (days before the trade)", labelpad=10)
+    ax.set_ylabel("Correlation across days", labelpad=10)
+    ax.legend()
+    return fig
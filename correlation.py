@@ -0,0 +1,92 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from schema import group_codes
+
+# Mergeable pairwise-complete correlation matrices.
+#
+# For every column pair (i, j) the accumulator keeps, over the rows where
+# both i and j are present: the row count, the mean of i, the centred sum of
+# squares of i and the co-moment of i and j. A chunk's moments are computed
+# from data shifted by its own means and then folded in with the parallel
+# (Chan/Welford) update, so results match DataFrame.corr()'s pairwise NaN
+# handling without ever holding more than one chunk.
+
+
+class OnlineCorr:
+    def __init__(self, columns: List[str]):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.n = np.zeros((k, k))
+        self.mean = np.zeros((k, k))  # mean[i, j]: mean of i where i and j are present
+        self.m2 = np.zeros((k, k))    # m2[i, j]: centred sum of squares of i, same rows
+        self.cm = np.zeros((k, k))    # co-moment of i and j (symmetric)
+
+    def _values(self, data) -> np.ndarray:
+        if isinstance(data, pd.DataFrame):
+            return np.column_stack([data[c].to_numpy(np.float64, na_value=np.nan) for c in self.columns])
+        return np.asarray(data, dtype=np.float64).reshape(-1, len(self.columns))
+
+    def _fold(self, n: np.ndarray, mean: np.ndarray, m2: np.ndarray, cm: np.ndarray) -> None:
+        total = self.n + n
+        safe = np.where(total > 0, total, 1)
+        delta = mean - self.mean
+        w = self.n * n / safe
+        self.mean = self.mean + delta * n / safe
+        self.m2 = self.m2 + m2 + delta ** 2 * w
+        self.cm = self.cm + cm + delta * delta.T * w
+        self.n = total
+
+    def add(self, data) -> 'OnlineCorr':
+        x = self._values(data)
+        if not len(x):
+            return self
+        present = ~np.isnan(x)
+        # Shift by the chunk's column means to avoid cancellation in the sums
+        counts = present.sum(axis=0)
+        shift = np.where(present, x, 0).sum(axis=0) / np.maximum(counts, 1)
+        xs = np.where(present, x - shift, 0)
+        m = present.astype(np.float64)
+        n = m.T @ m
+        s = xs.T @ m  # s[i, j]: sum of shifted i where both present
+        q = (xs ** 2).T @ m
+        p = xs.T @ xs
+        mean_s = s / np.where(n > 0, n, 1)
+        m2 = q - s * mean_s
+        cm = p - s * mean_s.T
+        self._fold(n, np.where(n > 0, mean_s + shift[:, None], 0), m2, cm)
+        return self
+
+    def merge(self, other: 'OnlineCorr') -> 'OnlineCorr':
+        if other.columns != self.columns:
+            raise ValueError("Cannot merge correlations over different columns")
+        self._fold(other.n, other.mean, other.m2, other.cm)
+        return self
+
+    def counts(self) -> pd.DataFrame:
+        return pd.DataFrame(self.n.astype(np.int64), index=self.columns, columns=self.columns)
+
+    def cov(self) -> pd.DataFrame:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cov = np.where(self.n > 1, self.cm / (self.n - 1), np.nan)
+        return pd.DataFrame(cov, index=self.columns, columns=self.columns)
+
+    def corr(self, min_periods: int = 1) -> pd.DataFrame:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            r = np.clip(self.cm / np.sqrt(self.m2 * self.m2.T), -1, 1)
+        r[self.n < max(min_periods, 2)] = np.nan
+        return pd.DataFrame(r, index=self.columns, columns=self.columns)
+
+
+# One accumulator per group label, from one pass over the group indices
+def grouped_correlations(frame: pd.DataFrame, groups: pd.Series, columns: Optional[List[str]] = None) -> Dict[object, OnlineCorr]:
+    columns = list(columns if columns is not None else frame.columns)
+    x = OnlineCorr(columns)._values(frame)
+    codes, labels = group_codes(groups)
+    out = {}
+    for code, idx in pd.Series(codes).groupby(codes, sort=False).indices.items():
+        if code >= 0:
+            out[labels[code]] = OnlineCorr(columns).add(x[idx])
+    return out
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from instrument import timed
+
+# Persistent columnar cache for cleaned CSV frames.
+#
+# Each cleaned frame is stored as one .npy file per column plus a manifest.
+# Reads memory-map the arrays, so a warm start skips CSV parsing and type
+# coercion entirely. The cache is keyed on the source file's size/mtime and,
+# when those change, on its content hash.
+
+CACHE_DIR = os.environ.get('EDA_CACHE_DIR', '.eda_cache')
+CACHE_VERSION = 3
+MANIFEST = 'manifest.json'
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+# Cheap change marker for cache keys; 0 when the file is missing
+def file_mtime(path: str) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+# Per-source cache directory; a short hash of the absolute path keeps
+# same-named CSVs in different directories apart
+def cache_path(csv_path: str, tag: str, cache_dir: str = CACHE_DIR) -> str:
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    where = hashlib.sha1(os.path.abspath(csv_path).encode()).hexdigest()[:8]
+    return os.path.join(cache_dir, f'{stem}-{where}-{tag}')
+
+
+def _read_manifest(path: str) -> Optional[Dict]:
+    try:
+        with open(os.path.join(path, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+# Smallest signed integer dtype that can hold category codes (-1 is NaN)
+def _code_dtype(n: int) -> np.dtype:
+    for dtype in (np.int8, np.int16, np.int32):
+        if n < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def write_frame(df: pd.DataFrame, path: str, source: Dict) -> None:
+    tmp = tempfile.mkdtemp(prefix='.tmp-', dir=os.path.dirname(path) or '.')
+    columns = []
+    try:
+        for i, col in enumerate(df.columns):
+            s = df[col]
+            entry = {'name': col, 'file': f'c{i}.npy'}
+            if isinstance(s.dtype, pd.CategoricalDtype) or s.dtype == object:
+                if isinstance(s.dtype, pd.CategoricalDtype):
+                    codes, cats = s.cat.codes.to_numpy(), s.cat.categories
+                    entry['kind'] = 'category'
+                    entry['ordered'] = bool(s.cat.ordered)
+                else:
+                    codes, cats = pd.factorize(s)
+                    entry['kind'] = 'object'
+                if pd.api.types.infer_dtype(cats, skipna=True) not in ('string', 'empty'):
+                    raise TypeError(f"Column {col!r} holds non-string objects")
+                np.save(os.path.join(tmp, f'c{i}.cats.npy'), np.asarray(cats, dtype=str))
+                np.save(os.path.join(tmp, entry['file']), codes.astype(_code_dtype(len(cats))))
+            elif isinstance(s.dtype, np.dtype) and s.dtype.kind in 'biufM':
+                entry['kind'] = 'array'
+                np.save(os.path.join(tmp, entry['file']), s.to_numpy())
+            else:
+                raise TypeError(f"Column {col!r} has unsupported dtype {s.dtype}")
+            columns.append(entry)
+        manifest = {'version': CACHE_VERSION, 'source': source, 'columns': columns}
+        try:
+            # Small JSON metadata such as parse reports survives the cache
+            manifest['attrs'] = json.loads(json.dumps(df.attrs))
+        except (TypeError, ValueError):
+            pass
+        with open(os.path.join(tmp, MANIFEST), 'w') as f:
+            json.dump(manifest, f)
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        os.replace(tmp, path)
+    except Exception:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+
+def read_frame(path: str, manifest: Dict) -> pd.DataFrame:
+    data = {}
+    for entry in manifest['columns']:
+        arr = np.load(os.path.join(path, entry['file']), mmap_mode='r')
+        if entry['kind'] == 'array':
+            data[entry['name']] = arr
+            continue
+        cats = np.load(os.path.join(path, entry['file'].replace('.npy', '.cats.npy')))
+        values = pd.Categorical.from_codes(arr, cats.astype(object), ordered=entry.get('ordered', False))
+        if entry['kind'] == 'object':
+            values = np.asarray(values, dtype=object)
+        data[entry['name']] = values
+    df = pd.DataFrame(data, columns=[e['name'] for e in manifest['columns']], copy=False)
+    df.attrs.update(manifest.get('attrs', {}))
+    return df
+
+
+# Load a CSV through `clean`, reusing the on-disk columnar cache when the
+# source file is unchanged. `tag` must change whenever `clean` does.
+def cached_frame(csv_path: str, clean: Callable[[pd.DataFrame], pd.DataFrame],
+                 tag: Optional[str] = None, cache_dir: str = CACHE_DIR) -> pd.DataFrame:
+    tag = tag or clean.__name__
+    name = os.path.basename(csv_path)
+    path = cache_path(csv_path, tag, cache_dir)
+    stat = os.stat(csv_path)
+    manifest = _read_manifest(path)
+    if manifest is not None and manifest.get('version') == CACHE_VERSION:
+        src = manifest['source']
+        if src['size'] == stat.st_size and src['mtime_ns'] == stat.st_mtime_ns:
+            with timed(f'load:{name}'):
+                return read_frame(path, manifest)
+        # Touched but not modified (e.g. re-checkout): refresh the key only
+        if src['size'] == stat.st_size and src['sha1'] == file_digest(csv_path):
+            src['mtime_ns'] = stat.st_mtime_ns
+            with open(os.path.join(path, MANIFEST), 'w') as f:
+                json.dump(manifest, f)
+            with timed(f'load:{name}'):
+                return read_frame(path, manifest)
+
+    with timed(f'load:{name}:csv'):
+        raw = pd.read_csv(csv_path)
+    with timed(f'clean:{tag}'):
+        df = clean(raw)
+    del raw
+    source = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha1': file_digest(csv_path)}
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with timed(f'load:{name}:write_cache'):
+            write_frame(df, path, source)
+    except (OSError, TypeError):
+        # Caching is best effort; fall back to the freshly cleaned frame
+        return df
+    with timed(f'load:{name}'):
+        return read_frame(path, _read_manifest(path))
@@ -0,0 +1,108 @@
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Plot-side downsampling so chart cost is bounded by pixels, not rows.
+#
+# - bucket_freq/resample_*: aggregate raw timestamps into at most ~max_points
+#   time buckets (mean or OHLC) before plotting.
+# - minmax_decimate: keep the min and max of each bucket so spikes survive.
+# - lttb: Largest-Triangle-Three-Buckets, for smooth series.
+#
+# Charts are saved at 200 dpi (see figcache.SAVEFIG_OPTIONS), so a 6-inch wide
+# axis has ~1200 horizontal pixels; points_for() turns a width into a budget.
+
+DPI = 200
+FREQ_LADDER = ['1min', '5min', '15min', '30min', '1h', '2h', '4h', '6h', '12h',
+               '1D', '2D', '7D', '14D', '30D']
+
+
+def points_for(width_in: float, dpi: int = DPI) -> int:
+    return int(width_in * dpi)
+
+
+# Smallest bucket width from FREQ_LADDER giving at most `max_points` buckets
+def bucket_freq(start: pd.Timestamp, end: pd.Timestamp, max_points: int) -> str:
+    span = pd.Timedelta(end - start)
+    for freq in FREQ_LADDER:
+        if span / pd.Timedelta(freq) <= max_points:
+            return freq
+    return FREQ_LADDER[-1]
+
+
+def _buckets(times: pd.Series, max_points: int, freq: Optional[str]) -> pd.Series:
+    if freq is None:
+        valid = times.dropna()
+        if valid.empty:
+            return times
+        freq = bucket_freq(valid.min(), valid.max(), max_points)
+    return times.dt.floor(freq)
+
+
+def resample_mean(df: pd.DataFrame, time_col: str, value_col: str, by: Optional[str] = None,
+                  max_points: int = 1200, freq: Optional[str] = None) -> pd.DataFrame:
+    """Mean of `value_col` per time bucket, one column per `by` group."""
+    keys = [_buckets(df[time_col], max_points, freq).rename(time_col)]
+    if by is not None:
+        keys.append(df[by])
+    means = df[value_col].groupby(keys, observed=True).mean()
+    return means.unstack() if by is not None else means.to_frame(value_col)
+
+
+def resample_ohlc(times: pd.Series, values: pd.Series, max_points: int = 1200,
+                  freq: Optional[str] = None) -> pd.DataFrame:
+    buckets = _buckets(times, max_points, freq)
+    g = pd.Series(values.to_numpy(), index=times.index).groupby(buckets.to_numpy())
+    return pd.DataFrame({'open': g.first(), 'high': g.max(), 'low': g.min(), 'close': g.last()})
+
+
+def _clean_xy(x, y) -> Tuple[np.ndarray, np.ndarray]:
+    x, y = np.asarray(x), np.asarray(y, dtype=np.float64)
+    keep = ~np.isnan(y)
+    return x[keep], y[keep]
+
+
+def minmax_decimate(x, y, max_points: int = 1200) -> Tuple[np.ndarray, np.ndarray]:
+    """Keep each bucket's min and max point (in x order); NaNs are dropped."""
+    x, y = _clean_xy(x, y)
+    n = len(y)
+    if n <= max_points:
+        return x, y
+    nb = max(max_points // 2, 1)
+    bucket = (np.arange(n) * nb) // n
+    order = np.lexsort((y, bucket))
+    first = np.flatnonzero(np.r_[True, bucket[order][1:] != bucket[order][:-1]])
+    last = np.r_[first[1:] - 1, n - 1]
+    keep = np.unique(np.concatenate((order[first], order[last])))
+    return x[keep], y[keep]
+
+
+def lttb(x, y, max_points: int = 1200) -> Tuple[np.ndarray, np.ndarray]:
+    """Largest-Triangle-Three-Buckets downsampling; NaNs are dropped."""
+    x, y = _clean_xy(x, y)
+    n = len(y)
+    if n <= max_points or max_points < 3:
+        return x, y
+    # Triangle areas need a numeric x axis
+    xs = x.astype('datetime64[ns]').astype(np.int64).astype(np.float64) if x.dtype.kind == 'M' \
+        else x.astype(np.float64)
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    keep = np.empty(max_points, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(max_points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        cx, cy = xs[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((xs[a] - cx) * (y[lo:hi] - y[a]) - (xs[a] - xs[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return x[keep], y[keep]
+
+
+# Decimate a Series indexed by x, keeping its name
+def decimate_series(s: pd.Series, max_points: int = 1200, method: str = 'minmax') -> pd.Series:
+    fn = minmax_decimate if method == 'minmax' else lttb
+    x, y = fn(s.index.to_numpy(), s.to_numpy(), max_points)
+    return pd.Series(y, index=pd.Index(x, name=s.index.name), name=s.name)
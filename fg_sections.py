@@ -0,0 +1,108 @@
+from typing import List, Optional, Sequence
+
+from charts import plot_persistence, plot_rolling_greed, plot_sentiment_counts, plot_sentiment_series, plot_volatility
+from downsample import decimate_series, points_for
+from query import value_mask
+from schema import CLASSIFICATION_ORDER, SENTIMENT_ORDER
+from sections import Figure, Info, Section, Table, Text
+from sentiment_state import SentimentState
+from transitions import rolling_persistence, transition_probs
+
+# Sections of the Fear & Greed dashboard, computed from the incremental
+# SentimentState (see sentiment_state.py). Widget options are arguments.
+
+STATE_SETS = {'Fear / Neutral / Greed': 'sentiment', 'All 5 classifications': 'classification'}
+
+
+def sentiment_counts(state: SentimentState) -> Section:
+    counts = state.sentiment_counts()
+    return Section('sentiment-counts', '1. How Often is the Market in Fear, Neutral, or Greed?', [
+        Text('This bar chart shows how many days the market was classified as Fear, Neutral, or Greed.'),
+        Figure('sentiment_counts', plot_sentiment_counts, (counts,)),
+        Info(f"Most common sentiment: {counts.idxmax()} ({int(counts.max())} days). This can help you identify the prevailing mood in the market and adjust your strategy accordingly."),
+    ], {'counts': counts.to_dict()})
+
+
+def sentiment_series(state: SentimentState, selected: Optional[Sequence[str]] = None) -> Section:
+    df = state.to_frame()
+    filtered_df = df if selected is None else df[value_mask(df['sentiment'], selected)]
+    # Downsample to about one point per pixel; min/max keeps every regime switch visible
+    series = decimate_series(filtered_df.set_index('date')['sentiment_num'], points_for(6))
+    return Section('sentiment-time-series', '2. How Does Sentiment Change Over Time?', [
+        Text('This line plot shows how market sentiment moves between Fear, Neutral, and Greed over time.'),
+        Figure('sentiment_series', plot_sentiment_series, (series.reset_index(),)),
+        Info('Sentiment often stays in one state for several days before switching. Watch for sudden jumps! If you notice a rapid change, it may signal a shift in market regime or an opportunity for contrarian trades.'),
+    ])
+
+
+def rolling_greed(state: SentimentState) -> Section:
+    rolling = decimate_series(state.to_frame().set_index('date')['rolling_greed'], points_for(6), method='lttb')
+    return Section('rolling-greed-average', '3. Trend: 30-Day Rolling Average of Greed', [
+        Text('This plot smooths out daily changes to show the overall trend in market sentiment.'),
+        Figure('rolling_greed', plot_rolling_greed, (rolling.index, rolling)),
+        Info('When the rolling average is high, the market is mostly greedy. When low, mostly fearful. Sustained trends in the rolling average can help you spot momentum or mean-reversion opportunities.'),
+    ], {'latest': float(state.rolling_mean[-1]) if len(state.rolling_mean) else None})
+
+
+def volatility(state: SentimentState) -> Section:
+    values = decimate_series(state.to_frame().set_index('date')['sentiment_volatility'], points_for(10), method='lttb')
+    return Section('sentiment-volatility', '4. Volatility: How Much Does Sentiment Change?', [
+        Text('This plot shows how much sentiment is changing (volatility). High volatility means the market is switching between fear and greed more often.'),
+        Figure('volatility', plot_volatility, (values.index, values)),
+        Info('Spikes in volatility can signal big changes in market mood. These may be good times to watch for reversals or new trends.'),
+    ], {'latest': float(state.rolling_std[-1]) if len(state.rolling_std) else None})
+
+
+def transition_matrix(state: SentimentState, state_set: str = 'Fear / Neutral / Greed', order: int = 1) -> Section:
+    state_column = STATE_SETS[state_set]
+    sentiments = SENTIMENT_ORDER if state_column == 'sentiment' else CLASSIFICATION_ORDER
+    # Histories never observed have no outgoing transitions and are hidden
+    probs = transition_probs(state.transition_counts(state_column, order)).dropna(how='all')
+    if state_column != 'sentiment':
+        probs.columns = probs.columns.str.title()
+        probs.index = probs.index.str.title()
+    df = state.frame
+    persistence = rolling_persistence(df[state_column], sentiments, window=365, index=df['date'])
+    return Section('sentiment-transition-matrix', '5. How Does Sentiment Switch from One State to Another?', [
+        Text('This table shows the probability that the market will stay in the same sentiment or switch to another the next day.'),
+        Table('transition_probabilities', probs, '{:.2f}'),
+        Info('The market usually stays in the same state, but sometimes switches. For example, after Fear, it often stays in Fear, but can move to Neutral or Greed. Understanding these probabilities can help you anticipate likely sentiment shifts and plan your trades.'),
+        Text('How does the chance of staying in the same state drift over time? Each line is the probability of staying in that state the next day, measured over the previous 365 days.'),
+        Figure('persistence', plot_persistence, (persistence,)),
+        Info('When persistence falls, regimes are getting shorter and sentiment is switching more often. Momentum strategies tend to suffer in such periods, while contrarian entries become more attractive.'),
+    ], {'states': state_set, 'order': order})
+
+
+def longest_streaks(state: SentimentState) -> Section:
+    streaks_df = state.streaks()
+    longest_fear = streaks_df[streaks_df['type'] == 'Fear']['length'].max()
+    longest_greed = streaks_df[streaks_df['type'] == 'Greed']['length'].max()
+    extreme_periods = streaks_df[streaks_df['length'] >= 5]
+    return Section('longest-streaks-and-extreme-sentiment-periods', '6. Longest Streaks and Extreme Sentiment Periods', [
+        Text('Here we show the longest periods where the market stayed in Fear or Greed, and all streaks of 5 days or more.'),
+        Text(f'**Longest Fear Streak:** {longest_fear} days'),
+        Text(f'**Longest Greed Streak:** {longest_greed} days'),
+        Table('extreme_periods', extreme_periods.sort_values(by='length', ascending=False)),
+        Info('Long streaks of Fear or Greed are rare. After such streaks, the market often reverses. Monitoring for the end of a long streak can help you catch turning points in the market.'),
+    ], {'longest_fear': longest_fear, 'longest_greed': longest_greed})
+
+
+def summary() -> Section:
+    return Section('summary--key-takeaways', 'Summary & Key Takeaways', [Text('''
+**Key Insights:**
+- The market spends most of its time in one sentiment regime, but transitions do occur and can be anticipated.
+- High volatility in sentiment often precedes major market moves - watch for these periods.
+- Long streaks of Fear or Greed are uncommon and often followed by reversals.
+- Use rolling averages and transition probabilities to inform momentum or contrarian strategies.
+
+**Actionable Tips:**
+- Adjust your trading style based on the prevailing sentiment and its recent history.
+- Be alert for regime changes after long streaks or volatility spikes.
+- Combine sentiment analytics with price/volume data for deeper insights.
+''')])
+
+
+# Every section with default options, in dashboard order
+def all_sections(state: SentimentState) -> List[Section]:
+    return [sentiment_counts(state), sentiment_series(state), rolling_greed(state), volatility(state),
+            transition_matrix(state), longest_streaks(state), summary()]
@@ -0,0 +1,142 @@
+import dataclasses
+import datetime
+import hashlib
+import io
+import os
+import threading
+import types
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+from instrument import timed
+
+# Rendered-figure cache shared by every session in the process.
+#
+# A chart is keyed on its draw function (name and bytecode) plus a hash of
+# the data and parameters it is drawn from. Only types whose content can be
+# hashed are accepted, never an object's id-based repr: frames, arrays,
+# containers, dataclasses and plain scalars; anything else is a TypeError. A hit returns the stored PNG
+# bytes; a miss draws the figure, rasterizes it and closes it immediately, so
+# reruns triggered by unrelated widgets neither redraw nor leak figures.
+
+MAX_BYTES = int(os.environ.get('EDA_FIGURE_CACHE_MB', '64')) * 1024 * 1024
+SAVEFIG_OPTIONS = {'format': 'png', 'dpi': 200, 'bbox_inches': 'tight'}
+
+_cache: 'OrderedDict[str, bytes]' = OrderedDict()
+_size = 0
+_lock = threading.Lock()
+stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+# Scalars whose repr is their value
+SCALARS = (type(None), bool, int, float, complex, str, bytes, np.generic, datetime.date, datetime.timedelta,
+           pd.Timestamp, pd.Timedelta, pd.Period, type(pd.NaT), type(Ellipsis))
+
+
+def _update(h, obj: Any) -> None:
+    if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index)):
+        h.update(repr(getattr(obj, 'columns', getattr(obj, 'name', None))).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(str(obj.dtype).encode() + str(obj.shape).encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, (list, tuple)):
+        h.update(b'[')
+        for item in obj:
+            _update(h, item)
+        h.update(b']')
+    elif isinstance(obj, (set, frozenset)):
+        _update(h, sorted(obj, key=repr))
+    elif isinstance(obj, dict):
+        for key in sorted(obj, key=repr):
+            h.update(repr(key).encode())
+            _update(h, obj[key])
+    elif dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        h.update(type(obj).__qualname__.encode())
+        _update(h, {f.name: getattr(obj, f.name) for f in dataclasses.fields(obj)})
+    elif isinstance(obj, SCALARS):
+        h.update(f'{type(obj).__name__}:{obj!r}'.encode())
+    else:
+        raise TypeError(f"Cannot hash figure argument of type {type(obj).__name__}")
+
+
+# Bytecode and constants, recursing into nested functions and comprehensions
+def _update_code(h, code: types.CodeType) -> None:
+    h.update(code.co_code)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _update_code(h, const)
+        else:
+            _update(h, const)
+
+
+def figure_key(draw: Callable, *args, **kwargs) -> str:
+    h = hashlib.sha1()
+    h.update(f'{draw.__module__}.{draw.__qualname__}'.encode())
+    code = getattr(draw, '__code__', None)
+    if code is not None:
+        _update_code(h, code)
+    _update(h, args)
+    _update(h, kwargs)
+    return h.hexdigest()
+
+
+def _store(key: str, png: bytes) -> None:
+    global _size
+    with _lock:
+        if key in _cache:
+            return
+        _cache[key] = png
+        _size += len(png)
+        while _size > MAX_BYTES and len(_cache) > 1:
+            _, old = _cache.popitem(last=False)
+            _size -= len(old)
+            stats['evictions'] += 1
+
+
+def render_png(draw: Callable, *args, key: Optional[str] = None, **kwargs) -> bytes:
+    """PNG bytes of `draw(*args, **kwargs)`, drawing only on a cache miss.
+
+    `draw` must return a matplotlib Figure. Pass `key` to skip hashing large
+    inputs when the caller already has a stable version token for them.
+    """
+    key = key or figure_key(draw, *args, **kwargs)
+    with _lock:
+        png = _cache.get(key)
+        if png is not None:
+            _cache.move_to_end(key)
+            stats['hits'] += 1
+            return png
+        stats['misses'] += 1
+
+    import matplotlib.pyplot as plt
+    with timed(f'figure:{draw.__name__}'):
+        fig = draw(*args, **kwargs)
+        try:
+            buf = io.BytesIO()
+            fig.savefig(buf, **SAVEFIG_OPTIONS)
+        finally:
+            plt.close(fig)
+    png = buf.getvalue()
+    _store(key, png)
+    return png
+
+
+# Drop-in replacement for st.pyplot(draw(...)) that goes through the cache
+def show_figure(draw: Callable, *args, **kwargs) -> None:
+    import inspect
+    import streamlit as st
+    # Newer Streamlit stretches images with width='stretch' and deprecates
+    # use_container_width; older releases only know the latter
+    width = inspect.signature(st.image).parameters['width'].default
+    stretch = {'width': 'stretch'} if isinstance(width, str) else {'use_container_width': True}
+    st.image(render_png(draw, *args, **kwargs), **stretch)
+
+
+def clear() -> None:
+    global _size
+    with _lock:
+        _cache.clear()
+        _size = 0
@@ -0,0 +1,153 @@
+import copy
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from align import SentimentCalendar, epoch_days
+from correlation import OnlineCorr, grouped_correlations
+from instrument import profiled
+from preprocess import NUM_COLS, clean_trades
+from rollup import build_cube, empty_cube, merge_cubes, rollup, slice_cube, summarize
+from schema import SENTIMENT_ORDER
+from sketch import DDSketch, grouped_sketches
+from timestamps import detect_format, merge_reports
+
+# Chunked, bounded-memory ingestion of historical_data.csv.
+#
+# Each chunk is cleaned with the same rules as the in-memory path and folded
+# into TradeAggregates; only the aggregates outlive the chunk, so peak memory
+# scales with `chunksize` rather than with the file.
+
+CHUNK_SIZE = 500_000
+INGEST_COLS = ['Account', 'Coin', 'Side', 'Timestamp IST', 'Timestamp'] + NUM_COLS
+
+
+class TradeAggregates:
+    """Mergeable summaries behind the side/coin/fee/daily/sentiment panels.
+
+    Everything except the row and account totals lives in a rollup cube
+    (see rollup.py); the panel series are derived from it on demand. The
+    PnL and per-coin trade-size distributions are kept as DDSketches, and
+    the numeric-feature correlations (overall, per sentiment and per coin)
+    as OnlineCorr accumulators.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.accounts = set()
+        self.cube = empty_cube()
+        self.pnl_sketch = DDSketch()
+        self.size_sketches = {}
+        self.corr = OnlineCorr(NUM_COLS)
+        self.sentiment_corr = {}
+        self.coin_corr = {}
+        self.timestamps = {}  # timestamp parse reports, summed over chunks
+
+    # Merge per-group sketches/accumulators into `store`, keyed by group
+    @staticmethod
+    def _merge_groups(store: dict, parts: dict) -> None:
+        for key, part in parts.items():
+            if key in store:
+                store[key].merge(part)
+            else:
+                store[key] = part
+
+    @profiled('aggregate:TradeAggregates.update')
+    def update(self, chunk: pd.DataFrame, calendar: Optional[SentimentCalendar] = None,
+               lag: int = 0, asof: bool = False) -> 'TradeAggregates':
+        self.rows += len(chunk)
+        merge_reports(self.timestamps, chunk.attrs.get('timestamps', {}))
+        self.accounts.update(chunk['Account'].dropna().unique())
+        if 'sentiment' in chunk:
+            sentiment = chunk['sentiment']
+        elif calendar is not None:
+            days = epoch_days(chunk['Timestamp IST'])
+            sentiment = pd.Series(calendar.lookup(days, lag, asof), index=chunk.index)
+        else:
+            sentiment = pd.Series(np.nan, index=chunk.index, dtype=object)
+        self.cube = merge_cubes(self.cube, build_cube(chunk, sentiment))
+        self.pnl_sketch.add(chunk['Closed PnL'])
+        self._merge_groups(self.size_sketches, grouped_sketches(chunk['Size USD'], chunk['Coin']))
+        self.corr.add(chunk)
+        self._merge_groups(self.sentiment_corr, grouped_correlations(chunk, sentiment, NUM_COLS))
+        self._merge_groups(self.coin_corr, grouped_correlations(chunk, chunk['Coin'], NUM_COLS))
+        return self
+
+    def merge(self, other: 'TradeAggregates') -> 'TradeAggregates':
+        self.rows += other.rows
+        merge_reports(self.timestamps, other.timestamps)
+        self.accounts |= other.accounts
+        self.cube = merge_cubes(self.cube, other.cube)
+        self.pnl_sketch.merge(other.pnl_sketch)
+        self.corr.merge(other.corr)
+        for store, parts in ((self.size_sketches, other.size_sketches),
+                             (self.sentiment_corr, other.sentiment_corr),
+                             (self.coin_corr, other.coin_corr)):
+            self._merge_groups(store, copy.deepcopy(parts))
+        return self
+
+    def _counts(self, by: str) -> pd.Series:
+        return rollup(self.cube, by)['count'].astype('int64')
+
+    @property
+    def side_counts(self) -> pd.Series:
+        return self._counts('Side')
+
+    @property
+    def coin_counts(self) -> pd.Series:
+        return self._counts('Coin')
+
+    @property
+    def coin_fees(self) -> pd.Series:
+        return rollup(self.cube, 'Coin')['fees']
+
+    @property
+    def daily_counts(self) -> pd.Series:
+        return self._counts('date')
+
+    @property
+    def sentiment_rows(self) -> int:
+        return int(self.cube.loc[self.cube['sentiment'].notna(), 'count'].sum())
+
+    @property
+    def sentiment_coverage(self) -> float:
+        return self.sentiment_rows / self.rows if self.rows else float('nan')
+
+    @property
+    def pnl_mean(self) -> float:
+        n = self.cube['pnl_n'].sum()
+        return self.cube['pnl_sum'].sum() / n if n else float('nan')
+
+    def top_coins(self, n: int = 10) -> pd.Series:
+        return self.coin_counts.sort_values(ascending=False, kind='stable').head(n)
+
+    # Per-sentiment PnL mean/std, win rate and volume in dashboard order,
+    # optionally drilled down with cube filters (e.g. Coin='BTC')
+    def sentiment_summary(self, **filters) -> pd.DataFrame:
+        cube = slice_cube(self.cube, **filters) if filters else self.cube
+        return summarize(rollup(cube, 'sentiment')).reindex(SENTIMENT_ORDER)
+
+
+def iter_chunks(file_path: str, chunksize: int = CHUNK_SIZE,
+                columns: Iterable[str] = INGEST_COLS) -> Iterable[pd.DataFrame]:
+    wanted = set(columns)
+    reader = pd.read_csv(file_path, chunksize=chunksize, usecols=lambda c: c.strip() in wanted)
+    formats = None
+    for chunk in reader:
+        if formats is None:
+            # Infer once from the first chunk so every chunk parses alike
+            chunk.columns = chunk.columns.str.strip()
+            formats = {'Timestamp IST': detect_format(chunk['Timestamp IST'], 'Timestamp IST')} \
+                if 'Timestamp IST' in chunk else {}
+        yield clean_trades(chunk, formats)
+
+
+# Stream a trade CSV into aggregates without materializing the full frame
+@profiled('aggregate:stream_trades')
+def stream_trades(file_path: str, calendar: Optional[SentimentCalendar] = None,
+                  lag: int = 0, asof: bool = False, chunksize: int = CHUNK_SIZE) -> TradeAggregates:
+    agg = TradeAggregates()
+    for chunk in iter_chunks(file_path, chunksize):
+        agg.update(chunk, calendar, lag, asof)
+    return agg
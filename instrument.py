@@ -0,0 +1,197 @@
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Lightweight stage timing for the dashboards and report runs.
+#
+# With EDA_PROFILE=1 every `timed(name)` block records wall time, CPU time
+# (this process) and peak traced allocation (tracemalloc); EDA_PROFILE=time
+# skips tracemalloc, which slows allocation-heavy code noticeably. Unset, the
+# blocks cost one attribute check. Names are '<stage>:<detail>' with stages
+# load, clean, merge, aggregate, section and figure. Totals are process-wide
+# and can be exported as JSON or Prometheus text; with EDA_PROFILE_OUT set
+# they are also written there at exit (.prom for Prometheus, else JSON).
+#
+# tracemalloc's peak is process-wide while blocks nest per thread, so a peak
+# is only recorded for a block that overlapped no other thread's traced
+# block; with concurrent sessions (e.g. several Streamlit tabs) overlapping
+# blocks record time only. Blocks are not serialised instead, since a
+# session blocked on another session's cached load would deadlock.
+
+MODE = os.environ.get('EDA_PROFILE', '')
+ENABLED = MODE in ('1', 'time')
+TRACE_MEMORY = MODE == '1'
+PROFILE_OUT = os.environ.get('EDA_PROFILE_OUT')
+
+_lock = threading.Lock()
+_local = threading.local()  # per-thread stack of open blocks, for nested peaks
+_traced_threads = 0  # threads with an open traced block
+_overlaps = 0        # traced blocks entered while another thread had one open
+_stats: Dict[str, Dict[str, float]] = {}
+
+
+def _record(name: str, wall: float, cpu: float, peak: Optional[int]) -> None:
+    with _lock:
+        s = _stats.get(name)
+        if s is None:
+            s = _stats[name] = {'calls': 0, 'wall_total': 0.0, 'cpu_total': 0.0, 'wall_last': 0.0,
+                                'wall_max': 0.0, 'cpu_last': 0.0, 'peak_last': None, 'peak_max': None}
+        s['calls'] += 1
+        s['wall_total'] += wall
+        s['cpu_total'] += cpu
+        s['wall_last'] = wall
+        s['wall_max'] = max(s['wall_max'], wall)
+        s['cpu_last'] = cpu
+        if peak is not None:
+            s['peak_last'] = peak
+            s['peak_max'] = peak if s['peak_max'] is None else max(s['peak_max'], peak)
+
+
+# Outermost traced block of this thread entered (+1) or left (-1)
+def _enter_thread(delta: int) -> None:
+    global _traced_threads, _overlaps
+    with _lock:
+        if delta > 0 and _traced_threads:
+            _overlaps += 1
+        _traced_threads += delta
+
+
+def _overlap_state() -> Tuple[int, bool]:
+    with _lock:
+        return _overlaps, _traced_threads > 1
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    if not ENABLED:
+        yield
+        return
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    frame = None
+    if TRACE_MEMORY:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if not stack:
+            _enter_thread(1)
+        overlap = _overlap_state()  # (overlap count at entry, another thread open)
+        current, peak = tracemalloc.get_traced_memory()
+        # reset_peak() would hide the enclosing block's peak so far, so it is
+        # handed up the stack before resetting
+        if stack:
+            stack[-1][1] = max(stack[-1][1], peak)
+        tracemalloc.reset_peak()
+        frame = [current, current]  # [start, highest peak seen]
+        stack.append(frame)
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield
+    finally:
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        peak = None
+        if frame is not None:
+            frame[1] = max(frame[1], tracemalloc.get_traced_memory()[1])
+            stack.pop()
+            if stack:
+                stack[-1][1] = max(stack[-1][1], frame[1])
+            if not overlap[1] and _overlap_state()[0] == overlap[0]:
+                peak = frame[1] - frame[0]
+            if not stack:
+                _enter_thread(-1)
+        _record(name, wall, cpu, peak)
+
+
+# Decorator form; `name` defaults to the function's qualified name
+def profiled(name: Optional[str] = None) -> Callable:
+    def wrap(func: Callable) -> Callable:
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def inner(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            with timed(label):
+                return func(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def snapshot() -> Dict[str, Dict[str, float]]:
+    with _lock:
+        return {name: dict(s) for name, s in _stats.items()}
+
+
+def reset() -> None:
+    with _lock:
+        _stats.clear()
+
+
+def to_json(extra: Optional[Dict] = None) -> str:
+    return json.dumps({'time': time.time(), 'memory_traced': TRACE_MEMORY, **(extra or {}),
+                       'stages': snapshot()}, indent=1, sort_keys=True)
+
+
+def _label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Prometheus text exposition format, one series per stage
+def to_prometheus(labels: Optional[Dict[str, str]] = None) -> str:
+    metrics = [
+        ('eda_stage_calls_total', 'counter', 'Number of times the stage ran.', 'calls'),
+        ('eda_stage_wall_seconds_total', 'counter', 'Wall-clock time spent in the stage.', 'wall_total'),
+        ('eda_stage_cpu_seconds_total', 'counter', 'CPU time of this process spent in the stage.', 'cpu_total'),
+        ('eda_stage_wall_seconds_max', 'gauge', 'Slowest single run of the stage.', 'wall_max'),
+        ('eda_stage_peak_bytes', 'gauge', 'Largest peak traced allocation during the stage.', 'peak_max'),
+    ]
+    stats = snapshot()
+    extra = ''.join(f',{k}="{_label(str(v))}"' for k, v in sorted((labels or {}).items()))
+    lines: List[str] = []
+    for metric, kind, doc, field in metrics:
+        rows = [(name, s[field]) for name, s in sorted(stats.items()) if s[field] is not None]
+        if not rows:
+            continue
+        lines += [f'# HELP {metric} {doc}', f'# TYPE {metric} {kind}']
+        lines += [f'{metric}{{stage="{_label(name)}"{extra}}} {value:g}' for name, value in rows]
+    return '\n'.join(lines) + '\n'
+
+
+def write(path: str) -> None:
+    text = to_prometheus() if path.endswith('.prom') else to_json()
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+# Collapsible sidebar panel with the stage table and both exports
+def show_panel() -> None:
+    if not ENABLED:
+        return
+    import pandas as pd
+    import streamlit as st
+    with st.sidebar.expander("Profiler", expanded=False):
+        stats = snapshot()
+        if not stats:
+            st.caption("Nothing recorded yet.")
+            return
+        table = pd.DataFrame.from_dict(stats, orient='index')
+        table = table.assign(peak_mb=table['peak_max'].astype(float) / 2 ** 20)
+        table = table[['calls', 'wall_last', 'wall_total', 'cpu_total', 'peak_mb']].sort_values('wall_total', ascending=False)
+        st.dataframe(table.style.format({'calls': '{:.0f}', 'wall_last': '{:.3f}', 'wall_total': '{:.3f}',
+                                         'cpu_total': '{:.3f}', 'peak_mb': '{:.1f}'}))
+        st.download_button("Download JSON", to_json(), file_name='eda_profile.json', mime='application/json')
+        st.download_button("Download Prometheus", to_prometheus(), file_name='eda_profile.prom', mime='text/plain')
+        if st.button("Reset"):
+            reset()
+
+
+if ENABLED and PROFILE_OUT:
+    import atexit
+    atexit.register(write, PROFILE_OUT)
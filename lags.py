@@ -0,0 +1,183 @@
+import warnings
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from align import MISSING_DAY, SentimentCalendar, epoch_days
+from instrument import profiled
+from schema import SENTIMENT_ORDER
+from sentiment_state import WINDOW, sentiment_numbers
+
+# Multi-horizon sentiment -> performance analysis.
+#
+# How does the sentiment k days before a trade day (k = 0..max_lag), or the
+# 30-day rolling greed average shown on the Fear & Greed dashboard, relate to
+# that day's PnL and win rate? Everything runs at the daily level:
+#
+# - daily_stats sums the rollup cube once into per-day sufficient statistics
+#   (trades, PnL count/sum, wins), so filtered and low-memory aggregates work
+#   as they are;
+# - the signal for every lag is one gather from a dense day-indexed table,
+#   giving a (lags, days) array;
+# - per-lag, per-state results are ratios of sums over days, so a bootstrap
+#   replicate is a weighted sum over days and all replicates x lags x states
+#   are a single (resamples, days) @ (days, features) matrix product.
+#
+# Resampling draws whole trade days, or circular blocks of `block`
+# consecutive trade days since sentiment regimes last weeks, from a seeded
+# generator so the table is reproducible. Intervals are percentile intervals,
+# given only for estimates resting on at least MIN_DAYS trade days: a
+# bootstrap over a handful of days yields narrow but meaningless intervals.
+
+SPREAD = 'Greed - Fear'
+DAILY_STATS = ['count', 'pnl_n', 'pnl_sum', 'wins']
+RESAMPLES = 1000
+MIN_DAYS = 30
+
+
+# Per-day sums of the cube statistics, indexed by day
+def daily_stats(cube: pd.DataFrame) -> pd.DataFrame:
+    return cube.groupby('date', sort=True)[DAILY_STATS].sum()
+
+
+# (resamples, n) day weights: multinomial counts for single days, coverage
+# counts of randomly started circular blocks otherwise
+def bootstrap_weights(n: int, resamples: int, block: int = 1, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    if not n:
+        return np.zeros((resamples, 0))
+    if block <= 1:
+        return rng.multinomial(n, np.full(n, 1 / n), size=resamples).astype(np.float64)
+    blocks = -(-n // block)
+    starts = rng.integers(0, n, size=(resamples, blocks))
+    pos = ((starts[:, :, None] + np.arange(block)) % n).reshape(resamples, -1)[:, :n]
+    flat = (np.arange(resamples)[:, None] * n + pos).ravel()
+    return np.bincount(flat, minlength=resamples * n).reshape(resamples, n).astype(np.float64)
+
+
+# Epoch days of the daily index (days without a date are dropped by the cube
+# groupby) and the daily statistics as an array
+def _daily(daily: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    return epoch_days(daily.index), daily[DAILY_STATS].to_numpy(np.float64)
+
+
+def _interval(replicates: np.ndarray, level: float) -> Tuple[np.ndarray, np.ndarray]:
+    alpha = (1 - level) / 2
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # lags/states with no days
+        low, high = np.nanquantile(replicates, [alpha, 1 - alpha], axis=0)
+    return low, high
+
+
+def _ratio(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(den > 0, num / den, np.nan)
+
+
+# Sums for the point estimate (row 0) and every bootstrap replicate
+def _sums(features: np.ndarray, resamples: int, block: int, seed: int) -> np.ndarray:
+    weights = bootstrap_weights(len(features), resamples, block, seed)
+    return np.vstack([features.sum(axis=0, keepdims=True), weights @ features])
+
+
+@profiled('aggregate:sentiment_lags')
+def sentiment_lags(daily: pd.DataFrame, sent: pd.DataFrame, max_lag: int = 14, resamples: int = RESAMPLES,
+                   block: int = 1, level: float = 0.95, seed: int = 0) -> pd.DataFrame:
+    """PnL per trade and win rate by the sentiment `lag` days before each trade day.
+
+    Indexed by (lag, state), states being the sentiments plus the Greed - Fear
+    spread, with the days and trades behind each estimate and its interval.
+    """
+    days, stats = _daily(daily)
+    lags = np.arange(max_lag + 1)
+    codes = SentimentCalendar(sent).codes((days[None, :] - lags[:, None]).ravel()).reshape(len(lags), len(days))
+    states = len(SENTIMENT_ORDER)
+    onehot = (codes[:, :, None] == np.arange(states)).astype(np.float64)  # (lags, days, states)
+    features = np.einsum('lds,dk->dlsk', onehot, stats).reshape(len(days), -1)
+    sums = _sums(features, resamples, block, seed).reshape(-1, len(lags), states, len(DAILY_STATS))
+    count, pnl_n, pnl_sum, wins = (sums[..., i] for i in range(len(DAILY_STATS)))
+    pnl = _ratio(pnl_sum, pnl_n)
+    win = _ratio(wins, count)
+    greed, fear = SENTIMENT_ORDER.index('Greed'), SENTIMENT_ORDER.index('Fear')
+    pnl = np.concatenate([pnl, pnl[..., greed:greed + 1] - pnl[..., fear:fear + 1]], axis=-1)
+    win = np.concatenate([win, win[..., greed:greed + 1] - win[..., fear:fear + 1]], axis=-1)
+    state_days = onehot.sum(axis=1)  # (lags, states)
+    # The spread needs days on both sides; its interval needs MIN_DAYS on each
+    sides = np.minimum(state_days[:, [greed]], state_days[:, [fear]])
+    enough = np.concatenate([state_days, sides], axis=1) >= MIN_DAYS
+    pnl_low, pnl_high = (np.where(enough, bound, np.nan) for bound in _interval(pnl[1:], level))
+    win_low, win_high = (np.where(enough, bound, np.nan) for bound in _interval(win[1:], level))
+    spread_days = np.where(sides > 0, state_days[:, [greed]] + state_days[:, [fear]], 0)
+    spread_trades = np.where(sides > 0, count[0][:, [greed]] + count[0][:, [fear]], 0)
+    state_days = np.concatenate([state_days, spread_days], axis=1)
+    trades = np.concatenate([count[0], spread_trades], axis=1)
+    index = pd.MultiIndex.from_product([lags, list(SENTIMENT_ORDER) + [SPREAD]], names=['lag', 'state'])
+    return pd.DataFrame({
+        'days': state_days.ravel().astype(np.int64), 'trades': trades.ravel().astype(np.int64),
+        'pnl_mean': pnl[0].ravel(), 'pnl_low': pnl_low.ravel(), 'pnl_high': pnl_high.ravel(),
+        'win_rate': win[0].ravel(), 'win_low': win_low.ravel(), 'win_high': win_high.ravel(),
+    }, index=index)
+
+
+# Rolling greed (mean of Fear=0/Neutral=0.5/Greed=1 over `window` index rows,
+# as on the Fear & Greed dashboard) as a dense day table
+def _rolling_table(sent: pd.DataFrame, window: int) -> Tuple[int, np.ndarray]:
+    days = epoch_days(sent['date'])
+    values = sentiment_numbers(sent['sentiment']).rolling(window=window).mean().to_numpy()
+    ok = days != MISSING_DAY
+    days, values = days[ok], values[ok]
+    if not len(days):
+        return 0, np.array([], dtype=np.float64)
+    first = int(days.min())
+    table = np.full(int(days.max()) - first + 1, np.nan)
+    table[days - first] = values
+    return first, table
+
+
+def _corr(n, sx, sy, sxx, syy, sxy) -> np.ndarray:
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = sxy - sx * sy / n
+        var = (sxx - sx ** 2 / n) * (syy - sy ** 2 / n)
+        return np.where((n > 2) & (var > 0), cov / np.sqrt(np.where(var > 0, var, 1)), np.nan)
+
+
+@profiled('aggregate:rolling_greed_lags')
+def rolling_greed_lags(daily: pd.DataFrame, sent: pd.DataFrame, max_lag: int = 14, resamples: int = RESAMPLES,
+                       block: int = 1, level: float = 0.95, seed: int = 0, window: int = WINDOW) -> pd.DataFrame:
+    """Correlation across trade days of the rolling greed `lag` days earlier
+    with the day's PnL per trade and win rate, indexed by lag."""
+    days, stats = _daily(daily)
+    lags = np.arange(max_lag + 1)
+    first, table = _rolling_table(sent, window)
+    pos = days[None, :] - lags[:, None] - first  # (lags, days)
+    inside = (pos >= 0) & (pos < len(table))
+    x = np.where(inside, table[np.clip(pos, 0, len(table) - 1)], np.nan) if len(table) else np.full(pos.shape, np.nan)
+    targets = {'pnl': _ratio(stats[:, 2], stats[:, 1]), 'win': _ratio(stats[:, 3], stats[:, 0])}
+
+    out: Dict[str, np.ndarray] = {'days': None}  # days with both the signal and PnL
+    for name, y in targets.items():
+        valid = np.isfinite(x) & np.isfinite(y)  # (lags, days)
+        xv, yv = np.where(valid, x, 0.0), np.where(valid, y, 0.0)
+        parts = [valid.astype(np.float64), xv, yv, xv * xv, yv * yv, xv * yv]
+        features = np.stack(parts, axis=-1).transpose(1, 0, 2).reshape(len(days), -1)  # (days, lags * parts)
+        sums = _sums(features, resamples, block, seed).reshape(-1, len(lags), len(parts))
+        corr = _corr(*(sums[..., i] for i in range(len(parts))))
+        n = sums[0, :, 0]
+        if name == 'pnl':
+            out['days'] = n.astype(np.int64)
+        out[f'{name}_corr'] = corr[0]
+        out[f'{name}_low'], out[f'{name}_high'] = (np.where(n >= MIN_DAYS, bound, np.nan)
+                                                   for bound in _interval(corr[1:], level))
+    return pd.DataFrame(out, index=pd.Index(lags, name='lag'))
+
+
+# Rows resting on at least MIN_DAYS trade days (rows below it have no interval)
+def testable(table: pd.DataFrame, column: str = 'pnl') -> pd.DataFrame:
+    return table[(table['days'] >= MIN_DAYS) & table[f'{column}_low'].notna() & table[f'{column}_high'].notna()]
+
+
+# Testable lags whose spread (or correlation) interval excludes zero
+def significant(table: pd.DataFrame, column: str = 'pnl') -> pd.DataFrame:
+    table = testable(table, column)
+    return table[(table[f'{column}_low'] > 0) | (table[f'{column}_high'] < 0)]
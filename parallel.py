@@ -0,0 +1,191 @@
+import atexit
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from instrument import profiled
+from schema import SENTIMENT_ORDER
+from streaks import run_lengths
+
+# Per-account / per-coin trader analytics on a process pool.
+#
+# The needed columns are sorted once by (key, time). Below MIN_PARALLEL_ROWS
+# they are reduced in memory; otherwise they are spilled to .npy files in a
+# temporary directory, and workers memory-map those files and each reduces a
+# contiguous range of whole keys, so no DataFrame is pickled on the way in and
+# only small per-key tables come back. Key ranges are fixed by row counts and
+# results are concatenated in range order, so the output does not depend on
+# worker scheduling. The pool is started once per process and reused, since
+# spawning workers costs seconds while the per-key reductions are fast.
+
+WORKERS = int(os.environ.get('EDA_WORKERS', '0')) or os.cpu_count() or 1
+MIN_PARALLEL_ROWS = 2_000_000  # below this, one process reduces faster than the pool round trip
+TASKS_PER_WORKER = 4
+SPILL_COLS = ['key', 'pnl', 'fee', 'size', 'sentiment']
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown()
+            # Spawn rather than fork: Streamlit's server process is multi-threaded
+            _pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'))
+            _pool_workers = workers
+        return _pool
+
+
+@atexit.register
+def shutdown() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+def _spill(columns: Dict[str, np.ndarray], path: str) -> None:
+    for name, values in columns.items():
+        np.save(os.path.join(path, f'{name}.npy'), values)
+
+
+# Row ranges that split sorted keys into about `tasks` row-balanced pieces,
+# never cutting through a key
+def _row_ranges(bounds: np.ndarray, tasks: int) -> List[Tuple[int, int]]:
+    n = int(bounds[-1])
+    targets = np.linspace(0, n, max(tasks, 1) + 1)
+    cuts = np.unique(bounds[np.searchsorted(bounds, targets)])
+    return [(int(lo), int(hi)) for lo, hi in zip(cuts[:-1], cuts[1:]) if hi > lo]
+
+
+def _partition_stats(cols: Dict[str, np.ndarray], lo: int, hi: int,
+                     n_sentiments: int) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    cols = {name: np.asarray(cols[name][lo:hi]) for name in SPILL_COLS}
+    first = int(cols['key'][0])
+    k = cols['key'] - first
+    m = int(k[-1]) + 1
+    pnl = cols['pnl']
+    has_pnl = ~np.isnan(pnl)
+    pnl0 = np.where(has_pnl, pnl, 0)
+    win = pnl > 0
+
+    stats = pd.DataFrame({
+        'trades': np.bincount(k, minlength=m),
+        'pnl': np.bincount(k, weights=pnl0, minlength=m),
+        'pnl_n': np.bincount(k, weights=has_pnl, minlength=m),
+        'wins': np.bincount(k, weights=win, minlength=m),
+        'fees': np.bincount(k, weights=np.nan_to_num(cols['fee']), minlength=m),
+        'volume': np.bincount(k, weights=np.nan_to_num(cols['size']), minlength=m),
+    }, index=pd.RangeIndex(first, first + m, name='key'))
+
+    # Rows are already in time order within each key
+    runs = run_lengths(win, groups=k)
+    longest = pd.Series(runs.length).groupby([runs.group.astype(np.int64), runs.type.astype(bool)]).max()
+    longest = longest.unstack().reindex(index=range(m), columns=[True, False]).fillna(0)
+    stats['max_win_streak'] = longest[True].to_numpy(np.int64)
+    stats['max_loss_streak'] = longest[False].to_numpy(np.int64)
+
+    s = cols['sentiment'].astype(np.int64)
+    ok = s >= 0
+    cell = k[ok] * n_sentiments + s[ok]
+    size = m * n_sentiments
+    by_sentiment = pd.DataFrame({
+        'trades': np.bincount(cell, minlength=size),
+        'pnl': np.bincount(cell, weights=pnl0[ok], minlength=size),
+        'pnl_n': np.bincount(cell, weights=has_pnl[ok], minlength=size),
+        'wins': np.bincount(cell, weights=win[ok], minlength=size),
+    }, index=pd.MultiIndex.from_product([range(first, first + m), range(n_sentiments)],
+                                        names=['key', 'sentiment']))
+    return stats, by_sentiment[by_sentiment['trades'] > 0]
+
+
+# Worker entry point: the same reduction over the memory-mapped spill
+def _spilled_partition_stats(path: str, lo: int, hi: int, n_sentiments: int) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    cols = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r') for name in SPILL_COLS}
+    return _partition_stats(cols, lo, hi, n_sentiments)
+
+
+def _partition_stats_empty() -> Tuple[pd.DataFrame, pd.DataFrame]:
+    stats = pd.DataFrame({c: pd.Series(dtype=np.float64) for c in
+                          ['trades', 'pnl', 'pnl_n', 'wins', 'fees', 'volume', 'max_win_streak', 'max_loss_streak']},
+                         index=pd.Index([], dtype=np.int64, name='key'))
+    by_sentiment = pd.DataFrame({c: pd.Series(dtype=np.float64) for c in ['trades', 'pnl', 'pnl_n', 'wins']},
+                                index=pd.MultiIndex.from_arrays([np.array([], dtype=np.int64)] * 2,
+                                                                names=['key', 'sentiment']))
+    return stats, by_sentiment
+
+
+def _finish(stats: pd.DataFrame) -> pd.DataFrame:
+    with np.errstate(invalid='ignore', divide='ignore'):
+        stats['pnl_mean'] = stats['pnl'] / stats.pop('pnl_n')
+        stats['win_rate'] = stats['wins'] / stats['trades']
+    return stats.drop(columns='wins')
+
+
+@profiled('aggregate:trader_stats')
+def trader_stats(df: pd.DataFrame, by: str = 'Account', sentiment: str = 'sentiment',
+                 workers: Optional[int] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Per-`by` leaderboard and per-(`by`, sentiment) performance tables.
+
+    The leaderboard has trades, total/mean PnL, win rate, fees, volume and
+    the longest win/loss streaks (in time order); the sentiment table has
+    trades, total/mean PnL and win rate per sentiment.
+    """
+    workers = workers or WORKERS
+    codes, labels = pd.factorize(df[by], sort=True)
+    keep = np.flatnonzero(codes >= 0)
+    times = df['Timestamp IST'].to_numpy('datetime64[ns]').astype(np.int64)[keep]
+    order = keep[np.lexsort((times, codes[keep]))]
+    key = codes[order].astype(np.int32)
+    sentiments = pd.Categorical(df[sentiment], categories=SENTIMENT_ORDER).codes[order]
+    columns = {
+        'key': key,
+        'pnl': df['Closed PnL'].to_numpy(np.float64, na_value=np.nan)[order],
+        'fee': df['Fee'].to_numpy(np.float64, na_value=np.nan)[order],
+        'size': df['Size USD'].to_numpy(np.float64, na_value=np.nan)[order],
+        'sentiment': sentiments.astype(np.int8),
+    }
+    bounds = np.searchsorted(key, np.arange(len(labels) + 1))
+    parallel = workers > 1 and len(key) >= MIN_PARALLEL_ROWS
+    ranges = _row_ranges(bounds, workers * TASKS_PER_WORKER if parallel else 1)
+
+    n_sentiments = len(SENTIMENT_ORDER)
+    if parallel:
+        with tempfile.TemporaryDirectory(prefix='eda-partitions-') as path:
+            _spill(columns, path)
+            del columns
+            los, his = [r[0] for r in ranges], [r[1] for r in ranges]
+            results = list(_get_pool(workers).map(_spilled_partition_stats, repeat(path), los, his,
+                                                  repeat(n_sentiments)))
+    else:
+        results = [_partition_stats(columns, lo, hi, n_sentiments) for lo, hi in ranges]
+
+    if results:
+        stats = pd.concat([r[0] for r in results])
+        by_sentiment = pd.concat([r[1] for r in results])
+    else:
+        stats, by_sentiment = _partition_stats_empty()
+    stats.index = pd.Index(np.asarray(labels)[stats.index], name=by)
+    by_sentiment.index = pd.MultiIndex.from_arrays([
+        pd.Index(np.asarray(labels)[by_sentiment.index.get_level_values('key')], name=by),
+        pd.CategoricalIndex(pd.Categorical.from_codes(by_sentiment.index.get_level_values('sentiment'),
+                                                      SENTIMENT_ORDER), name='sentiment'),
+    ])
+    return _finish(stats), _finish(by_sentiment)
+
+
+# Top `n` rows of a leaderboard by `metric` (ties broken by key)
+def leaderboard(stats: pd.DataFrame, metric: str = 'pnl', n: int = 20) -> pd.DataFrame:
+    return stats.sort_values(metric, ascending=False, kind='stable').head(n)
@@ -0,0 +1,38 @@
+from typing import Optional
+
+import pandas as pd
+
+from schema import compact_sentiment, compact_trades
+from timestamps import normalize_sentiment, normalize_trades
+
+# Numeric trade columns that are coerced on load
+NUM_COLS = ['Execution Price', 'Size Tokens', 'Size USD', 'Closed PnL', 'Fee']
+
+# Map raw classifications to simplified sentiment categories
+SENTIMENT_MAP = {'extreme fear': 'Fear', 'fear': 'Fear',
+                 'extreme greed': 'Greed', 'greed': 'Greed',
+                 'neutral': 'Neutral'}
+
+
+# Clean raw trade history (historical_data.csv); columns absent from a
+# partial read (e.g. chunked ingestion with usecols) are skipped. Pass
+# `formats` to pin timestamp formats across chunks. The timestamp parse
+# report (see timestamps.py) is kept in df.attrs['timestamps'].
+def clean_trades(df: pd.DataFrame, formats: Optional[dict] = None) -> pd.DataFrame:
+    df.columns = df.columns.str.strip()
+    df.attrs['timestamps'] = normalize_trades(df, formats)
+    for col in NUM_COLS:
+        if col in df:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    if 'Side' in df:
+        df['Side'] = df['Side'].str.upper()
+    return compact_trades(df)
+
+
+# Clean raw Fear & Greed index (fear_greed_index.csv)
+def clean_sentiment(df: pd.DataFrame) -> pd.DataFrame:
+    df.columns = df.columns.str.lower()
+    df.attrs['timestamps'] = normalize_sentiment(df)
+    df['classification'] = df['classification'].str.lower()
+    df['sentiment'] = df['classification'].map(SENTIMENT_MAP)
+    return compact_sentiment(df)
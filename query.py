@@ -0,0 +1,139 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from align import MISSING_DAY, epoch_days
+from schema import group_codes
+
+# Row selection for the dashboard filters.
+#
+# TradeIndex is built once per frame. Each filterable column is reduced to
+# integer codes, then indexed either as one packed bitmap per value (1 bit per
+# row, for columns with at most BITMAP_MAX_VALUES values) or as posting lists
+# (row numbers grouped by value, for high-cardinality columns such as
+# accounts). Dates get a sorted day index, or none at all when the frame is
+# already in date order, so a range is two binary searches. A query ORs the
+# wanted values of each column, ANDs the columns and the date range as packed
+# bits and returns row positions; string columns are never scanned again.
+# Recent selections are kept in a small LRU.
+
+BITMAP_MAX_VALUES = 64
+MAX_SELECTIONS = 16
+
+
+# Boolean mask of rows whose value is in `wanted`, by category code lookup
+def value_mask(values: pd.Series, wanted: Sequence) -> np.ndarray:
+    codes, categories = group_codes(values)
+    table = np.zeros(len(categories) + 1, dtype=bool)  # last slot: missing (-1)
+    wanted = set(wanted)
+    table[[i for i, c in enumerate(categories) if c in wanted]] = True
+    return table[codes]
+
+
+class TradeIndex:
+    def __init__(self, df: pd.DataFrame, columns: Sequence[str] = ('Coin', 'Account', 'Side', 'sentiment'),
+                 date_column: str = 'date'):
+        self.rows = len(df)
+        self.values: Dict[str, List] = {}
+        self.value_counts: Dict[str, np.ndarray] = {}
+        self.bitmaps: Dict[str, np.ndarray] = {}  # column -> (values, ceil(rows / 8)) uint8
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}  # column -> (row order, value bounds)
+        for col in columns:
+            if col not in df:
+                continue
+            codes, values = group_codes(df[col])
+            self.values[col] = values
+            self.value_counts[col] = np.bincount(codes[codes >= 0], minlength=len(values))
+            if len(values) <= BITMAP_MAX_VALUES:
+                self.bitmaps[col] = np.stack([np.packbits(codes == i) for i in range(len(values))]) \
+                    if values else np.zeros((0, (self.rows + 7) // 8), dtype=np.uint8)
+            else:
+                order = np.argsort(codes, kind='stable').astype(np.int64)
+                bounds = np.searchsorted(codes[order], np.arange(-1, len(values) + 1))
+                self.postings[col] = (order, bounds)
+        self.days = epoch_days(df[date_column]) if date_column in df else None
+        self.day_order = None
+        if self.days is not None and len(self.days) and (np.diff(self.days) < 0).any():
+            self.day_order = np.argsort(self.days, kind='stable')
+            self.days = self.days[self.day_order]
+        self._selections: 'OrderedDict[Hashable, Optional[np.ndarray]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    # Row counts per value, most frequent first
+    def counts(self, column: str) -> pd.Series:
+        counts = pd.Series(self.value_counts[column], index=self.values[column], dtype='int64')
+        return counts.sort_values(ascending=False, kind='stable')
+
+    def date_bounds(self) -> Optional[Tuple[pd.Timestamp, pd.Timestamp]]:
+        valid = self.days[self.days != MISSING_DAY] if self.days is not None else []
+        if not len(valid):
+            return None
+        return tuple(pd.Timestamp(int(d), unit='D') for d in (valid.min(), valid.max()))
+
+    def _value_bits(self, column: str, wanted: Sequence) -> np.ndarray:
+        values = self.values.get(column)
+        if values is None:
+            raise KeyError(f"Column {column!r} is not indexed")
+        wanted = set(wanted)
+        ids = [i for i, v in enumerate(values) if v in wanted]
+        if column in self.bitmaps:
+            if not ids:
+                return np.zeros(self.bitmaps[column].shape[1], dtype=np.uint8)
+            return np.bitwise_or.reduce(self.bitmaps[column][ids], axis=0)
+        order, bounds = self.postings[column]
+        mask = np.zeros(self.rows, dtype=bool)
+        for i in ids:
+            mask[order[bounds[i + 1]:bounds[i + 2]]] = True
+        return np.packbits(mask)
+
+    def _date_bits(self, start, end) -> np.ndarray:
+        lo_day = MISSING_DAY + 1 if start is None else int(epoch_days([start])[0])
+        hi_day = np.iinfo(np.int64).max if end is None else int(epoch_days([end])[0])
+        lo, hi = np.searchsorted(self.days, lo_day, 'left'), np.searchsorted(self.days, hi_day, 'right')
+        mask = np.zeros(self.rows, dtype=bool)
+        if self.day_order is None:
+            mask[lo:hi] = True
+        else:
+            mask[self.day_order[lo:hi]] = True
+        return np.packbits(mask)
+
+    def select(self, filters: Optional[Dict[str, Sequence]] = None,
+               dates: Optional[Tuple] = None) -> Optional[np.ndarray]:
+        """Row positions matching every filter, or None when nothing is filtered.
+
+        `filters` maps an indexed column to the values to keep (None or empty
+        keeps all); `dates` is an inclusive (start, end) day range, either end
+        None for open.
+        """
+        filters = {col: tuple(v) for col, v in (filters or {}).items() if v}
+        if dates is not None and all(d is None for d in dates):
+            dates = None
+        if not filters and dates is None:
+            return None
+        key = (tuple(sorted((col, tuple(sorted(map(str, v)))) for col, v in filters.items())),
+               None if dates is None else tuple(None if d is None else str(pd.Timestamp(d).date()) for d in dates))
+        with self._lock:
+            if key in self._selections:
+                self._selections.move_to_end(key)
+                self.stats['hits'] += 1
+                return self._selections[key]
+            self.stats['misses'] += 1
+
+        bits = None
+        for col, wanted in filters.items():
+            col_bits = self._value_bits(col, wanted)
+            bits = col_bits if bits is None else bits & col_bits
+        if dates is not None and self.days is not None:
+            date_bits = self._date_bits(*dates)
+            bits = date_bits if bits is None else bits & date_bits
+        rows = np.flatnonzero(np.unpackbits(bits, count=self.rows)) if bits is not None else None
+
+        with self._lock:
+            self._selections[key] = rows
+            while len(self._selections) > MAX_SELECTIONS:
+                self._selections.popitem(last=False)
+        return rows
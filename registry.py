@@ -0,0 +1,86 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, NamedTuple, Optional, Sequence
+
+from instrument import timed
+from sections import Section
+
+# Lazy, memoized dashboard sections.
+#
+# Each section declares the named inputs it needs (e.g. 'agg', 'df', 'state')
+# and a compute function; a page registers its input providers and renders
+# only the sections the user picked. Inputs are resolved on first use within
+# a run, so a section that needs only the aggregates never loads the trade
+# frame, and computed Sections are kept in a small process-wide LRU keyed on
+# the page's data token and the section's options.
+
+MAX_SECTIONS = 32
+ALL_SECTIONS = 'All sections'
+
+_memo: 'OrderedDict[tuple, Section]' = OrderedDict()
+_lock = threading.Lock()
+stats = {'hits': 0, 'misses': 0}
+
+
+class SectionSpec(NamedTuple):
+    id: str
+    label: str
+    inputs: Sequence[str]
+    compute: Callable[..., Section]  # called with the inputs in order, plus options
+    # Creates the section's widgets from its inputs and returns the options
+    controls: Optional[Callable[..., Dict[str, Any]]] = None
+
+
+class Registry:
+    def __init__(self, name: str, specs: List[SectionSpec], providers: Dict[str, Callable[[], Any]],
+                 token: Hashable = None):
+        self.name = name
+        self.specs = specs
+        self.providers = providers
+        self.token = token  # changes whenever the underlying data does
+        self._resolved = {}
+
+    def labels(self) -> List[str]:
+        return [spec.label for spec in self.specs]
+
+    def resolve(self, name: str) -> Any:
+        if name not in self._resolved:
+            self._resolved[name] = self.providers[name]()
+        return self._resolved[name]
+
+    def compute(self, spec: SectionSpec, **options) -> Section:
+        key = (self.name, self.token, spec.id, tuple(sorted((k, repr(v)) for k, v in options.items())))
+        with _lock:
+            section = _memo.get(key)
+            if section is not None:
+                _memo.move_to_end(key)
+                stats['hits'] += 1
+                return section
+            stats['misses'] += 1
+        inputs = [self.resolve(name) for name in spec.inputs]
+        with timed(f'section:{self.name}/{spec.id}'):
+            section = spec.compute(*inputs, **options)
+        with _lock:
+            _memo[key] = section
+            while len(_memo) > MAX_SECTIONS:
+                _memo.popitem(last=False)
+        return section
+
+    # Render one section in Streamlit, widgets included
+    def show(self, spec: SectionSpec) -> None:
+        import streamlit as st
+        from sections import show_section
+        head = st.container()
+        options = spec.controls(*[self.resolve(name) for name in spec.inputs]) if spec.controls else {}
+        show_section(self.compute(spec, **options), head=head)
+
+    # Render the sections picked in `selected` (a label, or ALL_SECTIONS)
+    def show_selected(self, selected: str) -> None:
+        for spec in self.specs:
+            if selected in (ALL_SECTIONS, spec.label):
+                self.show(spec)
+
+
+def clear() -> None:
+    with _lock:
+        _memo.clear()
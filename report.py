@@ -0,0 +1,233 @@
+import argparse
+import html
+import json
+import multiprocessing
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import matplotlib
+matplotlib.use('Agg')
+
+import fg_sections
+import trade_sections
+from align import align_sentiment
+from data_cache import cached_frame
+from figcache import render_png
+from ingest import TradeAggregates
+from parallel import WORKERS
+from preprocess import clean_sentiment, clean_trades
+from sections import Figure, Info, Section, Table, Text, section_json, section_key
+from sentiment_state import refresh
+
+# Headless batch reports: every dashboard section rendered to static files
+# without a Streamlit server.
+#
+#   python report.py --out reports --subsets subsets.json
+#
+# subsets.json maps a report name to a list of accounts, e.g.
+# {"desk-a": ["0xabc...", "0xdef..."]}; without it a single "all" report is
+# written. Each report directory gets index.html, one PNG per chart and one
+# JSON file per section, plus a manifest of section hashes: sections whose
+# inputs are unchanged since the last run are not rewritten.
+#
+# Data is loaded once. Subsets are rendered on a process pool forked after
+# loading, so workers share the loaded frames instead of reloading them.
+
+REPORT_VERSION = 1
+MANIFEST = 'manifest.json'
+PAGE_STYLE = """
+body { font-family: sans-serif; max-width: 960px; margin: 2em auto; padding: 0 1em; }
+img { max-width: 100%; }
+table { border-collapse: collapse; font-size: 0.85em; }
+td, th { border: 1px solid #ddd; padding: 2px 6px; text-align: right; }
+.info { background: #e8f0fe; border-radius: 4px; padding: 0.6em 1em; margin: 0.8em 0; }
+"""
+
+# Loaded once in the parent; forked workers inherit it
+_data = {}
+
+
+def load_data(trades_path: str, sentiment_path: str, lag: int = 0, asof: bool = False) -> None:
+    sent = cached_frame(sentiment_path, clean_sentiment)
+    df = cached_frame(trades_path, clean_trades)
+    df['sentiment'] = align_sentiment(df['date'], sent, lag=lag, asof=asof)
+    _data.update(trades=df, sent=sent, state=refresh(sentiment_path))
+
+
+# Just enough markdown for the section texts: headings, bullets and bold
+def _markdown(text: str) -> str:
+    out, in_list = [], False
+    for line in text.strip().splitlines():
+        line = re.sub(r'\*\*(.+?)\*\*', r'<b>\1</b>', html.escape(line.strip()))
+        if line.startswith('- '):
+            if not in_list:
+                out.append('<ul>')
+                in_list = True
+            out.append(f'<li>{line[2:]}</li>')
+            continue
+        if in_list:
+            out.append('</ul>')
+            in_list = False
+        if line.startswith('#'):
+            level = len(line) - len(line.lstrip('#'))
+            out.append(f'<h{level}>{line.lstrip("#").strip()}</h{level}>')
+        elif line:
+            out.append(f'<p>{line}</p>')
+    if in_list:
+        out.append('</ul>')
+    return '\n'.join(out)
+
+
+def _figure_file(section: Section, figure: Figure) -> str:
+    return f'{section.id}-{figure.name}.png'
+
+
+def _section_html(section: Section) -> str:
+    parts = [f'<h2 id="{section.id}">{html.escape(section.title)}</h2>']
+    for block in section.blocks:
+        if isinstance(block, Text):
+            parts.append(_markdown(block.text))
+        elif isinstance(block, Info):
+            parts.append(f'<div class="info">{html.escape(block.text)}</div>')
+        elif isinstance(block, Figure):
+            parts.append(f'<img src="{_figure_file(section, block)}" alt="{html.escape(block.name)}">')
+        elif isinstance(block, Table):
+            frame = block.frame.style.format(block.fmt).to_html() if block.fmt else block.frame.to_html()
+            parts.append(frame)
+    return '\n'.join(parts)
+
+
+def _write(path: str, data, mode: str = 'w') -> None:
+    tmp = path + '.tmp'
+    with open(tmp, mode, **({} if 'b' in mode else {'encoding': 'utf-8'})) as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def write_report(out_dir: str, title: str, sections: List[Section]) -> int:
+    """Write `sections` under `out_dir`, skipping unchanged ones.
+
+    Returns the number of sections (re)written.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    try:
+        with open(os.path.join(out_dir, MANIFEST)) as f:
+            old = json.load(f)
+    except (OSError, ValueError):
+        old = {}
+    if old.get('version') != REPORT_VERSION:
+        old = {}
+    keys, written = {}, 0
+    for section in sections:
+        key = section_key(section)
+        keys[section.id] = key
+        files = [f'{section.id}.json'] + [_figure_file(section, b) for b in section.blocks if isinstance(b, Figure)]
+        if old.get('sections', {}).get(section.id) == key and \
+                all(os.path.exists(os.path.join(out_dir, f)) for f in files):
+            continue
+        for block in section.blocks:
+            if isinstance(block, Figure):
+                png = render_png(block.draw, *block.args)
+                _write(os.path.join(out_dir, _figure_file(section, block)), png, 'wb')
+        _write(os.path.join(out_dir, f'{section.id}.json'), json.dumps(section_json(section), indent=1, default=str, ensure_ascii=False))
+        written += 1
+
+    index = os.path.join(out_dir, 'index.html')
+    if written or list(keys) != list(old.get('sections', {})) or not os.path.exists(index):
+        body = '\n'.join(_section_html(s) for s in sections)
+        _write(index, f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>{html.escape(title)}</title>'
+                      f'<style>{PAGE_STYLE}</style></head>\n<body>\n<h1>{html.escape(title)}</h1>\n{body}\n</body></html>\n')
+    _write(os.path.join(out_dir, MANIFEST), json.dumps({'version': REPORT_VERSION, 'sections': keys}, indent=1))
+    return written
+
+
+def render_fear_greed(out_root: str) -> Tuple[str, int, int]:
+    sections = fg_sections.all_sections(_data['state'])
+    written = write_report(os.path.join(out_root, 'fear_greed'), 'Fear & Greed Index', sections)
+    return 'fear_greed', written, len(sections)
+
+
+def render_trades(out_root: str, name: str, accounts: Optional[List[str]]) -> Tuple[str, int, int]:
+    df = _data['trades']
+    subset = df if accounts is None else df[df['Account'].isin(accounts)]
+    report = f'trades-{name}'
+    if not len(subset):
+        return report, 0, 0
+    agg = TradeAggregates().update(subset)
+    # Subsets already run in parallel, so the leaderboard is reduced in-process
+    sections = trade_sections.all_sections(agg, subset, workers=1, sent=_data['sent'])
+    written = write_report(os.path.join(out_root, report), f'Trade History & Market Sentiment: {name}', sections)
+    return report, written, len(sections)
+
+
+def _render(out_root: str, task: Tuple[str, Optional[List[str]]]) -> Tuple[str, int, int]:
+    name, accounts = task
+    return render_fear_greed(out_root) if name is None else render_trades(out_root, name, accounts)
+
+
+def _safe_name(name: str) -> str:
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', name).strip('._') or 'subset'
+
+
+def load_subsets(path: Optional[str]) -> Dict[str, Optional[List[str]]]:
+    if path is None:
+        return {'all': None}
+    with open(path) as f:
+        subsets = json.load(f)
+    out: Dict[str, Optional[List[str]]] = {}
+    names: Dict[str, str] = {}
+    for name, accounts in subsets.items():
+        safe = _safe_name(name)
+        if safe in names:
+            raise ValueError(f"Subsets {names[safe]!r} and {name!r} would both be written to trades-{safe}")
+        names[safe] = name
+        out[safe] = list(accounts)
+    return out
+
+
+def run(out_root: str, subsets: Dict[str, Optional[List[str]]], workers: int = WORKERS) -> List[Tuple[str, int, int]]:
+    tasks = [(None, None)] + list(subsets.items())
+    os.makedirs(out_root, exist_ok=True)
+    if workers > 1 and len(tasks) > 1 and 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(min(workers, len(tasks)), mp_context=context) as pool:
+            results = list(pool.map(_render, [out_root] * len(tasks), tasks))
+    else:
+        results = [_render(out_root, task) for task in tasks]
+
+    links = '\n'.join(f'<li><a href="{name}/index.html">{name}</a></li>' for name, _, total in results if total)
+    _write(os.path.join(out_root, 'index.html'),
+           f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>Reports</title></head>\n'
+           f'<body>\n<h1>Reports</h1>\n<ul>\n{links}\n</ul>\n</body></html>\n')
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Render the dashboards to static HTML/PNG/JSON reports.")
+    parser.add_argument('--out', default='reports', help="output directory (default: reports)")
+    parser.add_argument('--subsets', help="JSON file mapping report names to lists of accounts")
+    parser.add_argument('--trades', default='historical_data.csv')
+    parser.add_argument('--sentiment', default='fear_greed_index.csv')
+    parser.add_argument('--previous-day', action='store_true',
+                        help="match trades to the previous day's index (no look-ahead)")
+    parser.add_argument('--workers', type=int, default=WORKERS)
+    args = parser.parse_args(argv)
+    try:
+        subsets = load_subsets(args.subsets)
+    except ValueError as e:
+        parser.error(str(e))
+
+    load_data(args.trades, args.sentiment, *((1, True) if args.previous_day else (0, False)))
+    for report, written, total in run(args.out, subsets, args.workers):
+        if total:
+            print(f'{report}: {written}/{total} sections written')
+        else:
+            print(f'{report}: no trades, skipped')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
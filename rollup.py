@@ -0,0 +1,133 @@
+from typing import List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+# Sentiment x coin x side x day rollup cube.
+#
+# One groupby pass reduces the trades to sufficient statistics per
+# (date, Coin, Side, sentiment) cell. Cubes from different chunks merge by
+# combining cells, and every summary panel (counts, fees, PnL mean/std, win
+# rate, volume) is a combination over cells followed by a little arithmetic,
+# so drill-downs such as "win rate by sentiment for BTC" never touch the raw
+# trades.
+#
+# Everything is a plain sum except pnl_m2, the sum of squared deviations from
+# the cell's mean PnL. Cells combine with the pairwise update of Chan et al.,
+# M2 = sum(M2_i) + sum(n_i * (mean_i - mean)^2), rather than from a sum of
+# squares, which cancels catastrophically when the mean is large against the
+# spread.
+
+CUBE_KEYS = ['date', 'Coin', 'Side', 'sentiment']
+CUBE_STATS = ['count', 'pnl_n', 'pnl_sum', 'pnl_m2', 'wins', 'fees', 'volume']
+# Keys kept categorical, as in the cleaned frame (see schema.py), so grouping
+# works on integer codes
+CATEGORY_KEYS = ['Coin', 'Side', 'sentiment']
+
+
+def empty_cube() -> pd.DataFrame:
+    cube = pd.DataFrame({k: pd.Series(dtype='category') for k in CATEGORY_KEYS})
+    cube.insert(0, 'date', pd.Series(dtype='datetime64[ns]'))
+    for col in CUBE_STATS:
+        cube[col] = pd.Series(dtype=np.float64)
+    return cube
+
+
+# Combine the rows of `stats` per group of `by`: sums, and pnl_m2 about each
+# group's mean. ngroup numbers groups in result order, so the spread term
+# lines up with the summed rows.
+def _combine(stats: pd.DataFrame, by, **groupby) -> pd.DataFrame:
+    grouped = stats.groupby(by, observed=True, sort=False, **groupby)
+    out = grouped[CUBE_STATS].sum()
+    codes = grouped.ngroup().fillna(-1).to_numpy(np.int64)
+    ok = codes >= 0
+    n, total = stats['pnl_n'].to_numpy()[ok], stats['pnl_sum'].to_numpy()[ok]
+    codes = codes[ok]
+    group_n, group_sum = out['pnl_n'].to_numpy(), out['pnl_sum'].to_numpy()
+    group_mean = group_sum / np.where(group_n > 0, group_n, 1)
+    mean = total / np.where(n > 0, n, 1)
+    out['pnl_m2'] += np.bincount(codes, weights=n * (mean - group_mean[codes]) ** 2, minlength=len(out))
+    return out
+
+
+def build_cube(df: pd.DataFrame, sentiment: Optional[pd.Series] = None) -> pd.DataFrame:
+    pnl = df['Closed PnL'].astype(np.float64)
+    keys = pd.DataFrame({
+        'date': df['date'] if 'date' in df else df['Timestamp IST'].dt.normalize(),
+        'Coin': df['Coin'].astype('category'),
+        'Side': df['Side'].astype('category'),
+        'sentiment': (df['sentiment'] if sentiment is None else sentiment).astype('category'),
+    })
+    vals = pd.DataFrame({
+        'count': 1.0,
+        'pnl_n': pnl.notna().astype(np.float64),
+        'pnl_sum': pnl.fillna(0),
+        'pnl_m2': 0.0,
+        'wins': (pnl > 0).astype(np.float64),
+        'fees': df['Fee'].astype(np.float64).fillna(0),
+        'volume': df['Size USD'].astype(np.float64).fillna(0),
+    }, index=df.index)
+    return _combine(vals, [keys[k] for k in CUBE_KEYS], dropna=False).reset_index()
+
+
+# Chunks may have seen different coins; give every cube the union of the
+# categories so concatenation keeps the keys categorical
+def _unify_categories(cubes: List[pd.DataFrame]) -> List[pd.DataFrame]:
+    out = [c.copy(deep=False) for c in cubes]
+    for key in CATEGORY_KEYS:
+        categories = pd.Index([])
+        for c in out:
+            categories = categories.append(c[key].cat.categories.difference(categories, sort=False))
+        for c in out:
+            if not c[key].cat.categories.equals(categories):
+                c[key] = c[key].cat.set_categories(categories)
+    return out
+
+
+def merge_cubes(*cubes: pd.DataFrame) -> pd.DataFrame:
+    cubes = [c for c in cubes if len(c)]
+    if not cubes:
+        return empty_cube()
+    if len(cubes) == 1:
+        return cubes[0]
+    merged = pd.concat(_unify_categories(cubes), ignore_index=True)
+    return _combine(merged, CUBE_KEYS, dropna=False).reset_index()
+
+
+# Restrict a cube to cells matching every filter, e.g. Coin='BTC' or
+# Coin=['BTC', 'ETH']
+def slice_cube(cube: pd.DataFrame, **filters) -> pd.DataFrame:
+    mask = np.ones(len(cube), dtype=bool)
+    for key, value in filters.items():
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        mask &= cube[key].isin(values).to_numpy()
+    return cube[mask]
+
+
+# Combine statistics over the cells of each `by` group (NaN keys dropped).
+# Only observed groups are kept, labelled by plain values sorted by value, as
+# the panels and charts expect.
+def rollup(cube: pd.DataFrame, by: Union[str, List[str]]) -> pd.DataFrame:
+    out = _combine(cube, by)
+    if isinstance(out.index, pd.CategoricalIndex):
+        out.index = out.index.astype(object)
+    elif isinstance(out.index, pd.MultiIndex):
+        out.index = out.index.set_levels([lvl.astype(object) if isinstance(lvl, pd.CategoricalIndex) else lvl
+                                          for lvl in out.index.levels])
+    return out.sort_index()
+
+
+# Mean/std/win rate from summed statistics
+def summarize(stats: pd.DataFrame) -> pd.DataFrame:
+    n = stats['pnl_n']
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = stats['pnl_sum'] / n
+        var = stats['pnl_m2'] / (n - 1)
+        return pd.DataFrame({
+            'count': stats['count'].astype(np.int64),
+            'pnl_mean': mean.where(n > 0),
+            'pnl_std': np.sqrt(var).where(n > 1),
+            'win_rate': stats['wins'] / stats['count'],
+            'fees': stats['fees'],
+            'volume': stats['volume'],
+        })
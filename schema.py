@@ -0,0 +1,61 @@
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Compact in-memory layout for the cleaned frames.
+#
+# Low-cardinality strings become `category` (integer codes + one copy of each
+# label), trade days become a normalized datetime64 column instead of Python
+# `date` objects, and numeric columns are downcast only when the round trip is
+# exact, so no aggregate changes value.
+
+SENTIMENT_ORDER = ['Fear', 'Neutral', 'Greed']
+CLASSIFICATION_ORDER = ['extreme fear', 'fear', 'neutral', 'greed', 'extreme greed']
+
+TRADE_CATEGORIES = ['Account', 'Coin', 'Side', 'Direction']
+SENTIMENT_CATEGORIES = {'sentiment': SENTIMENT_ORDER, 'classification': CLASSIFICATION_ORDER}
+
+
+# Downcast a numeric column only if every value survives the round trip
+def downcast(s: pd.Series) -> pd.Series:
+    if s.dtype.kind in 'iu':
+        return pd.to_numeric(s, downcast='integer' if s.dtype.kind == 'i' else 'unsigned')
+    if s.dtype == np.float64:
+        small = s.astype(np.float32)
+        if np.array_equal(small.to_numpy(np.float64), s.to_numpy(), equal_nan=True):
+            return small
+    return s
+
+
+def compact_trades(df: pd.DataFrame) -> pd.DataFrame:
+    for col in TRADE_CATEGORIES:
+        if col in df and df[col].dtype == object:
+            df[col] = df[col].astype('category')
+    for col in df.columns:
+        if df[col].dtype.kind in 'iuf':
+            df[col] = downcast(df[col])
+    if 'Timestamp IST' in df:
+        df['date'] = df['Timestamp IST'].dt.normalize()
+    return df
+
+
+def compact_sentiment(df: pd.DataFrame) -> pd.DataFrame:
+    for col, categories in SENTIMENT_CATEGORIES.items():
+        if col in df:
+            df[col] = pd.Categorical(df[col], categories=categories)
+    return df
+
+
+# Integer group codes (-1 for missing) and their labels, read straight from
+# a categorical's codes so its strings are never materialized per row
+def group_codes(values: pd.Series) -> Tuple[np.ndarray, List]:
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), list(values.cat.categories)
+    codes, uniques = pd.factorize(values)
+    return codes, list(uniques)
+
+
+# Per-column memory in bytes (deep, so object strings are counted)
+def memory_report(df: pd.DataFrame) -> pd.Series:
+    return df.memory_usage(deep=True, index=False)
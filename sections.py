@@ -0,0 +1,107 @@
+import hashlib
+import json
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Union
+
+import pandas as pd
+
+from figcache import figure_key
+
+# Dashboard sections as plain data.
+#
+# A section function computes everything a dashboard section shows and
+# returns it as a Section: a title plus an ordered list of blocks (markdown
+# text, figures, tables and insight boxes). The Streamlit pages render
+# sections with show_section(); report.py renders the same sections to
+# static HTML/PNG/JSON without a Streamlit server.
+
+LOW_MEMORY_NOTE = "This section needs individual trades and is skipped in low-memory mode (EDA_LOW_MEMORY=1)."
+
+
+class Text(NamedTuple):
+    text: str  # markdown
+
+
+class Info(NamedTuple):
+    text: str
+
+
+class Figure(NamedTuple):
+    name: str
+    draw: Callable
+    args: tuple = ()
+
+
+class Table(NamedTuple):
+    name: str
+    frame: pd.DataFrame
+    fmt: Optional[str] = None  # e.g. '{:.2f}'
+
+
+Block = Union[Text, Info, Figure, Table]
+
+
+class Section(NamedTuple):
+    id: str
+    title: str
+    blocks: List[Block]
+    values: Dict[str, Any] = {}  # headline numbers for the JSON export
+
+    def insights(self) -> List[str]:
+        return [b.text for b in self.blocks if isinstance(b, Info)]
+
+
+# Render a section in Streamlit. Widgets that feed a section are created
+# before it is computed; pass `head`, a container made before those widgets,
+# so the title and the leading text still render above them.
+def show_section(section: Section, head=None, heading: str = 'h2') -> None:
+    import streamlit as st
+    from figcache import show_figure
+    out = head if head is not None else st
+    out.markdown(f'<a id="{section.id}"></a><{heading}>{section.title}</{heading}>', unsafe_allow_html=True)
+    for block in section.blocks:
+        if not isinstance(block, Text):
+            out = st
+        if isinstance(block, Text):
+            out.markdown(block.text)
+        elif isinstance(block, Info):
+            st.info(block.text)
+        elif isinstance(block, Figure):
+            show_figure(block.draw, *block.args)
+        elif isinstance(block, Table):
+            st.dataframe(block.frame.style.format(block.fmt) if block.fmt else block.frame)
+
+
+# Hash of everything a section shows; unchanged keys mean unchanged output
+def section_key(section: Section) -> str:
+    h = hashlib.sha1(f'{section.id}|{section.title}'.encode())
+    for block in section.blocks:
+        if isinstance(block, Figure):
+            h.update(figure_key(block.draw, *block.args).encode())
+        elif isinstance(block, Table):
+            h.update(block.name.encode() + repr(block.fmt).encode() + repr(list(block.frame.columns)).encode())
+            h.update(pd.util.hash_pandas_object(block.frame, index=True).to_numpy().tobytes())
+        else:
+            h.update(type(block).__name__.encode() + block.text.encode())
+    h.update(json.dumps(section.values, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+def _frame_json(obj: Union[pd.DataFrame, pd.Series]) -> Any:
+    return json.loads(obj.to_json(orient='split', date_format='iso'))
+
+
+# JSON-ready summary: headline values, tables, insights and the data behind
+# each figure (pandas arguments only)
+def section_json(section: Section) -> Dict[str, Any]:
+    figures = {}
+    for block in section.blocks:
+        if isinstance(block, Figure):
+            figures[block.name] = [_frame_json(a) for a in block.args if isinstance(a, (pd.DataFrame, pd.Series))]
+    return {
+        'id': section.id,
+        'title': section.title,
+        'values': json.loads(json.dumps(section.values, default=str)),
+        'tables': {b.name: _frame_json(b.frame) for b in section.blocks if isinstance(b, Table)},
+        'figures': figures,
+        'insights': section.insights(),
+    }
@@ -0,0 +1,269 @@
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from data_cache import CACHE_DIR, MANIFEST, cache_path, read_frame, write_frame
+from instrument import profiled
+from preprocess import clean_sentiment
+from schema import CLASSIFICATION_ORDER, SENTIMENT_ORDER
+from streaks import run_lengths
+from transitions import history_labels, state_codes, transition_counts
+
+# Incremental state for the Fear & Greed dashboard.
+#
+# fear_greed_index.csv only ever gains rows at the end, so the state records
+# how many bytes of it have been consumed (plus the bytes just before that
+# offset, to detect rewrites). A refresh parses only the bytes after the
+# offset and folds the new rows into:
+#
+# - the cleaned frame and the 30-row rolling mean/std of sentiment_num,
+#   recomputed over the previous window-1 rows plus the new ones;
+# - per-state day counts and transition counts for orders 1..MAX_ORDER,
+#   continued from the last `order` states;
+# - the streak list, extending the open (last) streak when it continues.
+#
+# Anything else (a shrunk or rewritten file, a different window) triggers a
+# full rebuild. check_consistency() compares the state with a recompute from
+# the full CSV.
+#
+# Only parsing and the aggregates are incremental. append() concatenates the
+# new rows onto the whole cleaned frame and save() rewrites the whole frame,
+# so persisting a refresh costs O(rows) copying and disk writes. The index has
+# one row per day (a few thousand rows, well under a megabyte), so that is
+# kept simpler than an appendable on-disk store.
+
+STATE_VERSION = 1
+WINDOW = 30
+MAX_ORDER = 3
+TAIL_BYTES = 256
+SENTIMENT_NUM = {'Fear': 0, 'Neutral': 0.5, 'Greed': 1}
+STATE_SETS = {'sentiment': SENTIMENT_ORDER, 'classification': CLASSIFICATION_ORDER}
+
+
+def sentiment_numbers(sentiment: pd.Series) -> pd.Series:
+    return sentiment.map(SENTIMENT_NUM).astype(float)
+
+
+class SentimentState:
+    def __init__(self, window: int = WINDOW, max_order: int = MAX_ORDER):
+        self.window = window
+        self.max_order = max_order
+        self.offset = 0       # bytes of the CSV consumed so far
+        self.tail = b''       # the TAIL_BYTES bytes before `offset`
+        self.header = b''
+        self.frame = pd.DataFrame()
+        self.rolling_mean = np.array([], dtype=np.float64)
+        self.rolling_std = np.array([], dtype=np.float64)
+        self.counts = {name: np.zeros(len(cats), dtype=np.int64) for name, cats in STATE_SETS.items()}
+        self.transitions = {f'{name}_{order}': np.zeros((len(cats) ** order, len(cats)), dtype=np.int64)
+                            for name, cats in STATE_SETS.items() for order in range(1, max_order + 1)}
+        # Streaks as runs of sentiment codes (-1 for missing sentiment)
+        self.run_type = np.array([], dtype=np.int8)
+        self.run_start = np.array([], dtype=np.int64)
+        self.run_length = np.array([], dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    # Fold cleaned rows (in file order) into the state; the aggregates cost
+    # O(new rows), the frame concatenation O(all rows)
+    @profiled('aggregate:SentimentState.append')
+    def append(self, new: pd.DataFrame) -> 'SentimentState':
+        if not len(new):
+            return self
+        n0 = len(self.frame)
+        old = self.frame
+
+        num = sentiment_numbers(new['sentiment'])
+        prev = sentiment_numbers(old['sentiment'].iloc[max(n0 - (self.window - 1), 0):]) if n0 else num.iloc[:0]
+        rolling = pd.concat([prev, num], ignore_index=True).rolling(window=self.window)
+        self.rolling_mean = np.concatenate((self.rolling_mean, rolling.mean().to_numpy()[len(prev):]))
+        self.rolling_std = np.concatenate((self.rolling_std, rolling.std().to_numpy()[len(prev):]))
+
+        for name, cats in STATE_SETS.items():
+            codes = state_codes(new[name], cats)
+            self.counts[name] += np.bincount(codes[codes >= 0], minlength=len(cats))
+            for order in range(1, self.max_order + 1):
+                history = old[name].iloc[max(n0 - order, 0):] if n0 else new[name].iloc[:0]
+                values = pd.concat([history.astype(object), new[name].astype(object)], ignore_index=True)
+                self.transitions[f'{name}_{order}'] += transition_counts(values, cats, order).to_numpy()
+
+        codes = state_codes(new['sentiment'], SENTIMENT_ORDER).astype(np.int8)
+        runs = run_lengths(codes)
+        types, starts, lengths = runs.type.astype(np.int8), runs.start + n0, runs.length
+        if n0 and len(self.run_type) and self.run_type[-1] == types[0]:
+            # The open streak continues into the new rows
+            self.run_length[-1] += lengths[0]
+            types, starts, lengths = types[1:], starts[1:], lengths[1:]
+        self.run_type = np.concatenate((self.run_type, types))
+        self.run_start = np.concatenate((self.run_start, starts))
+        self.run_length = np.concatenate((self.run_length, lengths))
+
+        self.frame = pd.concat([old, new], ignore_index=True) if n0 else new.reset_index(drop=True)
+        return self
+
+    # Cleaned frame with sentiment_num and the rolling metrics attached
+    def to_frame(self) -> pd.DataFrame:
+        df = self.frame.copy()
+        df['sentiment_num'] = sentiment_numbers(df['sentiment']) if len(df) else pd.Series(dtype=float)
+        df['rolling_greed'] = self.rolling_mean
+        df['sentiment_volatility'] = self.rolling_std
+        return df
+
+    def sentiment_counts(self, name: str = 'sentiment') -> pd.Series:
+        return pd.Series(self.counts[name], index=list(STATE_SETS[name]), name='count')
+
+    def transition_counts(self, name: str = 'sentiment', order: int = 1) -> pd.DataFrame:
+        cats = STATE_SETS[name]
+        return pd.DataFrame(self.transitions[f'{name}_{order}'], index=history_labels(cats, order), columns=list(cats))
+
+    # Streak list with start/end dates, as run_lengths(...).to_frame() would give
+    def streaks(self) -> pd.DataFrame:
+        dates = self.frame['date'].to_numpy() if len(self.frame) else np.array([], dtype='datetime64[ns]')
+        end = self.run_start + self.run_length - 1
+        types = pd.Categorical.from_codes(self.run_type, SENTIMENT_ORDER)
+        return pd.DataFrame({'type': np.asarray(types, dtype=object), 'length': self.run_length,
+                             'start': dates[self.run_start], 'end': dates[end]})
+
+    # Rewrites the whole frame and state arrays (O(rows)) and swaps them in
+    def save(self, path: str) -> None:
+        parent = os.path.dirname(path) or '.'
+        os.makedirs(parent, exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix='.tmp-', dir=parent)
+        try:
+            meta = {'version': STATE_VERSION, 'window': self.window, 'max_order': self.max_order,
+                    'offset': self.offset, 'tail': self.tail.hex(), 'header': self.header.hex()}
+            write_frame(self.frame, os.path.join(tmp, 'frame'), meta)
+            arrays = {'rolling_mean': self.rolling_mean, 'rolling_std': self.rolling_std,
+                      'run_type': self.run_type, 'run_start': self.run_start, 'run_length': self.run_length}
+            arrays.update({f'counts_{k}': v for k, v in self.counts.items()})
+            arrays.update({f'transitions_{k}': v for k, v in self.transitions.items()})
+            np.savez(os.path.join(tmp, 'state.npz'), **arrays)
+            if os.path.exists(path):
+                shutil.rmtree(path)
+            os.replace(tmp, path)
+        except Exception:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> Optional['SentimentState']:
+        try:
+            with open(os.path.join(path, 'frame', MANIFEST)) as f:
+                manifest = json.load(f)
+            meta = manifest['source']
+            if meta.get('version') != STATE_VERSION:
+                return None
+            state = cls(meta['window'], meta['max_order'])
+            state.offset, state.tail, state.header = meta['offset'], bytes.fromhex(meta['tail']), bytes.fromhex(meta['header'])
+            state.frame = read_frame(os.path.join(path, 'frame'), manifest).copy()
+            with np.load(os.path.join(path, 'state.npz')) as arrays:
+                state.rolling_mean, state.rolling_std = arrays['rolling_mean'], arrays['rolling_std']
+                state.run_type, state.run_start = arrays['run_type'], arrays['run_start']
+                state.run_length = arrays['run_length']
+                state.counts = {k: arrays[f'counts_{k}'] for k in state.counts}
+                state.transitions = {k: arrays[f'transitions_{k}'] for k in state.transitions}
+            return state
+        except (OSError, ValueError, KeyError):
+            return None
+
+
+# Consume whole lines after `state.offset`; a final line without a newline is
+# left for the next refresh, since it may still be being written
+def _read_delta(csv_path: str, state: SentimentState) -> pd.DataFrame:
+    with open(csv_path, 'rb') as f:
+        if state.offset == 0:
+            state.header = f.readline()
+            state.offset = f.tell()
+            state.tail = state.header[-TAIL_BYTES:]
+        f.seek(state.offset)
+        data = f.read()
+    end = data.rfind(b'\n') + 1
+    data = data[:end]
+    if end:
+        state.offset += end
+        state.tail = (state.tail + data)[-TAIL_BYTES:]
+    if not data.strip():
+        return pd.DataFrame()
+    return clean_sentiment(pd.read_csv(io.BytesIO(state.header + data)))
+
+
+def _is_append(csv_path: str, state: SentimentState, window: int, max_order: int) -> bool:
+    if state.window != window or state.max_order != max_order or state.offset == 0:
+        return False
+    if os.path.getsize(csv_path) < state.offset:
+        return False
+    with open(csv_path, 'rb') as f:
+        header = f.readline()
+        f.seek(state.offset - len(state.tail))
+        return header == state.header and f.read(len(state.tail)) == state.tail
+
+
+@profiled('load:sentiment_state')
+def refresh(csv_path: str, cache_dir: str = CACHE_DIR, window: int = WINDOW,
+            max_order: int = MAX_ORDER) -> SentimentState:
+    """Load the persisted state for `csv_path` and fold in any appended rows.
+
+    Falls back to a full rebuild when the file was not simply appended to.
+    Persisting is best effort, like the columnar cache.
+    """
+    path = cache_path(csv_path, 'state', cache_dir)
+    state = SentimentState.load(path)
+    if state is None or not _is_append(csv_path, state, window, max_order):
+        state = SentimentState(window, max_order)
+    before = state.offset
+    state.append(_read_delta(csv_path, state))
+    if state.offset != before:
+        try:
+            state.save(path)
+        except (OSError, TypeError):
+            pass
+    return state
+
+
+# Differences between the state and a recompute from the full CSV (empty
+# when they agree)
+def check_consistency(state: SentimentState, csv_path: str, rtol: float = 1e-9) -> List[str]:
+    full = clean_sentiment(pd.read_csv(csv_path))
+    problems = []
+    if len(full) != len(state):
+        return [f'row count: state has {len(state)}, file has {len(full)}']
+    df = state.to_frame()
+    for col in full.columns:
+        if not df[col].reset_index(drop=True).equals(full[col].reset_index(drop=True)):
+            problems.append(f'column {col!r} differs')
+    num = sentiment_numbers(full['sentiment'])
+    expected = {'rolling mean': num.rolling(window=state.window).mean().to_numpy(),
+                'rolling std': num.rolling(window=state.window).std().to_numpy()}
+    actual = {'rolling mean': state.rolling_mean, 'rolling std': state.rolling_std}
+    for label, values in expected.items():
+        if not np.allclose(actual[label], values, rtol=rtol, atol=1e-12, equal_nan=True):
+            problems.append(f'{label} differs')
+    for name, cats in STATE_SETS.items():
+        counts = full[name].value_counts().reindex(list(cats)).fillna(0).to_numpy(np.int64)
+        if not np.array_equal(state.counts[name], counts):
+            problems.append(f'{name} counts differ')
+        for order in range(1, state.max_order + 1):
+            if not state.transition_counts(name, order).equals(transition_counts(full[name], cats, order)):
+                problems.append(f'{name} order-{order} transition counts differ')
+    runs = run_lengths(full['sentiment']).to_frame()
+    streaks = state.streaks()
+    if not (np.array_equal(streaks['length'], runs['length'])
+            and pd.Series(streaks['type']).equals(pd.Series(runs['type'], dtype=object))):
+        problems.append('streaks differ')
+    return problems
+
+
+if __name__ == '__main__':
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else 'fear_greed_index.csv'
+    state = refresh(csv_path)
+    problems = check_consistency(state, csv_path)
+    print(f'{csv_path}: {len(state)} rows, ' + ('consistent' if not problems else '; '.join(problems)))
+    sys.exit(1 if problems else 0)
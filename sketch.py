@@ -0,0 +1,176 @@
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from schema import group_codes
+
+# Mergeable distribution sketches for the PnL and trade-size panels.
+#
+# DDSketch keeps counts in logarithmic buckets: a value x > 0 falls in bucket
+# k = ceil(log_gamma(x)) with gamma = (1 + alpha) / (1 - alpha), negatives are
+# bucketed by |x| in a mirrored store and exact zeros are counted separately.
+#
+# Error bound: every quantile returned is within a relative error of `alpha`
+# of the exact (rank-based) quantile, i.e. |q_est - q| <= alpha * |q|, for any
+# data and any number of merges. Histograms and KDEs drawn from a sketch place
+# each value at its bucket representative, which is within alpha * |x| of x,
+# so only values that close to a bin edge can land in a neighbouring bin.
+# Counts, min, max, sum and sum of squares are exact.
+
+DEFAULT_ALPHA = 0.01
+
+
+class DDSketch:
+    def __init__(self, alpha: float = DEFAULT_ALPHA):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = np.log(self.gamma)
+        self.pos = pd.Series(dtype=np.int64)
+        self.neg = pd.Series(dtype=np.int64)
+        self.zeros = 0
+        self.count = 0
+        self.sum = 0.0
+        self.sumsq = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def _keys(self, x: np.ndarray) -> np.ndarray:
+        return np.ceil(np.log(x) / self._log_gamma).astype(np.int64)
+
+    def _value(self, keys: np.ndarray) -> np.ndarray:
+        # Midpoint (in relative terms) of bucket (gamma^(k-1), gamma^k]
+        return 2 * self.gamma ** keys.astype(np.float64) / (self.gamma + 1)
+
+    def add(self, values) -> 'DDSketch':
+        x = np.asarray(values, dtype=np.float64)
+        x = x[~np.isnan(x)]
+        if not len(x):
+            return self
+        self.count += len(x)
+        self.sum += float(x.sum())
+        self.sumsq += float(np.square(x).sum())
+        self.min = min(self.min, float(x.min()))
+        self.max = max(self.max, float(x.max()))
+        self.zeros += int((x == 0).sum())
+        for attr, part in (('pos', x[x > 0]), ('neg', -x[x < 0])):
+            if len(part):
+                keys, counts = np.unique(self._keys(part), return_counts=True)
+                setattr(self, attr, getattr(self, attr).add(pd.Series(counts, index=keys), fill_value=0).astype(np.int64))
+        return self
+
+    def merge(self, other: 'DDSketch') -> 'DDSketch':
+        if other.alpha != self.alpha:
+            raise ValueError("Cannot merge sketches with different alpha")
+        self.pos = self.pos.add(other.pos, fill_value=0).astype(np.int64)
+        self.neg = self.neg.add(other.neg, fill_value=0).astype(np.int64)
+        self.zeros += other.zeros
+        self.count += other.count
+        self.sum += other.sum
+        self.sumsq += other.sumsq
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else float('nan')
+
+    @property
+    def std(self) -> float:
+        if self.count < 2:
+            return float('nan')
+        return float(np.sqrt(max(self.sumsq - self.sum ** 2 / self.count, 0) / (self.count - 1)))
+
+    # Bucket representatives in ascending order with their counts
+    def buckets(self) -> Tuple[np.ndarray, np.ndarray]:
+        neg = self.neg.sort_index(ascending=False)
+        pos = self.pos.sort_index()
+        values = np.concatenate((-self._value(neg.index.to_numpy()), [0.0] if self.zeros else [],
+                                 self._value(pos.index.to_numpy())))
+        counts = np.concatenate((neg.to_numpy(), [self.zeros] if self.zeros else [], pos.to_numpy()))
+        return np.clip(values, self.min, self.max), counts.astype(np.int64)
+
+    def quantiles(self, qs) -> np.ndarray:
+        qs = np.atleast_1d(np.asarray(qs, dtype=np.float64))
+        if not self.count:
+            return np.full(len(qs), np.nan)
+        values, counts = self.buckets()
+        ranks = qs * (self.count - 1)
+        idx = np.searchsorted(np.cumsum(counts), ranks, side='right')
+        return values[np.minimum(idx, len(values) - 1)]
+
+    def quantile(self, q: float) -> float:
+        return float(self.quantiles([q])[0])
+
+
+# One sketch per group from a single pass over (group, bucket) pairs
+def grouped_sketches(values: pd.Series, groups: pd.Series, alpha: float = DEFAULT_ALPHA) -> Dict[object, DDSketch]:
+    proto = DDSketch(alpha)
+    x = values.to_numpy(np.float64)
+    codes, labels = group_codes(groups)
+    keep = ~np.isnan(x) & (codes >= 0)
+    x, g = x[keep], codes[keep]
+    sign = np.sign(x).astype(np.int8)
+    keys = np.zeros(len(x), dtype=np.int64)
+    nz = x != 0
+    keys[nz] = proto._keys(np.abs(x[nz]))
+    frame = pd.DataFrame({'g': g, 'sign': sign, 'key': keys, 'x': x})
+    cells = frame.groupby(['g', 'sign', 'key'], observed=True).size()
+    totals = frame.groupby('g', observed=True)['x'].agg(['count', 'sum', 'min', 'max'])
+    sumsq = (frame['x'] ** 2).groupby(frame['g'], observed=True).sum()
+
+    out = {}
+    for label, row in totals.iterrows():
+        sk = DDSketch(alpha)
+        c = cells.loc[label]
+        sk.pos = c.loc[1] if 1 in c.index.get_level_values(0) else sk.pos
+        sk.neg = c.loc[-1] if -1 in c.index.get_level_values(0) else sk.neg
+        sk.pos, sk.neg = sk.pos.astype(np.int64), sk.neg.astype(np.int64)
+        sk.zeros = int(c.loc[0].sum()) if 0 in c.index.get_level_values(0) else 0
+        sk.count, sk.sum, sk.sumsq = int(row['count']), float(row['sum']), float(sumsq.loc[label])
+        sk.min, sk.max = float(row['min']), float(row['max'])
+        out[labels[label]] = sk
+    return out
+
+
+def histogram(sketch: DDSketch, bins: int = 50, log: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    values, counts = sketch.buckets()
+    lo, hi = sketch.min, sketch.max
+    if log:
+        edges = np.geomspace(max(lo, np.finfo(float).tiny), hi, bins + 1)
+    else:
+        edges = np.linspace(lo, hi if hi > lo else lo + 1, bins + 1)
+    hist, _ = np.histogram(values, bins=edges, weights=counts)
+    return edges, hist
+
+
+# Gaussian KDE from binned counts (Scott's bandwidth, like seaborn's default),
+# as a density over `grid` evenly spaced points
+def binned_kde(sketch: DDSketch, grid: int = 512) -> Tuple[np.ndarray, np.ndarray]:
+    edges, counts = histogram(sketch, bins=grid)
+    centers = (edges[:-1] + edges[1:]) / 2
+    width = edges[1] - edges[0]
+    bw = sketch.std * sketch.count ** (-1 / 5)
+    if not sketch.count or not np.isfinite(bw) or bw <= 0:
+        return centers, np.zeros_like(centers)
+    # Pad by 3 bandwidths so the kernel is not truncated at the edges
+    pad = int(np.ceil(3 * bw / width))
+    offsets = np.arange(-pad, pad + 1) * width
+    kernel = np.exp(-0.5 * (offsets / bw) ** 2)
+    kernel /= kernel.sum()
+    smoothed = np.convolve(np.pad(counts.astype(np.float64), pad), kernel, mode='same')[pad:pad + grid]
+    return centers, smoothed / (sketch.count * width)
+
+
+# Box-and-whisker stats for Axes.bxp: quartiles from the sketch, whiskers at
+# the furthest bucket within 1.5 IQR, and one flier per bucket beyond them
+def box_stats(sketch: DDSketch, label: Optional[str] = None) -> dict:
+    q1, med, q3 = sketch.quantiles([0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    values, counts = sketch.buckets()
+    inside = (values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)
+    whislo = values[inside].min() if inside.any() else q1
+    whishi = values[inside].max() if inside.any() else q3
+    return {'label': label, 'med': med, 'q1': q1, 'q3': q3, 'whislo': whislo,
+            'whishi': whishi, 'fliers': values[~inside], 'mean': sketch.mean}
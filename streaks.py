@@ -0,0 +1,75 @@
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Vectorized run-length encoding shared by both dashboards.
+#
+# Runs are found with a single diff over integer codes, so the cost is a few
+# NumPy passes regardless of the number of streaks. With `groups`, rows are
+# stably ordered by group (and optionally time) first and a run also breaks
+# at every group boundary, giving per-account or per-coin streaks in one pass.
+
+
+class Runs(NamedTuple):
+    type: np.ndarray     # value of each run
+    start: np.ndarray    # row position of the first row of the run
+    end: np.ndarray      # row position of the last row of the run
+    length: np.ndarray   # number of rows in the run
+    group: Optional[np.ndarray] = None  # group label of each run, if grouped
+
+    def to_frame(self) -> pd.DataFrame:
+        data = {'type': self.type, 'length': self.length, 'start': self.start, 'end': self.end}
+        if self.group is not None:
+            data = {'group': self.group, **data}
+        return pd.DataFrame(data)
+
+
+# Codes in order of first appearance (not schema.group_codes' category
+# order): grouped runs are listed in that order
+def _codes(values) -> Tuple[np.ndarray, np.ndarray]:
+    codes, uniques = pd.factorize(pd.Series(values), use_na_sentinel=True)
+    return codes, np.asarray(uniques)
+
+
+def run_lengths(values, groups=None, order=None) -> Runs:
+    """Encode consecutive equal values as runs.
+
+    `groups` splits runs at group changes; `order` (e.g. timestamps) sorts rows
+    within each group. Missing values form runs of type NaN/None.
+    """
+    codes, uniques = _codes(values)
+    n = len(codes)
+    if n == 0:
+        empty = np.array([], dtype=np.int64)
+        return Runs(uniques, empty, empty, empty, None if groups is None else np.array([]))
+
+    perm = None
+    if groups is not None:
+        gcodes, glabels = _codes(groups)
+        if order is not None:
+            perm = np.lexsort((np.asarray(order), gcodes))
+        else:
+            perm = np.argsort(gcodes, kind='stable')
+        codes, gcodes = codes[perm], gcodes[perm]
+    elif order is not None:
+        perm = np.argsort(np.asarray(order), kind='stable')
+        codes = codes[perm]
+
+    change = codes[1:] != codes[:-1]
+    if groups is not None:
+        change |= gcodes[1:] != gcodes[:-1]
+    starts = np.flatnonzero(np.concatenate(([True], change)))
+    ends = np.append(starts[1:] - 1, n - 1)
+    lengths = ends - starts + 1
+
+    types = np.asarray(pd.Categorical.from_codes(codes[starts], uniques))
+    group = None if groups is None else np.asarray(pd.Categorical.from_codes(gcodes[starts], glabels))
+    if perm is not None:
+        starts, ends = perm[starts], perm[ends]
+    return Runs(types, starts, ends, lengths, group)
+
+
+# Longest run length per value type
+def longest(runs: Runs) -> pd.Series:
+    return pd.Series(runs.length).groupby(pd.Series(runs.type, dtype=object)).max()
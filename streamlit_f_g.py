@@ -1,8 +1,13 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+from typing import Any, Dict
+
 import streamlit as st
-from typing import Tuple, List
+
+from data_cache import file_mtime
+from fg_sections import (STATE_SETS, longest_streaks, rolling_greed, sentiment_counts, sentiment_series,
+                         summary, transition_matrix, volatility)
+from instrument import show_panel
+from registry import ALL_SECTIONS, Registry, SectionSpec
+from sentiment_state import SentimentState, refresh
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -11,61 +16,31 @@ st.set_page_config(
     layout="wide"
 )
 
-# Caching data loading for performance optimization
-@st.cache_data
-def load_data(file_path: str) -> pd.DataFrame:
+# Shared, read-only state: loaded once per process and handed to every
+# session without the pickle round trip and copy of st.cache_data. The file's
+# mtime is part of the cache key, so appended days are picked up; refresh()
+# then parses only the new rows and updates the persisted
+# rolling/streak/transition state.
+@st.cache_resource(max_entries=2)
+def load_state(file_path: str, mtime_ns: int) -> SentimentState:
     try:
-        return pd.read_csv(file_path)
+        return refresh(file_path)
     except FileNotFoundError:
         st.error(f"File not found: {file_path}")
-        return pd.DataFrame()
+        return SentimentState()
     except Exception as e:
         st.error(f"Error loading file {file_path}: {e}")
-        return pd.DataFrame()
-
-# Load and preprocess data
-df = load_data('fear_greed_index.csv')
-df.columns = df.columns.str.lower()
-df['date'] = pd.to_datetime(df['date'])
-
-# Map sentiments to simplified categories
-sentiment_map = {'extreme fear': 'Fear', 'fear': 'Fear',
-                 'extreme greed': 'Greed', 'greed': 'Greed',
-                 'neutral': 'Neutral'}
-df['sentiment'] = df['classification'].str.lower().map(sentiment_map)
-
-# Numeric sentiment for plotting
-sentiment_num_map = {'Fear': 0, 'Neutral': 0.5, 'Greed': 1}
-df['sentiment_num'] = df['sentiment'].map(sentiment_num_map)
+        return SentimentState()
 
-# Rolling average for Greed sentiment
-df['rolling_greed'] = df['sentiment_num'].rolling(window=30).mean()
-
-# Identify streaks of sentiments
-streaks = []
-current_streak = {'type': None, 'length': 0, 'start': None, 'end': None}
-for idx, row in df.iterrows():
-    sentiment = row['sentiment']
-    if current_streak['type'] != sentiment:
-        if current_streak['type'] is not None:
-            streaks.append(current_streak.copy())
-        current_streak = {'type': sentiment, 'length': 1, 'start': row['date'], 'end': row['date']}
-    else:
-        current_streak['length'] += 1
-        current_streak['end'] = row['date']
-if current_streak['type'] is not None:
-    streaks.append(current_streak.copy())
-
-streaks_df = pd.DataFrame(streaks)
-longest_fear = streaks_df[streaks_df['type'] == 'Fear']['length'].max()
-longest_greed = streaks_df[streaks_df['type'] == 'Greed']['length'].max()
-extreme_periods = streaks_df[streaks_df['length'] >= 5]
+# Preprocessed data (sentiment already mapped to Fear/Neutral/Greed) together
+# with its incrementally maintained rolling metrics, streaks and transition
+# counts is loaded once a selected section needs it
+mtime_ns = file_mtime('fear_greed_index.csv')
 
 # Streamlit dashboard layout
 st.title('Fear & Greed Index: Step-by-Step Analysis')
 st.markdown('Welcome! This dashboard helps you understand how market sentiment (Fear & Greed) changes over time and what it might mean for trading. Each section has a plot, a simple description, and a key insight.')
 selected = st.sidebar.multiselect('Choose Sentiments', ['Fear', 'Neutral', 'Greed'], default=['Fear', 'Neutral', 'Greed'])
-filtered_df = df[df['sentiment'].isin(selected)]
 
 # Update CSS to fix hyperlink styling and duplication
 st.markdown(
@@ -95,109 +70,29 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# Add markdown portion back and ensure proper anchoring for all points
-st.sidebar.markdown("""
-<ul>
-    <li><a href="#sentiment-counts">Sentiment Counts</a></li>
-    <li><a href="#sentiment-time-series">Sentiment Time Series</a></li>
-    <li><a href="#rolling-greed-average">Rolling Greed Average</a></li>
-    <li><a href="#sentiment-volatility">Sentiment Volatility</a></li>
-    <li><a href="#sentiment-transition-matrix">Transition Matrix</a></li>
-    <li><a href="#longest-streaks-and-extreme-sentiment-periods">Longest Streaks</a></li>
-    <li><a href="#summary--key-takeaways">Summary</a></li>
-</ul>
-""", unsafe_allow_html=True)
-
-# Function for creating bar plots with tooltips
-def create_barplot(data: pd.Series, title: str, palette: List[str]) -> Tuple[plt.Figure, plt.Axes]:
-    fig, ax = plt.subplots()
-    sns.barplot(x=data.index, y=data.values, palette=palette, ax=ax)
-    ax.set_title(title)
-    return fig, ax
-
-# Add anchors before all section titles
-st.markdown('<a id="sentiment-counts"></a><h2>1. How Often is the Market in Fear, Neutral, or Greed?</h2>', unsafe_allow_html=True)
-st.markdown('This bar chart shows how many days the market was classified as Fear, Neutral, or Greed.')
-counts = df['sentiment'].value_counts().reindex(['Fear', 'Neutral', 'Greed']).fillna(0)
-fig1, ax1 = create_barplot(counts, 'Sentiment Day Counts', palette=['#d73027', '#fdae61', '#1a9850'])
-st.pyplot(fig1)
-st.info(f"Most common sentiment: {counts.idxmax()} ({int(counts.max())} days). This can help you identify the prevailing mood in the market and adjust your strategy accordingly.")
-
-# 2. Sentiment time series
-st.markdown('<a id="sentiment-time-series"></a><h2>2. How Does Sentiment Change Over Time?</h2>', unsafe_allow_html=True)
-st.markdown('This line plot shows how market sentiment moves between Fear, Neutral, and Greed over time.')
-fig2, ax2 = plt.subplots(figsize=(6, 3))  # Reduced size
-sns.lineplot(x='date', y='sentiment_num', data=filtered_df, ax=ax2)
-ax2.set_title('Sentiment Time Series (Greed=1, Neutral=0.5, Fear=0)')
-ax2.set_xlabel("Date", labelpad=10)  # Add padding to x-axis label
-ax2.set_ylabel("Sentiment Level", labelpad=10)  # Add padding to y-axis label
-ax2.tick_params(axis='x', rotation=45)  # Rotate x-axis labels for better readability
-st.pyplot(fig2)
-st.info('Sentiment often stays in one state for several days before switching. Watch for sudden jumps! If you notice a rapid change, it may signal a shift in market regime or an opportunity for contrarian trades.')
-
-# 3. Rolling Greed Average
-st.markdown('<a id="rolling-greed-average"></a><h2>3. Trend: 30-Day Rolling Average of Greed</h2>', unsafe_allow_html=True)
-st.markdown('This plot smooths out daily changes to show the overall trend in market sentiment.')
-fig3, ax3 = plt.subplots(figsize=(6, 3))  # Reduced size
-ax3.plot(df['date'], df['rolling_greed'], color='blue')
-ax3.set_title('30-Day Rolling Average of Greed Sentiment')
-ax3.set_xlabel("Date", labelpad=10)  # Add padding to x-axis label
-ax3.set_ylabel("Rolling Average", labelpad=10)  # Add padding to y-axis label
-ax3.tick_params(axis='x', rotation=45)  # Rotate x-axis labels for better readability
-st.pyplot(fig3)
-st.info('When the rolling average is high, the market is mostly greedy. When low, mostly fearful. Sustained trends in the rolling average can help you spot momentum or mean-reversion opportunities.')
-
-# 4. Sentiment Volatility (rolling std)
-st.markdown('<a id="sentiment-volatility"></a><h2>4. Volatility: How Much Does Sentiment Change?</h2>', unsafe_allow_html=True)
-st.markdown('This plot shows how much sentiment is changing (volatility). High volatility means the market is switching between fear and greed more often.')
-df['sentiment_volatility'] = df['sentiment_num'].rolling(window=30).std()
-fig4, ax4 = plt.subplots(figsize=(10, 3))
-ax4.plot(df['date'], df['sentiment_volatility'], color='purple')
-ax4.set_title('30-Day Rolling Volatility of Sentiment')
-ax4.set_xlabel("Date", labelpad=10)  # Add padding to x-axis label
-ax4.set_ylabel("Volatility (Std Dev)", labelpad=10)  # Add padding to y-axis label
-ax4.tick_params(axis='x', rotation=45)  # Rotate x-axis labels for better readability
-st.pyplot(fig4)
-st.info('Spikes in volatility can signal big changes in market mood. These may be good times to watch for reversals or new trends.')
-
-# Sentiment Transition Matrix
-import numpy as np
-sentiments = ['Fear', 'Neutral', 'Greed']
-transition_counts = pd.DataFrame(0, index=sentiments, columns=sentiments)
-for prev, curr in zip(df['sentiment'][:-1], df['sentiment'][1:]):
-    if prev in sentiments and curr in sentiments:
-        transition_counts.loc[prev, curr] += 1
-transition_probs = transition_counts.div(transition_counts.sum(axis=1), axis=0)
-
-# 5. Sentiment Transition Matrix
-st.markdown('<a id="sentiment-transition-matrix"></a><h2>5. How Does Sentiment Switch from One State to Another?</h2>', unsafe_allow_html=True)
-st.markdown('This table shows the probability that the market will stay in the same sentiment or switch to another the next day.')
-st.dataframe(transition_probs.style.format('{:.2f}'))
-st.info('The market usually stays in the same state, but sometimes switches. For example, after Fear, it often stays in Fear, but can move to Neutral or Greed. Understanding these probabilities can help you anticipate likely sentiment shifts and plan your trades.')
-
-# 6. Longest Streaks and Extreme Sentiment Periods
-st.markdown('<a id="longest-streaks-and-extreme-sentiment-periods"></a><h2>6. Longest Streaks and Extreme Sentiment Periods</h2>', unsafe_allow_html=True)
-st.markdown('Here we show the longest periods where the market stayed in Fear or Greed, and all streaks of 5 days or more.')
-st.write(f'**Longest Fear Streak:** {longest_fear} days')
-st.write(f'**Longest Greed Streak:** {longest_greed} days')
-
-st.dataframe(extreme_periods.sort_values(by='length', ascending=False))
-st.info('Long streaks of Fear or Greed are rare. After such streaks, the market often reverses. Monitoring for the end of a long streak can help you catch turning points in the market.')
-
-# --- Summary Section ---
-st.markdown('<a id="summary--key-takeaways"></a><h2>Summary & Key Takeaways</h2>', unsafe_allow_html=True)
-st.markdown('''
-**Key Insights:**
-- The market spends most of its time in one sentiment regime, but transitions do occur and can be anticipated.
-- High volatility in sentiment often precedes major market moves - watch for these periods.
-- Long streaks of Fear or Greed are uncommon and often followed by reversals.
-- Use rolling averages and transition probabilities to inform momentum or contrarian strategies.
-
-**Actionable Tips:**
-- Adjust your trading style based on the prevailing sentiment and its recent history.
-- Be alert for regime changes after long streaks or volatility spikes.
-- Combine sentiment analytics with price/volume data for deeper insights.
-''')
+def transition_controls(state: SentimentState) -> Dict[str, Any]:
+    state_set = st.radio('States', list(STATE_SETS), horizontal=True)
+    order = st.select_slider('Days of history used to predict the next day', options=[1, 2, 3], value=1)
+    return {'state_set': state_set, 'order': order}
+
+# Sections are computed in fg_sections.py; only the selected one is computed
+# on each run, and results are memoized per file version and options
+registry = Registry('fear_greed', [
+    SectionSpec('sentiment-counts', 'Sentiment Counts', ('state',), sentiment_counts),
+    SectionSpec('sentiment-time-series', 'Sentiment Time Series', ('state',), sentiment_series,
+                lambda state: {'selected': selected}),
+    SectionSpec('rolling-greed-average', 'Rolling Greed Average', ('state',), rolling_greed),
+    SectionSpec('sentiment-volatility', 'Sentiment Volatility', ('state',), volatility),
+    SectionSpec('sentiment-transition-matrix', 'Transition Matrix', ('state',), transition_matrix, transition_controls),
+    SectionSpec('longest-streaks-and-extreme-sentiment-periods', 'Longest Streaks', ('state',), longest_streaks),
+    SectionSpec('summary--key-takeaways', 'Summary', (), summary),
+], {'state': lambda: load_state('fear_greed_index.csv', mtime_ns)}, token=mtime_ns)
+
+choice = st.sidebar.radio('Section', registry.labels() + [ALL_SECTIONS])
+registry.show_selected(choice)
 
 st.markdown('---')
-st.markdown('**Tip:** Combine these sentiment analytics with price or volume data for even deeper trading insights.')
\ No newline at end of file
+st.markdown('**Tip:** Combine these sentiment analytics with price or volume data for even deeper trading insights.')
+
+# Stage timings (EDA_PROFILE=1)
+show_panel()
\ No newline at end of file
@@ -1,8 +1,22 @@
+import os
+
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import streamlit as st
-from typing import Tuple, List
+from typing import Any, Callable, Dict, Tuple
+
+from data_cache import cached_frame, file_mtime
+from align import SentimentCalendar, align_sentiment
+from ingest import TradeAggregates, stream_trades
+from instrument import show_panel
+from parallel import trader_stats
+from preprocess import clean_sentiment, clean_trades
+from query import TradeIndex
+from registry import ALL_SECTIONS, Registry, SectionSpec
+from schema import SENTIMENT_ORDER
+from sections import Section
+from trade_sections import (LAG_SIGNALS, STREAK_SCOPES, correlation_scopes, correlations, fees, most_traded_coins,
+                            overview, pnl_overview, price_trends, sentiment_lead_lag, sentiment_performance,
+                            side_distribution, streaks, summary, trade_frequency, trade_sizes, trader_leaderboard)
 
 # Set page configuration
 st.set_page_config(
@@ -36,31 +50,20 @@ a[id] {
 </style>
 """, unsafe_allow_html=True)
 
-# Sidebar for navigation
-st.sidebar.title("Navigation")
-st.sidebar.markdown("Use the sections below to explore the dashboard:")
-st.sidebar.markdown("""
-<ul>
-    <li><a href="#data-overview">Data Overview</a></li>
-    <li><a href="#trade-side-distribution">Trade Side Distribution</a></li>
-    <li><a href="#most-traded-coins">Most Traded Coins</a></li>
-    <li><a href="#trade-size-distribution">Trade Size Distribution</a></li>
-    <li><a href="#closed-pnl-overview">Closed PnL Overview</a></li>
-    <li><a href="#trade-frequency-over-time">Trade Frequency Over Time</a></li>
-    <li><a href="#average-execution-price-over-time-top-3-coins">Execution Price Trends</a></li>
-    <li><a href="#fees-paid-by-top-coins">Fees Analysis</a></li>
-    <li><a href="#correlation-matrix-of-numeric-features">Correlation Matrix</a></li>
-    <li><a href="#trader-performance-by-market-sentiment">Performance by Sentiment</a></li>
-    <li><a href="#streaks-of-winning-and-losing-trades">Streak Analysis</a></li>
-    <li><a href="#summary--key-takeaways">Summary</a></li>
-</ul>
-""", unsafe_allow_html=True)
-
-# Caching data loading for performance optimization
-@st.cache_data
-def load_data(file_path: str) -> pd.DataFrame:
+TRADES_CSV = 'historical_data.csv'
+SENTIMENT_CSV = 'fear_greed_index.csv'
+
+# Shared, read-only data service: frames, aggregates and trader tables are
+# built once per process and handed to every session as-is. Unlike
+# st.cache_data, st.cache_resource neither pickles nor copies the result, and
+# the cleaned frames are memory-mapped from the columnar cache (read-only
+# arrays), so a session costs no extra copy of the data. Nothing below
+# modifies a shared object. File mtimes are part of every key, so edited CSVs
+# are reloaded.
+@st.cache_resource(max_entries=4)
+def load_data(file_path: str, mtime_ns: int, _clean: Callable[[pd.DataFrame], pd.DataFrame]) -> pd.DataFrame:
     try:
-        return pd.read_csv(file_path)
+        return cached_frame(file_path, _clean)
     except FileNotFoundError:
         st.error(f"File not found: {file_path}")
         return pd.DataFrame()
@@ -68,247 +71,162 @@ def load_data(file_path: str) -> pd.DataFrame:
         st.error(f"Error loading file {file_path}: {e}")
         return pd.DataFrame()
 
-# Load trade data
-df = load_data('historical_data.csv')
-df.columns = df.columns.str.strip()
-df['Timestamp IST'] = pd.to_datetime(df['Timestamp IST'], errors='coerce')
-df['Timestamp'] = pd.to_datetime(df['Timestamp'], errors='coerce')
-num_cols = ['Execution Price', 'Size Tokens', 'Size USD', 'Closed PnL', 'Fee']
-for col in num_cols:
-    df[col] = pd.to_numeric(df[col], errors='coerce')
-df['Side'] = df['Side'].str.upper()
-
-# Load sentiment data and merge
-sent = load_data('fear_greed_index.csv')
-sent.columns = sent.columns.str.lower()
-sent['date'] = pd.to_datetime(sent['date'])
-sent['classification'] = sent['classification'].str.lower()
-sentiment_map = {'extreme fear': 'Fear', 'fear': 'Fear', 'extreme greed': 'Greed', 'greed': 'Greed', 'neutral': 'Neutral'}
-sent['sentiment'] = sent['classification'].map(sentiment_map)
-
-# Merge on date (align trade to sentiment date)
-df['date'] = df['Timestamp IST'].dt.date
-sent['date'] = sent['date'].dt.date
-df = df.merge(sent[['date', 'sentiment']], on='date', how='left')
-
-# Function for creating plots with tooltips
-def create_countplot(data: pd.DataFrame, x: str, title: str, palette: List[str]) -> Tuple[plt.Figure, plt.Axes]:
-    fig, ax = plt.subplots()
-    sns.countplot(data=data, x=x, ax=ax, palette=palette)
-    ax.set_title(title)
-    return fig, ax
+def load_sentiment() -> pd.DataFrame:
+    return load_data(SENTIMENT_CSV, file_mtime(SENTIMENT_CSV), clean_sentiment)
+
+# Low-memory mode streams the trade file in chunks and keeps only aggregates;
+# sections that need individual trades are skipped
+LOW_MEMORY = os.environ.get('EDA_LOW_MEMORY') == '1'
+
+@st.cache_resource(max_entries=4)
+def load_aggregates(file_path: str, version: tuple, lag: int, asof: bool) -> TradeAggregates:
+    try:
+        return stream_trades(file_path, SentimentCalendar(load_sentiment()), lag, asof)
+    except FileNotFoundError:
+        st.error(f"File not found: {file_path}")
+        return TradeAggregates()
+
+# Cleaned trades (from the columnar cache) with each trade day aligned to its
+# sentiment by epoch-day lookup. The shallow copy shares every cleaned column;
+# only the sentiment column is new.
+@st.cache_resource(max_entries=4)
+def load_trades(file_path: str, version: tuple, lag: int, asof: bool) -> pd.DataFrame:
+    df = load_data(file_path, version[0], clean_trades).copy(deep=False)
+    df['sentiment'] = align_sentiment(df['date'], load_sentiment(), lag=lag, asof=asof)
+    return df
+
+# Filter indexes over the trade frame (see query.py), built once per frame
+@st.cache_resource(max_entries=4)
+def load_index(file_path: str, version: tuple, lag: int, asof: bool) -> TradeIndex:
+    return TradeIndex(load_trades(file_path, version, lag, asof))
+
+# `filters` is a hashable (column, values) tuple plus an optional (start, end)
+# ISO date range; the rows come from the index, so only the selected rows are
+# gathered and every downstream aggregate is recomputed from them alone
+@st.cache_resource(max_entries=16)
+def load_filtered(file_path: str, version: tuple, lag: int, asof: bool, filters: tuple) -> pd.DataFrame:
+    df = load_trades(file_path, version, lag, asof)
+    values, dates = filters
+    rows = load_index(file_path, version, lag, asof).select(dict(values), dates)
+    return df if rows is None else df.take(rows)
+
+@st.cache_resource(max_entries=16)
+def build_aggregates(file_path: str, version: tuple, lag: int, asof: bool, filters: tuple) -> TradeAggregates:
+    return TradeAggregates().update(load_filtered(file_path, version, lag, asof, filters))
+
+# Per-account/per-coin tables are reduced on a process pool
+@st.cache_resource(max_entries=8)
+def load_trader_stats(file_path: str, version: tuple, by: str, lag: int, asof: bool,
+                      filters: tuple) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    return trader_stats(load_filtered(file_path, version, lag, asof, filters), by)
+
+# Same-day matching uses the index for the trade's own day; the lagged option
+# uses the latest index published before the trade day (no look-ahead)
+alignment = st.sidebar.radio("Match trades to", ["Same-day index", "Previous day's index (no look-ahead)"])
+lag, asof = (0, False) if alignment == "Same-day index" else (1, True)
+version = (file_mtime(TRADES_CSV), file_mtime(SENTIMENT_CSV))
+
+# Slicing filters apply to every section. They need individual trades, so
+# low-memory mode has none.
+NO_FILTERS = ((), None)
+
+def filter_controls() -> tuple:
+    if LOW_MEMORY:
+        return NO_FILTERS
+    index = load_index(TRADES_CSV, version, lag, asof)
+    with st.sidebar.expander("Filters"):
+        values = []
+        bounds = index.date_bounds()
+        dates = None
+        if bounds is not None:
+            first, last = (d.date() for d in bounds)
+            picked = st.date_input("Trade dates", (first, last), min_value=first, max_value=last)
+            # The range is incomplete while the second date is being picked
+            if isinstance(picked, (tuple, list)) and len(picked) == 2 and tuple(picked) != (first, last):
+                dates = tuple(d.isoformat() for d in picked)
+        for column, label in [('Coin', "Coins"), ('Account', "Accounts"), ('Side', "Side"), ('sentiment', "Sentiment")]:
+            if column not in index.values:
+                continue
+            options = list(SENTIMENT_ORDER) if column == 'sentiment' else list(index.counts(column).index)
+            selected = st.multiselect(label, options, placeholder="All")
+            if selected:
+                values.append((column, tuple(selected)))
+    return tuple(values), dates
+
+filters = filter_controls()
+
+# Trade data is only loaded once a selected section needs it (see registry.py)
+def trades() -> pd.DataFrame:
+    return None if LOW_MEMORY else load_filtered(TRADES_CSV, version, lag, asof, filters)
+
+def aggregates() -> TradeAggregates:
+    if LOW_MEMORY:
+        return load_aggregates(TRADES_CSV, version, lag, asof)
+    return build_aggregates(TRADES_CSV, version, lag, asof, filters)
+
+# Widgets feeding a section; each returns that section's options
+def correlation_controls(agg: TradeAggregates) -> Dict[str, Any]:
+    return {'scope': st.selectbox("Correlations for", correlation_scopes(agg))}
+
+def coin_controls(agg: TradeAggregates) -> Dict[str, Any]:
+    drill_coin = st.selectbox("Coin", ['All coins'] + list(agg.top_coins(10).index))
+    return {'coin': None if drill_coin == 'All coins' else drill_coin}
+
+def streak_controls(df: pd.DataFrame) -> Dict[str, Any]:
+    return {'scope': st.radio("Compute streaks", list(STREAK_SCOPES), horizontal=True) if df is not None else 'Per account'}
+
+def leaderboard_controls(df: pd.DataFrame) -> Dict[str, Any]:
+    if df is None:
+        return {}
+    return {'by': 'Account' if st.radio("Rank", ['Accounts', 'Coins'], horizontal=True) == 'Accounts' else 'Coin'}
+
+def lag_controls(agg: TradeAggregates, sent: pd.DataFrame) -> Dict[str, Any]:
+    return {'signal': st.radio("Sentiment signal", LAG_SIGNALS, horizontal=True),
+            'max_lag': st.slider("Lags (days)", 1, 60, 14),
+            'block': st.select_slider("Bootstrap block (days)", [1, 7, 14, 30], 1,
+                                      help="Resample runs of consecutive trade days; longer blocks respect sentiment regimes")}
+
+def leaderboard_section(df: pd.DataFrame, by: str = 'Account') -> Section:
+    if df is None:
+        return trader_leaderboard(None)
+    return trader_leaderboard(df, by, load_trader_stats(TRADES_CSV, version, by, lag, asof, filters))
+
+# Sections are computed in trade_sections.py; only the selected one is
+# computed on each run, and results are memoized per data version and options
+registry = Registry('trades', [
+    SectionSpec('data-overview', "Data Overview", ('agg', 'df'), overview),
+    SectionSpec('trade-side-distribution', "Trade Side Distribution", ('agg',), side_distribution),
+    SectionSpec('most-traded-coins', "Most Traded Coins", ('agg',), most_traded_coins),
+    SectionSpec('trade-size-distribution', "Trade Size Distribution", ('agg',), trade_sizes),
+    SectionSpec('closed-pnl-overview', "Closed PnL Overview", ('agg',), pnl_overview),
+    SectionSpec('trade-frequency-over-time', "Trade Frequency Over Time", ('agg',), trade_frequency),
+    SectionSpec('average-execution-price-over-time-top-3-coins', "Execution Price Trends", ('agg', 'df'), price_trends),
+    SectionSpec('fees-paid-by-top-coins', "Fees Analysis", ('agg',), fees),
+    SectionSpec('correlation-matrix-of-numeric-features', "Correlation Matrix", ('agg',), correlations, correlation_controls),
+    SectionSpec('trader-performance-by-market-sentiment', "Performance by Sentiment", ('agg',), sentiment_performance, coin_controls),
+    SectionSpec('streaks-of-winning-and-losing-trades', "Streak Analysis", ('df',), streaks, streak_controls),
+    SectionSpec('trader-leaderboard', "Trader Leaderboard", ('df',), leaderboard_section, leaderboard_controls),
+    SectionSpec('sentiment-lead-lag', "Sentiment Lead/Lag", ('agg', 'sent'), sentiment_lead_lag, lag_controls),
+    SectionSpec('summary--key-takeaways', "Summary", (), summary),
+], {'df': trades, 'agg': aggregates, 'sent': load_sentiment}, token=(version, lag, asof, LOW_MEMORY, filters))
+
+# Sidebar for navigation
+st.sidebar.title("Navigation")
+choice = st.sidebar.radio("Section", registry.labels() + [ALL_SECTIONS])
 
 # Basic overview in Streamlit dashboard
 
 st.title("📊 Advanced EDA Dashboard: Trade History & Market Sentiment")
 st.markdown("This dashboard explores the relationship between trader performance and market sentiment, uncovering patterns and insights for smarter trading.")
 
-st.markdown('<a id="data-overview"></a><h2>📋 Data Overview</h2>', unsafe_allow_html=True)
-st.write(f"Total Trades: {len(df)}")
-st.write(f"Unique Accounts: {df['Account'].nunique()}")
-st.write(f"Unique Coins: {df['Coin'].nunique()}")
-st.write(f"Sentiment data coverage: {df['sentiment'].notna().mean():.0%} of trades")
-
-st.subheader("Sample Data")
-st.write(df.head())
-
-
-# 1. Trade Side Distribution
-st.markdown('<a id="trade-side-distribution"></a><h2>📈 1. Trade Side Distribution</h2>', unsafe_allow_html=True)
-st.markdown("This chart shows the number of buy and sell trades.")
-fig1, ax1 = create_countplot(df, 'Side', "Buy vs Sell Trade Counts", palette=['#377eb8', '#e41a1c'])
-fig1.set_size_inches(5, 3)  # Reduced size
-ax1.set_xlabel("Trade Side", labelpad=10)  # Add padding to x-axis label
-ax1.set_ylabel("Count", labelpad=10)  # Add padding to y-axis label
-st.pyplot(fig1)
-side = df['Side'].mode()[0]
-st.info(f"Most trades are {side}s. This may reflect a market bias or trader preference. If you notice a persistent bias, consider if it aligns with prevailing sentiment or if it exposes you to one-sided risk.")
-
-
-# 2. Most Traded Coins
-st.markdown('<a id="most-traded-coins"></a><h2>💰 2. Most Traded Coins</h2>', unsafe_allow_html=True)
-st.markdown("Top 10 coins by number of trades.")
-top_coins = df['Coin'].value_counts().head(10)
-fig2, ax2 = plt.subplots(figsize=(6, 3))  # Reduced size
-sns.barplot(x=top_coins.index, y=top_coins.values, ax=ax2, palette='viridis')
-ax2.set_title("Top 10 Traded Coins by Number of Trades")
-ax2.set_xlabel("Coin", labelpad=10)  # Add padding to x-axis label
-ax2.set_ylabel("Number of Trades", labelpad=10)  # Add padding to y-axis label
-ax2.tick_params(axis='x', rotation=45)  # Rotate x-axis labels for better readability
-st.pyplot(fig2)
-st.info("The most traded coins may reflect current market trends or trader preferences. Focus your analysis on these coins for the most actionable insights.")
-
-
-# 3. Trade Size (USD) Distribution by Coin
-st.markdown('<a id="trade-size-distribution"></a><h2>📦 3. Trade Size (USD) Distribution by Coin</h2>', unsafe_allow_html=True)
-st.markdown("Boxplot of trade sizes (USD) for the top traded coins.")
-fig3, ax3 = plt.subplots(figsize=(6, 3))  # Reduced size
-sns.boxplot(data=df[df['Coin'].isin(top_coins.index)], x='Coin', y='Size USD', ax=ax3)
-ax3.set_yscale('log')
-ax3.set_title("Log Scale Distribution of Trade Size (USD) by Top Coins")
-ax3.set_xlabel("Coin", labelpad=10)  # Add padding to x-axis label
-ax3.set_ylabel("Trade Size (USD)", labelpad=10)  # Add padding to y-axis label
-ax3.tick_params(axis='x', rotation=45)  # Rotate x-axis labels for better readability
-st.pyplot(fig3)
-st.info("Wide variation in trade size may indicate different trader types (retail vs. institutional) or changing conviction. Outliers can signal large players or unusual activity.")
-
-
-# 4. Closed PnL Overview
-st.markdown('<a id="closed-pnl-overview"></a><h2>📉 4. Closed PnL Overview</h2>', unsafe_allow_html=True)
-st.markdown("Distribution of profit and loss (PnL) for all trades.")
-fig4, ax4 = plt.subplots(figsize=(6, 3))  # Reduced size
-sns.histplot(df['Closed PnL'].dropna(), bins=50, kde=True, ax=ax4)
-ax4.set_title("Distribution of Closed PnL")
-ax4.set_xlabel("Closed PnL", labelpad=10)  # Add padding to x-axis label
-ax4.set_ylabel("Frequency", labelpad=10)  # Add padding to y-axis label
-st.pyplot(fig4)
-mean_pnl = df['Closed PnL'].mean()
-median_pnl = df['Closed PnL'].median()
-st.info(f"Average PnL: {mean_pnl:.2f}, Median: {median_pnl:.2f}. If your average PnL is positive, your strategy is profitable overall. Compare the mean and median: if the mean is much higher, a few big wins may be driving results; if the median is higher, your wins are more consistent.")
-
-
-# 5. Trade Frequency Over Time
-st.markdown('<a id="trade-frequency-over-time"></a><h2>📅 5. Trade Frequency Over Time</h2>', unsafe_allow_html=True)
-st.markdown("Number of trades per day.")
-trade_counts = df.groupby(df['Timestamp IST'].dt.date).size()
-fig5, ax5 = plt.subplots(figsize=(6, 3))  # Reduced size
-trade_counts.plot(ax=ax5)
-ax5.set_title("Number of Trades Per Day")
-ax5.set_xlabel("Date", labelpad=10)  # Add padding to x-axis label
-ax5.set_ylabel("Number of Trades", labelpad=10)  # Add padding to y-axis label
-ax5.tick_params(axis='x', rotation=45)  # Rotate x-axis labels for better readability
-st.pyplot(fig5)
-st.info("Spikes or drops in daily trade frequency may be linked to news, sentiment shifts, or market events. Use these patterns to time entries or exits.")
-
-
-# 6. Average Execution Price Over Time (Top 3 Coins)
-st.markdown('<a id="average-execution-price-over-time-top-3-coins"></a><h2>📊 6. Average Execution Price Over Time (Top 3 Coins)</h2>', unsafe_allow_html=True)
-st.markdown("Shows how the average execution price changes over time for the most traded coins.")
-top_3_coins = top_coins.head(3).index
-df_top3 = df[df['Coin'].isin(top_3_coins)]
-avg_price = df_top3.groupby(['Timestamp IST', 'Coin'])['Execution Price'].mean().unstack()
-fig6, ax6 = plt.subplots(figsize=(6, 3))  # Reduced size
-avg_price.plot(ax=ax6)
-ax6.set_title("Average Execution Price Over Time for Top 3 Coins")
-ax6.set_xlabel("Timestamp", labelpad=10)  # Add padding to x-axis label
-ax6.set_ylabel("Average Execution Price", labelpad=10)  # Add padding to y-axis label
-ax6.tick_params(axis='x', rotation=45)  # Rotate x-axis labels for better readability
-st.pyplot(fig6)
-st.info("Tracking execution price trends helps you spot momentum, mean reversion, or regime changes in the most active coins.")
-
-
-# 7. Fees Paid by Top Coins
-st.markdown('<a id="fees-paid-by-top-coins"></a><h2>💸 7. Fees Paid by Top Coins</h2>', unsafe_allow_html=True)
-st.markdown("Total fees paid per coin for the top traded coins.")
-fee_sum = df.groupby('Coin')['Fee'].sum().loc[top_coins.index]
-fig7, ax7 = plt.subplots(figsize=(8, 4))
-sns.barplot(x=fee_sum.index, y=fee_sum.values, ax=ax7, palette='magma')
-ax7.set_title("Total Fees Paid per Coin")
-ax7.set_ylabel("Total Fees")
-ax7.set_xlabel("Coin")
-st.pyplot(fig7)
-st.info("High fees on certain coins may indicate high activity or less efficient trading. Consider fee impact when choosing which coins to trade.")
-
-
-# 8. Correlation Matrix of Numeric Features
-st.markdown('<a id="correlation-matrix-of-numeric-features"></a><h2>🔗 8. Correlation Matrix of Numeric Features</h2>', unsafe_allow_html=True)
-st.markdown("Correlation between trade size, price, PnL, and fees.")
-num_df = df[num_cols + ['Execution Price']]
-corr = num_df.corr()
-fig8, ax8 = plt.subplots(figsize=(8,6))
-sns.heatmap(corr, annot=True, cmap='coolwarm', ax=ax8)
-ax8.set_title("Correlation Heatmap")
-st.pyplot(fig8)
-st.info("Strong correlations between features can help you build predictive models or spot risk factors. For example, if PnL and trade size are highly correlated, larger trades may be riskier or more profitable.")
-
-# --- Advanced EDA: Relating Performance to Sentiment ---
-st.markdown('<a id="trader-performance-by-market-sentiment"></a><h2>📈 9. Trader Performance by Market Sentiment</h2>', unsafe_allow_html=True)
-st.markdown("How does trader performance (PnL, win rate, trade size) change with market sentiment?")
-sentiment_order = ['Fear', 'Neutral', 'Greed']
-sentiment_pnl = df.groupby('sentiment')['Closed PnL'].mean().reindex(sentiment_order)
-fig9, ax9 = plt.subplots()
-sentiment_pnl.plot(kind='bar', color=['red','gray','green'], ax=ax9)
-ax9.set_title('Average Closed PnL by Sentiment')
-ax9.set_ylabel('Average Closed PnL')
-st.pyplot(fig9)
-best_sent = sentiment_pnl.idxmax()
-worst_sent = sentiment_pnl.idxmin()
-st.info(f"Traders tend to have the highest average PnL during {best_sent} periods and the lowest during {worst_sent} periods. This suggests you may want to be more aggressive or take more risk during {best_sent} and be more cautious during {worst_sent}.")
-
-# Win rate by sentiment
-df['win'] = df['Closed PnL'] > 0
-sentiment_win = df.groupby('sentiment')['win'].mean().reindex(sentiment_order)
-fig10, ax10 = plt.subplots()
-sentiment_win.plot(kind='bar', color=['red','gray','green'], ax=ax10)
-ax10.set_title('Win Rate by Sentiment')
-ax10.set_ylabel('Win Rate')
-st.pyplot(fig10)
-best_win = sentiment_win.idxmax()
-worst_win = sentiment_win.idxmin()
-st.info(f"Win rate is highest during {best_win} and lowest during {worst_win}. This means your strategy may be more reliable in {best_win} markets. Consider adjusting your position size or risk tolerance based on the current sentiment.")
-
-# Trade volume by sentiment
-sentiment_vol = df.groupby('sentiment')['Size USD'].sum().reindex(sentiment_order)
-fig11, ax11 = plt.subplots()
-sentiment_vol.plot(kind='bar', color=['red','gray','green'], ax=ax11)
-ax11.set_title('Total Trade Volume (USD) by Sentiment')
-ax11.set_ylabel('Total Volume (USD)')
-st.pyplot(fig11)
-max_vol_sent = sentiment_vol.idxmax()
-st.info(f"Trade volume is highest during {max_vol_sent} periods. High volume in a sentiment regime may indicate crowd behavior or increased opportunity, but also higher risk of reversals.")
-
-# PnL volatility by sentiment
-sentiment_pnl_vol = df.groupby('sentiment')['Closed PnL'].std().reindex(sentiment_order)
-fig12, ax12 = plt.subplots()
-sentiment_pnl_vol.plot(kind='bar', color=['red','gray','green'], ax=ax12)
-ax12.set_title('PnL Volatility by Sentiment')
-ax12.set_ylabel('PnL Std Dev')
-st.pyplot(fig12)
-max_vol = sentiment_pnl_vol.idxmax()
-st.info(f"PnL volatility is highest during {max_vol} periods. High volatility means larger swings in profit and loss, so you may want to reduce position size or use tighter stops during these times.")
-
-# Streaks of winning/losing trades
-st.markdown('<a id="streaks-of-winning-and-losing-trades"></a><h2>🔄 10. Streaks of Winning and Losing Trades</h2>', unsafe_allow_html=True)
-st.markdown("How long do traders stay on a winning or losing streak?")
-streaks = []
-current = None
-for val in df['win']:
-    if current is None or val != current['type']:
-        if current is not None:
-            streaks.append(current)
-        current = {'type': val, 'length': 1}
-    else:
-        current['length'] += 1
-if current is not None:
-    streaks.append(current)
-streaks_df = pd.DataFrame(streaks)
-fig13, ax13 = plt.subplots()
-streaks_df['length'].hist(bins=30, ax=ax13)
-ax13.set_title('Distribution of Win/Loss Streak Lengths')
-ax13.set_xlabel('Streak Length')
-ax13.set_ylabel('Count')
-st.pyplot(fig13)
-longest_win = streaks_df[streaks_df['type']==True]['length'].max()
-longest_loss = streaks_df[streaks_df['type']==False]['length'].max()
-st.info(f"Long winning streaks (max: {longest_win}) and losing streaks (max: {longest_loss}) are rare. After a long streak, traders often experience a reversal. Consider reducing risk or taking profits after a long win streak, and reviewing your strategy after a losing streak.")
-
-
-# --- Summary Section ---
-st.markdown('<a id="summary--key-takeaways"></a><h2>📌 Summary & Key Takeaways</h2>', unsafe_allow_html=True)
-st.markdown('''
-**Key Insights:**
-- Trader performance and behavior shift with market sentiment. Highest PnL and win rates often occur in specific sentiment regimes.
-- Trade size, frequency, and volume patterns reveal crowd behavior and market cycles.
-- Outliers and streaks can signal regime changes or the need for risk management.
-- Correlations between features can inform predictive models and risk controls.
-
-**Actionable Tips:**
-- Adjust your trading strategy based on sentiment, trade size, and recent streaks.
-- Monitor top coins and fee impact for best opportunities.
-- Use EDA findings to refine your risk management and strategy timing.
-''')
+if filters != NO_FILTERS and not len(trades()):
+    st.warning("No trades match the filters.")
+else:
+    registry.show_selected(choice)
 
 # Show raw data if needed
-if st.checkbox("Show raw data"):
-    st.write(df)
+if not LOW_MEMORY and st.checkbox("Show raw data"):
+    st.write(registry.resolve('df'))
 
+# Stage timings (EDA_PROFILE=1)
+show_panel()
@@ -0,0 +1,182 @@
+import argparse
+import os
+import sys
+from typing import Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Synthetic trade history and Fear & Greed data at any scale.
+#
+# Trades follow the historical_data.csv schema, with Zipf-skewed activity
+# across accounts and coins, a geometric random walk of prices per coin,
+# log-normal trade sizes, realized PnL only on closing trades (heavy-tailed)
+# and fees proportional to notional. Timestamps are sorted and written in the
+# export's formats ('dd-mm-yyyy HH:MM' IST plus epoch milliseconds). Rows are
+# generated and written in chunks, so 100M-row files need no more memory than
+# a single chunk. The same seed always produces the same file.
+#
+#   python synth.py --trades 10_000_000 --out data/
+
+TRADE_COLUMNS = ['Account', 'Coin', 'Execution Price', 'Size Tokens', 'Size USD', 'Side', 'Timestamp IST',
+                 'Start Position', 'Direction', 'Closed PnL', 'Transaction Hash', 'Order ID', 'Crossed', 'Fee',
+                 'Trade ID', 'Timestamp']
+MAJOR_COINS = ['BTC', 'ETH', 'SOL', 'HYPE', 'XRP', 'DOGE', 'SUI', 'BNB', 'AVAX', 'LINK', 'ENA', 'kPEPE',
+               'WIF', 'FARTCOIN', 'TRUMP', 'ADA', 'LTC', 'AAVE', 'TAO', 'ONDO']
+CHUNK_ROWS = 1_000_000
+IST_OFFSET_MS = 19_800_000  # +05:30
+FEE_RATE = 0.00035
+
+
+def coin_names(n: int) -> List[str]:
+    return MAJOR_COINS[:n] + [f'@{i}' for i in range(max(0, n - len(MAJOR_COINS)))]
+
+
+def _zipf_weights(n: int, s: float) -> np.ndarray:
+    w = 1.0 / np.arange(1, n + 1) ** s
+    return w / w.sum()
+
+
+def _day_ms(day: str) -> int:
+    return int(pd.Timestamp(day).value // 1_000_000)
+
+
+# 'dd-mm-yyyy HH:MM' for minute-resolution epoch ms; strftime per row is the
+# slowest part of generation, so days and times of day are formatted once
+def _format_ist(ms: np.ndarray) -> np.ndarray:
+    local = (ms + IST_OFFSET_MS) // 60_000
+    day, minute = np.divmod(local, 1440)
+    days, day_idx = np.unique(day, return_inverse=True)
+    day_str = pd.to_datetime(days, unit='D').strftime('%d-%m-%Y ').to_numpy(object)
+    minute_str = np.array([f'{m // 60:02d}:{m % 60:02d}' for m in range(1440)], dtype=object)
+    return day_str[day_idx] + minute_str[minute]
+
+
+def iter_trades(n: int, accounts: int = 32, coins: int = 60, start: str = '2023-05-01', end: str = '2025-05-01',
+                seed: int = 0, chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    rng = np.random.default_rng(seed)
+    account_ids = np.array([f'0x{i:040x}' for i in range(1, accounts + 1)], dtype=object)
+    names = np.array(coin_names(coins), dtype=object)
+    account_p = _zipf_weights(accounts, 1.1)
+    coin_p = _zipf_weights(coins, 1.3)
+    # Per-coin starting price (BTC-like down to sub-cent) and daily volatility
+    base_price = np.exp(rng.uniform(np.log(1e-3), np.log(5e3), coins))
+    base_price[0] = 30_000.0
+    daily_vol = rng.uniform(0.01, 0.05, coins)
+    first_ms, last_ms = _day_ms(start), _day_ms(end)
+    span_days = max(1, (last_ms - first_ms) // 86_400_000)
+    # One price path per coin, one step per day, shared by all chunks
+    steps = rng.normal(0, daily_vol, size=(span_days + 1, coins))
+    path = base_price * np.exp(np.cumsum(steps, axis=0))
+
+    # Sorted uniform times over the span, generated chunk by chunk: each
+    # chunk covers the next slice of the span in proportion to its rows
+    written = 0
+    while written < n:
+        rows = min(chunk_rows, n - written)
+        lo = first_ms + (last_ms - first_ms) * written // n
+        hi = first_ms + (last_ms - first_ms) * (written + rows) // n
+        ms = np.sort(rng.integers(lo, max(hi, lo + 1), rows))
+        ms -= ms % 60_000  # the export has minute resolution
+        day = np.minimum((ms - first_ms) // 86_400_000, span_days)
+
+        coin = rng.choice(coins, rows, p=coin_p)
+        price = path[day, coin] * np.exp(rng.normal(0, daily_vol[coin] / 4))
+        size_usd = np.exp(rng.normal(6.0, 1.6, rows))  # median about $400, long right tail
+        side = np.where(rng.random(rows) < 0.49, 'BUY', 'SELL')
+        closing = rng.random(rows) < 0.45
+        direction = np.where(side == 'BUY', np.where(closing, 'Close Short', 'Open Long'),
+                             np.where(closing, 'Close Long', 'Open Short'))
+        pnl = np.where(closing, size_usd * 0.02 * rng.standard_t(3, rows) + size_usd * 0.002, 0.0)
+        trade_id = np.arange(written, written + rows, dtype=np.int64)
+
+        frame = pd.DataFrame({
+            'Account': account_ids[rng.choice(accounts, rows, p=account_p)],
+            'Coin': names[coin],
+            'Execution Price': price.round(6),
+            'Size Tokens': size_usd / price,
+            'Size USD': size_usd.round(2),
+            'Side': side,
+            'Timestamp IST': _format_ist(ms),
+            'Start Position': (rng.normal(0, 1, rows) * size_usd / price).round(6),
+            'Direction': direction,
+            'Closed PnL': pnl,
+            'Transaction Hash': pd.Series(rng.integers(0, 2 ** 63, rows)).map('0x{:064x}'.format).to_numpy(),
+            'Order ID': rng.integers(10 ** 10, 10 ** 11, rows),
+            'Crossed': rng.random(rows) < 0.7,
+            'Fee': (size_usd * FEE_RATE * rng.uniform(0.5, 1.5, rows)).round(6),
+            'Trade ID': seed * 10 ** 12 + trade_id,
+            'Timestamp': ms.astype(np.float64),
+        }, columns=TRADE_COLUMNS)
+        yield frame
+        written += rows
+
+
+def generate_trades(n: int, **kwargs) -> pd.DataFrame:
+    return pd.concat(list(iter_trades(n, **kwargs)), ignore_index=True)
+
+
+def write_trades(path: str, n: int, **kwargs) -> str:
+    tmp = path + '.tmp'
+    with open(tmp, 'w', newline='') as f:
+        for i, chunk in enumerate(iter_trades(n, **kwargs)):
+            chunk.to_csv(f, header=i == 0, index=False)
+        if n == 0:
+            f.write(','.join(TRADE_COLUMNS) + '\n')
+    os.replace(tmp, path)
+    return path
+
+
+# Index thresholds of the published classifications
+def classify(values: np.ndarray) -> np.ndarray:
+    labels = np.array(['Extreme Fear', 'Fear', 'Neutral', 'Greed', 'Extreme Greed'], dtype=object)
+    return labels[np.searchsorted([25, 47, 55, 76], values, side='right')]
+
+
+# Daily index as a persistent AR(1) process around 50, so regimes last days
+# to weeks like the real series
+def generate_sentiment(start: str = '2018-02-01', end: str = '2025-05-02', seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed + 1)
+    days = pd.date_range(start, end, freq='D')
+    values = np.empty(len(days))
+    level = 50.0
+    shocks = rng.normal(0, 5, len(days))
+    for i, shock in enumerate(shocks):
+        level = 50 + 0.97 * (level - 50) + shock
+        values[i] = level
+    values = np.clip(np.rint(values), 0, 100).astype(int)
+    return pd.DataFrame({
+        'timestamp': days.asi8 // 10 ** 9 + IST_OFFSET_MS // 1000,
+        'value': values,
+        'classification': classify(values),
+        'date': days.strftime('%Y-%m-%d'),
+    })
+
+
+def write_sentiment(path: str, **kwargs) -> str:
+    generate_sentiment(**kwargs).to_csv(path, index=False)
+    return path
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Write synthetic historical_data.csv / fear_greed_index.csv files.")
+    parser.add_argument('--trades', type=lambda s: int(float(s.replace('_', ''))), default=1_000_000,
+                        help="number of trade rows (default 1e6; accepts 1e7 or 10_000_000)")
+    parser.add_argument('--accounts', type=int, default=32)
+    parser.add_argument('--coins', type=int, default=60)
+    parser.add_argument('--start', default='2023-05-01')
+    parser.add_argument('--end', default='2025-05-01')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='.', help="output directory (default: current directory)")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.out, exist_ok=True)
+    write_sentiment(os.path.join(args.out, 'fear_greed_index.csv'), seed=args.seed)
+    write_trades(os.path.join(args.out, 'historical_data.csv'), args.trades, accounts=args.accounts,
+                 coins=args.coins, start=args.start, end=args.end, seed=args.seed)
+    print(f"wrote {args.trades:,} trades to {os.path.join(args.out, 'historical_data.csv')}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
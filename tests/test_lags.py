@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import lags
+import synth
+import trade_sections
+from align import align_sentiment
+from ingest import TradeAggregates
+from preprocess import clean_sentiment, clean_trades
+from sentiment_state import sentiment_numbers
+
+
+@pytest.fixture(scope='module')
+def data():
+    sent = clean_sentiment(synth.generate_sentiment(start='2023-01-01', end='2024-12-31', seed=3))
+    df = clean_trades(synth.generate_trades(20_000, start='2023-03-01', end='2024-12-01', seed=3))
+    df['sentiment'] = align_sentiment(df['date'], sent)
+    agg = TradeAggregates().update(df)
+    return df, sent, agg, lags.daily_stats(agg.cube)
+
+
+@pytest.mark.parametrize('block', [1, 7])
+def test_bootstrap_weights_resample_every_day(block):
+    weights = lags.bootstrap_weights(100, 50, block=block, seed=1)
+    assert weights.shape == (50, 100)
+    assert (weights.sum(axis=1) == 100).all()
+    assert (weights >= 0).all()
+
+
+def test_sentiment_lags_match_naive_merge(data):
+    df, sent, _, daily = data
+    table = lags.sentiment_lags(daily, sent, max_lag=5, resamples=50)
+    for lag in (0, 2, 5):
+        lagged = align_sentiment(df['date'], sent, lag=lag)
+        groups = df.assign(lagged=lagged).groupby('lagged', observed=False)['Closed PnL']
+        for state in ['Fear', 'Neutral', 'Greed']:
+            row = table.loc[(lag, state)]
+            assert row['trades'] == (lagged == state).sum()
+            assert np.isclose(row['pnl_mean'], groups.mean()[state])
+            assert np.isclose(row['win_rate'], groups.apply(lambda pnl: (pnl > 0).mean())[state])
+        spread = table.loc[(lag, lags.SPREAD)]
+        assert np.isclose(spread['pnl_mean'], groups.mean()['Greed'] - groups.mean()['Fear'])
+
+
+def test_sentiment_lags_intervals_match_naive_resampling(data):
+    _, sent, _, daily = data
+    resamples, lag = 200, 2
+    table = lags.sentiment_lags(daily, sent, max_lag=lag, resamples=resamples)
+    weights = lags.bootstrap_weights(len(daily), resamples, seed=0)
+    greed = (align_sentiment(pd.Series(daily.index), sent, lag=lag) == 'Greed').to_numpy()
+    replicates = [(daily['pnl_sum'].to_numpy() * w * greed).sum() / (daily['pnl_n'].to_numpy() * w * greed).sum()
+                  for w in weights]
+    expected = np.quantile(replicates, [0.025, 0.975])
+    assert np.allclose(table.loc[(lag, 'Greed'), ['pnl_low', 'pnl_high']].to_numpy(float), expected)
+
+
+def test_rolling_greed_lags_match_corrcoef(data):
+    _, sent, _, daily = data
+    table = lags.rolling_greed_lags(daily, sent, max_lag=6, resamples=50)
+    rolling = pd.Series(sentiment_numbers(sent['sentiment']).rolling(lags.WINDOW).mean().to_numpy(), index=sent['date'])
+    x = rolling.reindex(daily.index - pd.Timedelta(days=6)).to_numpy()
+    y = (daily['pnl_sum'] / daily['pnl_n']).to_numpy()
+    ok = np.isfinite(x) & np.isfinite(y)
+    assert table.loc[6, 'days'] == ok.sum()
+    assert np.isclose(table.loc[6, 'pnl_corr'], np.corrcoef(x[ok], y[ok])[0, 1])
+
+
+def test_too_few_days_have_no_interval(data):
+    _, sent, _, _ = data
+    greed_days = sent.loc[sent['sentiment'] == 'Greed', 'date'].iloc[-5:]
+    daily = pd.DataFrame({'count': 100.0, 'pnl_n': 100.0, 'pnl_sum': 50.0, 'wins': 40.0},
+                         index=pd.DatetimeIndex(greed_days))
+    table = lags.sentiment_lags(daily, sent, max_lag=0, resamples=50)
+    assert table.loc[(0, 'Greed'), 'days'] == 5
+    assert table.loc[(0, 'Greed'), ['pnl_low', 'pnl_high']].isna().all()
+    # No Fear days: the spread has no counts either
+    assert table.loc[(0, lags.SPREAD), ['days', 'trades']].tolist() == [0, 0]
+    assert lags.significant(table.xs(lags.SPREAD, level='state')).empty
+
+
+def test_section_reports_too_few_days(data):
+    df, sent, _, _ = data
+    few = df[df['date'] < df['date'].min() + pd.Timedelta(days=10)]
+    section = trade_sections.sentiment_lead_lag(TradeAggregates().update(few), sent, max_lag=3)
+    assert section.blocks[-2].text.startswith('Not enough trade days')
+
+
+def test_section_headlines_planted_effect(data):
+    df, sent, _, _ = data
+    planted = df.copy()
+    planted['Closed PnL'] = planted['Closed PnL'] + np.where(align_sentiment(df['date'], sent, lag=3) == 'Greed', 50.0, 0.0)
+    section = trade_sections.sentiment_lead_lag(TradeAggregates().update(planted), sent, max_lag=5)
+    assert section.blocks[-2].text.startswith('Sentiment')
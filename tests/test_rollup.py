@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+import rollup
+
+
+def _trades(n: int, offset: float, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 20, n), 'D'),
+        'Coin': rng.choice(['BTC', 'ETH', 'SOL'], n),
+        'Side': rng.choice(['BUY', 'SELL'], n),
+        'sentiment': rng.choice(['Fear', 'Neutral', 'Greed'], n),
+        'Closed PnL': offset + rng.normal(0, 1, n),
+        'Fee': 1.0,
+        'Size USD': 10.0,
+    })
+    df.loc[::7, 'Closed PnL'] = np.nan
+    return df
+
+
+def test_merged_chunks_match_direct_summary():
+    df = _trades(20_000, 0.0)
+    whole = rollup.summarize(rollup.rollup(rollup.build_cube(df), 'sentiment'))
+    chunks = rollup.merge_cubes(*(rollup.build_cube(df.iloc[i:i + 3_000]) for i in range(0, len(df), 3_000)))
+    merged = rollup.summarize(rollup.rollup(chunks, 'sentiment'))
+    pd.testing.assert_frame_equal(whole, merged, check_exact=False, rtol=1e-9)
+    expected = df.groupby('sentiment')['Closed PnL'].agg(['mean', 'std'])
+    assert np.allclose(merged['pnl_mean'], expected['mean'])
+    assert np.allclose(merged['pnl_std'], expected['std'])
+
+
+def test_std_survives_a_large_mean():
+    df = _trades(20_000, 1e9)
+    cube = rollup.merge_cubes(*(rollup.build_cube(df.iloc[i:i + 3_000]) for i in range(0, len(df), 3_000)))
+    summary = rollup.summarize(rollup.rollup(cube, ['Coin', 'Side']))
+    expected = df.groupby(['Coin', 'Side'])['Closed PnL'].std()
+    assert np.allclose(summary['pnl_std'], expected, rtol=1e-6)
@@ -0,0 +1,262 @@
+import re
+import sys
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Timestamp normalization for the raw CSVs.
+#
+# Formats are detected once per column from an evenly spaced sample rather
+# than guessed from the first value (which reads the export's dd-mm-yyyy as
+# month-first), and kept per column and value shape. Fixed-width formats are
+# then parsed by slicing digits out of a byte array; anything else goes
+# through pd.to_datetime with the explicit format. Epoch columns are
+# converted by integer arithmetic, with the unit chosen from their magnitude.
+#
+# When a file carries both an epoch column and a formatted local time (the
+# trade export's 'Timestamp' in UTC ms and 'Timestamp IST'; the F&G file's
+# 'timestamp' and 'date'), the local time is derived from the epoch after
+# checking a sample of rows against the strings, so the strings are only
+# parsed where the epoch is missing or when the two disagree.
+#
+# Every normalization returns a report: the method used and how many rows
+# became NaT because the value was missing, did not match the format or was
+# out of range.
+
+# Tried in order; day-first comes before month-first because the trade export
+# writes dd-mm-yyyy, and only an unambiguous sample is cached
+CANDIDATE_FORMATS = ['%d-%m-%Y %H:%M', '%d-%m-%Y %H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d',
+                     '%d-%m-%Y', '%d/%m/%Y %H:%M', '%d/%m/%Y', '%m/%d/%Y %H:%M', '%m/%d/%Y', '%Y-%m-%dT%H:%M:%S']
+SAMPLE_ROWS = 2000
+IST_OFFSET = pd.Timedelta(hours=5, minutes=30)
+# Epoch unit by magnitude: seconds until ~5138 AD, then ms, us, ns
+EPOCH_UNITS = [('s', 1e11, 10 ** 9), ('ms', 1e14, 10 ** 6), ('us', 1e17, 10 ** 3), ('ns', np.inf, 1)]
+# Sanity range for epoch values
+MIN_TIME = np.datetime64('1990-01-01', 'ns')
+MAX_TIME = np.datetime64('2100-01-01', 'ns')
+
+_formats: Dict[Tuple[str, str], str] = {}
+_FIELDS = {'d': 2, 'm': 2, 'Y': 4, 'H': 2, 'M': 2, 'S': 2}
+
+
+def _shape(value: str) -> str:
+    return re.sub(r'\d', '9', value)
+
+
+def _sample(values: pd.Series, n: int = SAMPLE_ROWS) -> pd.Series:
+    if len(values) <= n:
+        return values
+    return values.iloc[np.linspace(0, len(values) - 1, n).astype(int)]
+
+
+def detect_format(values: pd.Series, column: str = '') -> Optional[str]:
+    """strptime format of a string column, or None if it holds no strings."""
+    strings = values.dropna()
+    if strings.empty or not isinstance(strings.iloc[0], str):
+        return None
+    key = (column, _shape(strings.iloc[0]))
+    if key in _formats:
+        return _formats[key]
+    sample = _sample(strings)
+    scores = [(pd.to_datetime(sample, format=fmt, errors='coerce').notna().sum(), fmt) for fmt in CANDIDATE_FORMATS]
+    best = max(score for score, _ in scores)
+    if best == 0:
+        return None
+    winners = [fmt for score, fmt in scores if score == best]
+    if len(winners) == 1:
+        _formats[key] = winners[0]
+    return winners[0]
+
+
+def _resolution(fmt: str) -> str:
+    for code, freq in (('%S', 's'), ('%M', 'min'), ('%H', 'h')):
+        if code in fmt:
+            return freq
+    return 'D'
+
+
+# Digits of fixed-width strings, sliced from a (rows, width) byte array;
+# None when the format or the data is not fixed-width ASCII
+def _parse_fixed(values: pd.Series, fmt: str) -> Optional[np.ndarray]:
+    tokens = re.findall(r'%(.)|([^%]+)', fmt)
+    if any(code and code not in _FIELDS for code, _ in tokens):
+        return None
+    width = sum(_FIELDS[code] if code else len(lit) for code, lit in tokens)
+    present = values.notna().to_numpy()
+    try:
+        raw = np.asarray(values.to_numpy(object)[present], dtype=f'S{width + 1}')
+    except (UnicodeEncodeError, TypeError, ValueError):
+        return None
+    if len(raw) and (np.char.str_len(raw) != width).any():
+        return None
+    chars = raw.view(np.uint8).reshape(len(raw), width + 1)[:, :width].astype(np.int64) - ord('0')
+    fields, pos, ok = {}, 0, np.ones(len(raw), dtype=bool)
+    for code, lit in tokens:
+        if code:
+            digits = chars[:, pos:pos + _FIELDS[code]]
+            ok &= ((digits >= 0) & (digits <= 9)).all(axis=1)
+            fields[code] = (digits * 10 ** np.arange(_FIELDS[code] - 1, -1, -1)).sum(axis=1)
+            pos += _FIELDS[code]
+        else:
+            ok &= (chars[:, pos:pos + len(lit)] == np.frombuffer(lit.encode(), np.uint8).astype(np.int64) - ord('0')).all(axis=1)
+            pos += len(lit)
+    year = fields.get('Y', np.full(len(raw), 1970))
+    month, day = (fields.get(c, np.ones(len(raw), int)) for c in 'md')
+    hour, minute, second = (fields.get(c, np.zeros(len(raw), int)) for c in 'HMS')
+    ok &= (month >= 1) & (month <= 12) & (day >= 1) & (hour < 24) & (minute < 60) & (second < 60)
+    months = np.where(ok, (year - 1970) * 12 + month - 1, 0).astype('datetime64[M]')
+    days = months.astype('datetime64[D]') + np.where(ok, day - 1, 0)
+    ok &= days.astype('datetime64[M]') == months  # e.g. 31-04 rolls into May
+    stamps = days.astype('datetime64[ns]') + ((hour * 60 + minute) * 60 + second).astype('timedelta64[s]')
+    out = np.full(len(values), np.datetime64('NaT'), dtype='datetime64[ns]')
+    out[np.flatnonzero(present)[ok]] = stamps[ok]
+    return out
+
+
+def parse_strings(values: pd.Series, fmt: Optional[str]) -> pd.Series:
+    if fmt is not None:
+        fixed = _parse_fixed(values, fmt)
+        if fixed is not None:
+            return pd.Series(fixed, index=values.index, name=values.name)
+    return pd.to_datetime(values, format=fmt, errors='coerce')
+
+
+def epoch_unit(values: np.ndarray) -> str:
+    finite = np.abs(values[np.isfinite(values)])
+    magnitude = np.median(finite) if len(finite) else 0
+    return next(unit for unit, limit, _ in EPOCH_UNITS if magnitude < limit)
+
+
+# Epoch numbers -> datetime64[ns] (naive UTC), the rows out of range and the unit
+def parse_epoch(values: pd.Series, unit: Optional[str] = None) -> Tuple[pd.Series, np.ndarray, str]:
+    numbers = pd.to_numeric(values, errors='coerce').to_numpy(np.float64)
+    unit = unit or epoch_unit(numbers)
+    scale = dict((u, s) for u, _, s in EPOCH_UNITS)[unit]
+    finite = np.isfinite(numbers)
+    with np.errstate(invalid='ignore', over='ignore'):
+        approx = numbers * scale
+        in_range = finite & (approx >= MIN_TIME.astype(np.int64)) & (approx < MAX_TIME.astype(np.int64))
+    # Whole units and the fraction separately: ms * 1e6 exceeds float64's
+    # exact integer range
+    whole = np.floor(np.where(in_range, numbers, 0))
+    ns = whole.astype(np.int64) * scale + np.rint((np.where(in_range, numbers, 0) - whole) * scale).astype(np.int64)
+    stamps = np.where(in_range, ns.view('datetime64[ns]'), np.datetime64('NaT'))
+    return pd.Series(stamps, index=values.index, name=values.name), finite & ~in_range, unit
+
+
+def _report(method: str, raw: pd.Series, parsed: pd.Series, out_of_range: Optional[np.ndarray] = None,
+            checked: int = 0, mismatched: int = 0) -> Dict:
+    missing = raw.isna().to_numpy()
+    nat = parsed.isna().to_numpy()
+    out_of_range = np.zeros(len(raw), dtype=bool) if out_of_range is None else out_of_range
+    bad = nat & ~missing & ~out_of_range
+    return {'method': method, 'rows': int(len(raw)), 'nat': int(nat.sum()), 'missing': int((nat & missing).sum()),
+            'unparseable': int(bad.sum()), 'out_of_range': int((nat & out_of_range).sum()),
+            'examples': [str(v) for v in raw[bad | (nat & out_of_range)].head(5)],
+            'checked': checked, 'mismatched': mismatched}
+
+
+def normalize(df: pd.DataFrame, column: str, epoch_column: Optional[str] = None,
+              offset: pd.Timedelta = pd.Timedelta(0), fmt: Optional[str] = None,
+              convert_epoch: bool = True) -> Dict[str, Dict]:
+    """Parse `column` (and `epoch_column`) of `df` in place; returns their reports.
+
+    `column` is a local time written as a string; `epoch_column`, if present,
+    holds the same instant as an epoch number, with `column` = epoch + `offset`.
+    With `convert_epoch` False the epoch column is used but left as numbers.
+    """
+    reports = {}
+    derived = None
+    if epoch_column and epoch_column in df:
+        raw_epoch = df[epoch_column]
+        stamps, out_of_range, unit = parse_epoch(raw_epoch)
+        if convert_epoch:
+            df[epoch_column] = stamps
+            reports[epoch_column] = _report(f'epoch {unit}', raw_epoch, stamps, out_of_range)
+        derived = stamps + offset
+    if column not in df:
+        return reports
+    raw = df[column]
+    if raw.dtype.kind == 'M':
+        return reports
+    fmt = fmt or detect_format(raw, column)
+    checked = mismatched = 0
+    if derived is not None and fmt is not None:
+        derived = derived.dt.floor(_resolution(fmt))
+        both = raw.notna() & derived.notna()
+        sample = _sample(raw[both])
+        checked = len(sample)
+        # Strings that do not parse are reported as such, not as disagreement
+        check = parse_strings(sample, fmt)
+        mismatched = int((check.notna() & (check != derived[sample.index])).sum())
+    if derived is not None and checked and not mismatched:
+        parsed = derived
+        todo = derived.isna() & raw.notna()
+        if todo.any():
+            parsed = parsed.copy()
+            parsed[todo] = parse_strings(raw[todo], fmt)
+        method = f'derived from {epoch_column} (cross-checked against {fmt})'
+    else:
+        parsed = parse_strings(raw, fmt)
+        method = f'format {fmt}' if fmt else 'inferred'
+    parsed.name = column
+    df[column] = parsed
+    reports[column] = _report(method, raw, parsed, checked=checked, mismatched=mismatched)
+    return reports
+
+
+def normalize_trades(df: pd.DataFrame, formats: Optional[Dict[str, str]] = None) -> Dict[str, Dict]:
+    return normalize(df, 'Timestamp IST', 'Timestamp', IST_OFFSET, (formats or {}).get('Timestamp IST'))
+
+
+# F&G rows: 'timestamp' is the publication time in epoch seconds and 'date'
+# its UTC calendar day
+def normalize_sentiment(df: pd.DataFrame) -> Dict[str, Dict]:
+    reports = normalize(df, 'date', 'timestamp', convert_epoch=False)
+    if 'date' in df:
+        df['date'] = df['date'].dt.normalize()
+    return reports
+
+
+# One line per column with NaT rows, for logs and the dashboards
+def describe(reports: Dict[str, Dict]) -> List[str]:
+    lines = []
+    for column, r in reports.items():
+        if not r['nat'] and not r['mismatched']:
+            continue
+        reasons = ', '.join(f'{r[k]:,} {k.replace("_", " ")}' for k in ('missing', 'unparseable', 'out_of_range') if r[k])
+        line = f"{column}: {r['nat']:,} of {r['rows']:,} rows are NaT ({reasons or 'none'}; {r['method']})"
+        if r['mismatched']:
+            line += f"; {r['mismatched']} of {r['checked']} sampled rows disagreed with the epoch column"
+        if r['examples']:
+            line += f"; e.g. {', '.join(repr(e) for e in r['examples'][:3])}"
+        lines.append(line)
+    return lines
+
+
+# Add up reports from several chunks or frames
+def merge_reports(total: Dict[str, Dict], part: Dict[str, Dict]) -> Dict[str, Dict]:
+    for column, r in part.items():
+        if column not in total:
+            total[column] = dict(r, examples=list(r['examples']))
+            continue
+        t = total[column]
+        for k in ('rows', 'nat', 'missing', 'unparseable', 'out_of_range', 'checked', 'mismatched'):
+            t[k] += r[k]
+        t['examples'] = (t['examples'] + r['examples'])[:5]
+        if r['method'] != t['method'] and r['rows']:
+            t['method'] = 'mixed'
+    return total
+
+
+if __name__ == '__main__':
+    # python timestamps.py historical_data.csv [fear_greed_index.csv ...]
+    for path in sys.argv[1:]:
+        frame = pd.read_csv(path)
+        frame.columns = frame.columns.str.strip()
+        result = normalize_trades(frame) if 'Timestamp IST' in frame else normalize_sentiment(frame.rename(columns=str.lower))
+        for col, rep in result.items():
+            print(f"{path} {col}: {rep['method']}; {rep['nat']:,} NaT of {rep['rows']:,}")
+        for line in describe(result):
+            print('  ' + line)
@@ -0,0 +1,321 @@
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+from charts import (plot_avg_price, plot_correlation, plot_fees, plot_lag_correlation, plot_lag_effects,
+                    plot_pnl_distribution, plot_sentiment_bar, plot_side_counts, plot_streak_lengths, plot_top_coins,
+                    plot_trade_counts, plot_trade_sizes)
+from downsample import decimate_series, points_for, resample_mean
+from ingest import TradeAggregates
+from lags import MIN_DAYS, SPREAD, daily_stats, rolling_greed_lags, sentiment_lags, significant, testable
+from parallel import leaderboard, trader_stats
+from schema import SENTIMENT_ORDER
+from sections import LOW_MEMORY_NOTE, Figure, Info, Section, Table, Text
+from sketch import binned_kde, box_stats, histogram
+from streaks import run_lengths
+from timestamps import describe
+
+# Sections of the Trade History & Market Sentiment dashboard.
+#
+# Every function takes the trade aggregates (and, where individual trades are
+# needed, the typed trade frame, which is None in low-memory mode) plus the
+# options the dashboard exposes as widgets, and returns a Section.
+
+CORRELATION_ALL = 'All trades'
+STREAK_SCOPES = {'Per account': 'Account', 'Per coin': 'Coin', 'All trades': None}
+LAG_SIGNALS = ['Fear / Neutral / Greed', '30-day rolling greed']
+TOO_FEW_DAYS = ("Not enough trade days to test any lag: an interval needs at least {min_days} trade days "
+                "{sides}. Widen the filters or the date range.")
+
+
+def _best(values: pd.Series) -> str:
+    values = values.dropna()
+    return str(values.idxmax()) if len(values) else 'n/a'
+
+
+def _worst(values: pd.Series) -> str:
+    values = values.dropna()
+    return str(values.idxmin()) if len(values) else 'n/a'
+
+
+def overview(agg: TradeAggregates, df: Optional[pd.DataFrame] = None) -> Section:
+    values = {'trades': agg.rows, 'accounts': len(agg.accounts), 'coins': len(agg.coin_counts),
+              'sentiment_coverage': agg.sentiment_coverage}
+    blocks = [
+        Text(f"Total Trades: {agg.rows}"),
+        Text(f"Unique Accounts: {len(agg.accounts)}"),
+        Text(f"Unique Coins: {len(agg.coin_counts)}"),
+        Text(f"Sentiment data coverage: {agg.sentiment_coverage:.0%} of trades"),
+    ]
+    # Rows whose timestamps could not be parsed drop out of every time-based panel
+    blocks += [Info(f"Unparsed timestamps: {line}") for line in describe(agg.timestamps)]
+    if df is not None:
+        blocks += [Text("### Sample Data"), Table('sample', df.head())]
+    values['timestamps'] = agg.timestamps
+    return Section('data-overview', '📋 Data Overview', blocks, values)
+
+
+def side_distribution(agg: TradeAggregates) -> Section:
+    side_counts = agg.side_counts.sort_index()
+    side = _best(side_counts)
+    return Section('trade-side-distribution', '📈 1. Trade Side Distribution', [
+        Text("This chart shows the number of buy and sell trades."),
+        Figure('side_counts', plot_side_counts, (side_counts,)),
+        Info(f"Most trades are {side}s. This may reflect a market bias or trader preference. If you notice a persistent bias, consider if it aligns with prevailing sentiment or if it exposes you to one-sided risk."),
+    ], {'side_counts': side_counts.to_dict()})
+
+
+def most_traded_coins(agg: TradeAggregates) -> Section:
+    top_coins = agg.top_coins(10)
+    return Section('most-traded-coins', '💰 2. Most Traded Coins', [
+        Text("Top 10 coins by number of trades."),
+        Figure('top_coins', plot_top_coins, (top_coins,)),
+        Info("The most traded coins may reflect current market trends or trader preferences. Focus your analysis on these coins for the most actionable insights."),
+    ], {'top_coins': top_coins.to_dict()})
+
+
+def trade_sizes(agg: TradeAggregates) -> Section:
+    # Quartiles and whiskers come from per-coin DDSketches (quantiles within 1%);
+    # each flier marker stands for one sketch bucket beyond the whiskers
+    size_stats = [box_stats(agg.size_sketches[coin], str(coin)) for coin in agg.top_coins(10).index
+                  if coin in agg.size_sketches]
+    medians = {s['label']: float(s['med']) for s in size_stats}
+    return Section('trade-size-distribution', '📦 3. Trade Size (USD) Distribution by Coin', [
+        Text("Boxplot of trade sizes (USD) for the top traded coins."),
+        Figure('trade_sizes', plot_trade_sizes, (size_stats,)),
+        Info("Wide variation in trade size may indicate different trader types (retail vs. institutional) or changing conviction. Outliers can signal large players or unusual activity."),
+    ], {'median_trade_size': medians})
+
+
+def pnl_overview(agg: TradeAggregates) -> Section:
+    # Histogram, KDE and median are drawn from the PnL sketch, not the raw column
+    pnl_edges, pnl_counts = histogram(agg.pnl_sketch, bins=50)
+    kde_x, kde_density = binned_kde(agg.pnl_sketch)
+    mean_pnl = agg.pnl_mean
+    median_pnl = agg.pnl_sketch.quantile(0.5)
+    return Section('closed-pnl-overview', '📉 4. Closed PnL Overview', [
+        Text("Distribution of profit and loss (PnL) for all trades."),
+        Figure('pnl_distribution', plot_pnl_distribution, (pnl_edges, pnl_counts, kde_x, kde_density)),
+        Info(f"Average PnL: {mean_pnl:.2f}, Median: {median_pnl:.2f}. If your average PnL is positive, your strategy is profitable overall. Compare the mean and median: if the mean is much higher, a few big wins may be driving results; if the median is higher, your wins are more consistent."),
+    ], {'mean_pnl': mean_pnl, 'median_pnl': median_pnl})
+
+
+def trade_frequency(agg: TradeAggregates) -> Section:
+    # Min/max decimation keeps daily spikes while capping points at the pixel width
+    trade_counts = decimate_series(agg.daily_counts, points_for(6))
+    return Section('trade-frequency-over-time', '📅 5. Trade Frequency Over Time', [
+        Text("Number of trades per day."),
+        Figure('trade_counts', plot_trade_counts, (trade_counts,)),
+        Info("Spikes or drops in daily trade frequency may be linked to news, sentiment shifts, or market events. Use these patterns to time entries or exits."),
+    ])
+
+
+def price_trends(agg: TradeAggregates, df: Optional[pd.DataFrame]) -> Section:
+    section = Section('average-execution-price-over-time-top-3-coins',
+                      '📊 6. Average Execution Price Over Time (Top 3 Coins)',
+                      [Text("Shows how the average execution price changes over time for the most traded coins.")])
+    if df is None:
+        section.blocks.append(Info(LOW_MEMORY_NOTE))
+        return section
+    top_3_coins = agg.top_coins(3).index
+    df_top3 = df.loc[df['Coin'].isin(top_3_coins), ['Timestamp IST', 'Coin', 'Execution Price']]
+    # Average within time buckets (about one per pixel) instead of per raw timestamp
+    avg_price = resample_mean(df_top3, 'Timestamp IST', 'Execution Price', by='Coin', max_points=points_for(6))
+    section.blocks.extend([
+        Figure('avg_price', plot_avg_price, (avg_price,)),
+        Info("Tracking execution price trends helps you spot momentum, mean reversion, or regime changes in the most active coins."),
+    ])
+    return section
+
+
+def fees(agg: TradeAggregates) -> Section:
+    fee_sum = agg.coin_fees.loc[agg.top_coins(10).index]
+    return Section('fees-paid-by-top-coins', '💸 7. Fees Paid by Top Coins', [
+        Text("Total fees paid per coin for the top traded coins."),
+        Figure('fees', plot_fees, (fee_sum,)),
+        Info("High fees on certain coins may indicate high activity or less efficient trading. Consider fee impact when choosing which coins to trade."),
+    ], {'fees': fee_sum.to_dict()})
+
+
+# Scopes offered by correlations(): all trades, each sentiment, the top coins
+def correlation_scopes(agg: TradeAggregates) -> List[str]:
+    return ([CORRELATION_ALL]
+            + [f"Sentiment: {s}" for s in SENTIMENT_ORDER if s in agg.sentiment_corr]
+            + [f"Coin: {c}" for c in agg.top_coins(10).index if c in agg.coin_corr])
+
+
+def correlations(agg: TradeAggregates, scope: str = CORRELATION_ALL) -> Section:
+    # Pairwise-complete correlations accumulated during ingestion; the
+    # per-sentiment and per-coin matrices come from the same pass
+    if scope.startswith("Sentiment: "):
+        corr = agg.sentiment_corr[scope[len("Sentiment: "):]].corr()
+    elif scope.startswith("Coin: "):
+        corr = agg.coin_corr[scope[len("Coin: "):]].corr()
+    else:
+        corr = agg.corr.corr()
+    return Section('correlation-matrix-of-numeric-features', '🔗 8. Correlation Matrix of Numeric Features', [
+        Text("Correlation between trade size, price, PnL, and fees."),
+        Figure('correlation', plot_correlation, (corr, scope)),
+        Info("Strong correlations between features can help you build predictive models or spot risk factors. For example, if PnL and trade size are highly correlated, larger trades may be riskier or more profitable."),
+    ])
+
+
+def sentiment_performance(agg: TradeAggregates, coin: Optional[str] = None) -> Section:
+    # Served from the rollup cube, so drilling down to one coin is a cube slice
+    sentiment_summary = agg.sentiment_summary(**({} if coin is None else {'Coin': coin}))
+    sentiment_pnl = sentiment_summary['pnl_mean']
+    sentiment_win = sentiment_summary['win_rate']
+    sentiment_vol = sentiment_summary['volume']
+    sentiment_pnl_vol = sentiment_summary['pnl_std']
+    best_sent, worst_sent = _best(sentiment_pnl), _worst(sentiment_pnl)
+    best_win, worst_win = _best(sentiment_win), _worst(sentiment_win)
+    max_vol_sent = _best(sentiment_vol)
+    max_vol = _best(sentiment_pnl_vol)
+    return Section('trader-performance-by-market-sentiment', '📈 9. Trader Performance by Market Sentiment', [
+        Text("How does trader performance (PnL, win rate, trade size) change with market sentiment?"),
+        Figure('pnl_by_sentiment', plot_sentiment_bar, (sentiment_pnl, 'Average Closed PnL by Sentiment', 'Average Closed PnL')),
+        Info(f"Traders tend to have the highest average PnL during {best_sent} periods and the lowest during {worst_sent} periods. This suggests you may want to be more aggressive or take more risk during {best_sent} and be more cautious during {worst_sent}."),
+        Figure('win_rate_by_sentiment', plot_sentiment_bar, (sentiment_win, 'Win Rate by Sentiment', 'Win Rate')),
+        Info(f"Win rate is highest during {best_win} and lowest during {worst_win}. This means your strategy may be more reliable in {best_win} markets. Consider adjusting your position size or risk tolerance based on the current sentiment."),
+        Figure('volume_by_sentiment', plot_sentiment_bar, (sentiment_vol, 'Total Trade Volume (USD) by Sentiment', 'Total Volume (USD)')),
+        Info(f"Trade volume is highest during {max_vol_sent} periods. High volume in a sentiment regime may indicate crowd behavior or increased opportunity, but also higher risk of reversals."),
+        Figure('pnl_std_by_sentiment', plot_sentiment_bar, (sentiment_pnl_vol, 'PnL Volatility by Sentiment', 'PnL Std Dev')),
+        Info(f"PnL volatility is highest during {max_vol} periods. High volatility means larger swings in profit and loss, so you may want to reduce position size or use tighter stops during these times."),
+    ], {'coin': coin, 'summary': sentiment_summary.to_dict(orient='index')})
+
+
+def streaks(df: Optional[pd.DataFrame], scope: str = 'Per account') -> Section:
+    section = Section('streaks-of-winning-and-losing-trades', '🔄 10. Streaks of Winning and Losing Trades',
+                      [Text("How long do traders stay on a winning or losing streak?")])
+    if df is None:
+        section.blocks.append(Info(LOW_MEMORY_NOTE))
+        return section
+    # Streaks are computed within each account (or coin) in time order so
+    # different traders' trades are not mixed into one sequence
+    scope_col = STREAK_SCOPES[scope]
+    runs = run_lengths(df['Closed PnL'] > 0, groups=df[scope_col] if scope_col else None,
+                       order=df['Timestamp IST'] if scope_col else None)
+    streaks_df = runs.to_frame()
+    longest_win = streaks_df[streaks_df['type']==True]['length'].max()
+    longest_loss = streaks_df[streaks_df['type']==False]['length'].max()
+    section.blocks.extend([
+        Figure('streak_lengths', plot_streak_lengths, (streaks_df['length'],)),
+        Info(f"Long winning streaks (max: {longest_win}) and losing streaks (max: {longest_loss}) are rare. After a long streak, traders often experience a reversal. Consider reducing risk or taking profits after a long win streak, and reviewing your strategy after a losing streak."),
+    ])
+    return section._replace(values={'scope': scope, 'longest_win': longest_win, 'longest_loss': longest_loss})
+
+
+def trader_leaderboard(df: Optional[pd.DataFrame], by: str = 'Account',
+                       tables: Optional[Tuple[pd.DataFrame, pd.DataFrame]] = None, workers: Optional[int] = None) -> Section:
+    section = Section('trader-leaderboard', '🏆 11. Trader Leaderboard', [
+        Text("Which accounts (or coins) perform best, and how does each one fare under different sentiment?")])
+    if df is None:
+        section.blocks.append(Info(LOW_MEMORY_NOTE))
+        return section
+    trader_table, trader_sentiment = tables if tables is not None else trader_stats(df, by, workers=workers)
+    top_traders = leaderboard(trader_table, 'pnl', 20)
+    noun = 'accounts' if by == 'Account' else 'coins'
+    top_sentiment = trader_sentiment.loc[trader_sentiment.index.get_level_values(by).isin(top_traders.index)]
+    sentiment_table = top_sentiment[['pnl_mean', 'win_rate']].unstack('sentiment').reindex(top_traders.index)
+    sentiment_table.columns = [f"{'Avg PnL' if stat == 'pnl_mean' else 'Win Rate'} ({s})" for stat, s in sentiment_table.columns]
+    section.blocks.extend([
+        Table('leaderboard', top_traders.rename(columns={
+            'trades': 'Trades', 'pnl': 'Total PnL', 'pnl_mean': 'Avg PnL', 'win_rate': 'Win Rate',
+            'fees': 'Fees', 'volume': 'Volume (USD)', 'max_win_streak': 'Longest Win Streak',
+            'max_loss_streak': 'Longest Loss Streak'})),
+        Text(f"Average PnL and win rate by sentiment for the top {noun}:"),
+        Table('sentiment_performance', sentiment_table),
+    ])
+    if len(top_traders):
+        section.blocks.append(Info(f"The top-ranked {by.lower()} earned {top_traders['pnl'].iloc[0]:,.2f} in total. Check whether leaders stay profitable across Fear and Greed, or depend on a single regime."))
+    return section
+
+
+# Sentiment k = 0..max_lag days before each trade day (see lags.py), against
+# that day's PnL per trade and win rate, with 95% bootstrap intervals
+def sentiment_lead_lag(agg: TradeAggregates, sent: Optional[pd.DataFrame], signal: str = LAG_SIGNALS[0],
+                       max_lag: int = 14, block: int = 1) -> Section:
+    section = Section('sentiment-lead-lag', '⏳ 12. How Far Ahead Does Sentiment Matter?', [
+        Text("Does the sentiment of earlier days predict today's results? Each point compares trade days by the "
+             "sentiment a given number of days before them; shaded bands are 95% bootstrap intervals over days.")])
+    daily = daily_stats(agg.cube)
+    if sent is None or not len(sent) or not len(daily):
+        section.blocks.append(Info("Lag analysis needs both trade and Fear & Greed data."))
+        return section
+    values = {'signal': signal, 'max_lag': max_lag, 'block': block}
+    if signal == LAG_SIGNALS[1]:
+        table = rolling_greed_lags(daily, sent, max_lag, block=block)
+        hits = significant(table, 'pnl')
+        if len(hits):
+            lag = hits['pnl_corr'].abs().idxmax()
+            row = table.loc[lag]
+            message = (f"The rolling greed average {lag} days before a trade day correlates with that day's PnL "
+                       f"per trade at {row['pnl_corr']:.2f} (95% interval {row['pnl_low']:.2f} to "
+                       f"{row['pnl_high']:.2f}, {row['days']:.0f} trade days). A persistent mood, not just "
+                       "today's reading, may be worth tracking.")
+        elif not len(testable(table, 'pnl')):
+            message = TOO_FEW_DAYS.format(min_days=MIN_DAYS, sides="with a rolling greed reading")
+        else:
+            message = (f"No lag from 0 to {max_lag} days shows a correlation between the rolling greed average "
+                       "and PnL per trade whose 95% interval excludes zero. The longer-term mood alone is not a "
+                       "reliable timing signal here.")
+        section.blocks.extend([Figure('lag_correlation', plot_lag_correlation, (table,)), Info(message)])
+        return section._replace(values={**values, 'table': table.reset_index().to_dict(orient='records')})
+
+    table = sentiment_lags(daily, sent, max_lag, block=block)
+    states = list(SENTIMENT_ORDER)
+    by_state = {col: table[col].unstack('state')[states] for col in
+                ['pnl_mean', 'pnl_low', 'pnl_high', 'win_rate', 'win_low', 'win_high']}
+    # Lags without both Greed and Fear days have no spread
+    spread = table.xs(SPREAD, level='state')
+    spread = spread[spread['days'] > 0]
+    hits = significant(spread, 'pnl')
+    if len(hits):
+        lag = hits['pnl_mean'].abs().idxmax()
+        row = spread.loc[lag]
+        message = (f"Sentiment {lag} days earlier separates results most clearly: trades after Greed days average "
+                   f"{row['pnl_mean']:+.2f} PnL versus trades after Fear days (95% interval {row['pnl_low']:+.2f} "
+                   f"to {row['pnl_high']:+.2f}). Sentiment shifts may take that long to show up in results.")
+    elif not len(testable(spread, 'pnl')):
+        message = TOO_FEW_DAYS.format(min_days=MIN_DAYS, sides="after Greed and after Fear")
+    else:
+        message = (f"No lag from 0 to {max_lag} days shows a Greed vs. Fear PnL gap whose 95% interval excludes "
+                   "zero. Past sentiment alone is not a reliable timing signal here; combine it with other "
+                   "indicators.")
+    section.blocks.extend([
+        Figure('pnl_by_lagged_sentiment', plot_lag_effects,
+               (by_state['pnl_mean'], by_state['pnl_low'], by_state['pnl_high'], 'Average Closed PnL by Lagged Sentiment', 'Average Closed PnL')),
+        Figure('win_rate_by_lagged_sentiment', plot_lag_effects,
+               (by_state['win_rate'], by_state['win_low'], by_state['win_high'], 'Win Rate by Lagged Sentiment', 'Win Rate')),
+        Info(message),
+        Table('lag_spread', spread.rename(columns={
+            'days': 'Days', 'trades': 'Trades', 'pnl_mean': 'PnL Gap', 'pnl_low': 'PnL Gap (low)', 'pnl_high': 'PnL Gap (high)',
+            'win_rate': 'Win Rate Gap', 'win_low': 'Win Rate Gap (low)', 'win_high': 'Win Rate Gap (high)'})),
+    ])
+    return section._replace(values={**values, 'table': table.reset_index().to_dict(orient='records')})
+
+
+def summary() -> Section:
+    return Section('summary--key-takeaways', '📌 Summary & Key Takeaways', [Text('''
+**Key Insights:**
+- Trader performance and behavior shift with market sentiment. Highest PnL and win rates often occur in specific sentiment regimes.
+- Trade size, frequency, and volume patterns reveal crowd behavior and market cycles.
+- Outliers and streaks can signal regime changes or the need for risk management.
+- Correlations between features can inform predictive models and risk controls.
+
+**Actionable Tips:**
+- Adjust your trading strategy based on sentiment, trade size, and recent streaks.
+- Monitor top coins and fee impact for best opportunities.
+- Use EDA findings to refine your risk management and strategy timing.
+''')])
+
+
+# Every section with default options, in dashboard order
+def all_sections(agg: TradeAggregates, df: Optional[pd.DataFrame], workers: Optional[int] = None,
+                 sent: Optional[pd.DataFrame] = None) -> List[Section]:
+    return [
+        overview(agg, df), side_distribution(agg), most_traded_coins(agg), trade_sizes(agg),
+        pnl_overview(agg), trade_frequency(agg), price_trends(agg, df), fees(agg), correlations(agg),
+        sentiment_performance(agg), streaks(df), trader_leaderboard(df, workers=workers),
+        sentiment_lead_lag(agg, sent), summary(),
+    ]
@@ -0,0 +1,90 @@
+from itertools import product
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Sentiment transition statistics on integer state codes.
+#
+# States are coded 0..m-1 (-1 for unknown). A k-th order "history" (the last k
+# states) is encoded as a single base-m integer, so every transition becomes
+# one flat index history*m + next and the whole matrix is a single bincount.
+# Rolling/expanding matrices come from a prefix sum over one-hot transitions:
+# each window is the difference of two prefix rows, so sliding the window by a
+# day costs O(cells) instead of a recount.
+
+
+def state_codes(values, categories: Sequence[str]) -> np.ndarray:
+    return pd.Categorical(values, categories=list(categories)).codes.astype(np.int64)
+
+
+# Base-m code of the `order` states ending at each row (-1 if any is unknown)
+def history_codes(codes: np.ndarray, m: int, order: int = 1) -> np.ndarray:
+    n = len(codes)
+    hist = np.zeros(n, dtype=np.int64)
+    valid = np.ones(n, dtype=bool)
+    valid[:order - 1] = False
+    for lag in range(order):
+        shifted = np.full(n, -1, dtype=np.int64)
+        shifted[lag:] = codes[:n - lag]
+        valid &= shifted >= 0
+        hist += np.maximum(shifted, 0) * m ** lag
+    return np.where(valid, hist, -1)
+
+
+def history_labels(categories: Sequence[str], order: int = 1) -> List[str]:
+    return [' → '.join(states) for states in product(categories, repeat=order)]
+
+
+# Flat cell index (history*m + next) of every transition, aligned to the row
+# of the next state; -1 where the transition is undefined
+def _transition_index(values, categories: Sequence[str], order: int) -> np.ndarray:
+    m = len(categories)
+    codes = state_codes(values, categories)
+    hist = history_codes(codes, m, order)
+    idx = np.full(len(codes), -1, dtype=np.int64)
+    if len(codes) > 1:
+        prev, nxt = hist[:-1], codes[1:]
+        idx[1:] = np.where((prev >= 0) & (nxt >= 0), prev * m + nxt, -1)
+    return idx
+
+
+def transition_counts(values, categories: Sequence[str], order: int = 1) -> pd.DataFrame:
+    m = len(categories)
+    idx = _transition_index(values, categories, order)
+    counts = np.bincount(idx[idx >= 0], minlength=m ** order * m).reshape(m ** order, m)
+    return pd.DataFrame(counts, index=history_labels(categories, order), columns=list(categories))
+
+
+def transition_probs(counts: pd.DataFrame) -> pd.DataFrame:
+    return counts.div(counts.sum(axis=1), axis=0)
+
+
+def rolling_transition_counts(values, categories: Sequence[str], window: Optional[int] = None,
+                              order: int = 1) -> np.ndarray:
+    """Transition counts for every row, shape (n, m**order, m).
+
+    Row t counts transitions whose next state falls in the last `window` rows
+    ending at t (all rows up to t when `window` is None, i.e. expanding).
+    """
+    m = len(categories)
+    idx = _transition_index(values, categories, order)
+    n, cells = len(idx), m ** order * m
+    onehot = np.zeros((n, cells), dtype=np.int32)
+    valid = idx >= 0
+    onehot[np.flatnonzero(valid), idx[valid]] = 1
+    cum = np.cumsum(onehot, axis=0)
+    if window is not None and window < n:
+        cum[window:] -= cum[:-window].copy()
+    return cum.reshape(n, m ** order, m)
+
+
+# Probability of staying in each state, per row, over a rolling window
+def rolling_persistence(values, categories: Sequence[str], window: Optional[int] = None,
+                        index=None) -> pd.DataFrame:
+    counts = rolling_transition_counts(values, categories, window, order=1).astype(np.float64)
+    totals = counts.sum(axis=2)
+    stay = np.diagonal(counts, axis1=1, axis2=2)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        probs = np.where(totals > 0, stay / totals, np.nan)
+    return pd.DataFrame(probs, index=index, columns=list(categories))